@@ -4,14 +4,22 @@ Virginia Home Essentials - AI Content Generator
 Automated system for generating blog posts, product recommendations, and market insights
 """
 
+import asyncio
 import json
-import requests
 import datetime
 import os
-from typing import List, Dict, Any
-import openai
-from dataclasses import dataclass
-import csv
+import re
+import logging
+from typing import List, Dict, Any, Callable, Optional
+from dataclasses import dataclass, field
+from contextlib import aclosing
+
+from blog_stream import BlogStreamParser, MalformedOutputError
+from llm_cache import LLMCache
+from llm_client import LLMClient
+from llm_metrics import LLMMetrics
+from log_setup import setup_logging
+from structured_output import PRODUCT_SCHEMA, StructuredOutputParser
 
 @dataclass
 class ProductRecommendation:
@@ -33,13 +41,19 @@ class BlogPost:
     target_audience: str
     estimated_read_time: str
     seo_meta: Dict[str, str]
+    sections: List[str] = field(default_factory=list)
 
 class VirginiaHomeAI:
-    def __init__(self, openai_api_key: str = None):
+    def __init__(self, openai_api_key: str = None, logger: logging.Logger = None):
         """Initialize the AI content generator"""
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
-        if self.openai_api_key:
-            openai.api_key = self.openai_api_key
+        self.logger = logger or logging.getLogger("ContentGenerator")
+        self.llm = LLMClient(self.openai_api_key)
+        
+        # Completions are cached on disk so repeated runs skip identical requests
+        self.cache = LLMCache()
+        self.metrics = LLMMetrics()
+        self.product_parser = StructuredOutputParser(PRODUCT_SCHEMA)
         
         self.virginia_context = {
             "climate": "Humid subtropical with hot summers and mild winters",
@@ -64,8 +78,8 @@ class VirginiaHomeAI:
             "seasonal": ["Humidifiers", "Dehumidifiers", "Space heaters", "Fans"]
         }
 
-    def generate_trending_products(self, category: str, count: int = 10) -> List[ProductRecommendation]:
-        """Generate trending product recommendations for a specific category"""
+    def _trending_products_request(self, category: str, count: int) -> Dict[str, Any]:
+        """Build the chat completion request for trending products"""
         
         prompt = f"""
         Generate {count} trending product recommendations for new homeowners in Virginia in the {category} category.
@@ -88,29 +102,66 @@ class VirginiaHomeAI:
         Format as JSON array with the specified fields.
         """
         
-        try:
-            if self.openai_api_key:
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7
-                )
-                
-                content = response.choices[0].message.content
-                # Parse JSON response and convert to ProductRecommendation objects
-                products_data = json.loads(content)
-                
-                return [ProductRecommendation(**product) for product in products_data]
-            else:
-                # Fallback to predefined recommendations
-                return self._get_fallback_products(category, count)
-                
-        except Exception as e:
-            print(f"Error generating products: {e}")
-            return self._get_fallback_products(category, count)
+        return {
+            "model": "gpt-4",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.7
+        }
+
+    def _parse_products(self, content: str) -> List[ProductRecommendation]:
+        """Parse JSON response and convert to ProductRecommendation objects
+        
+        Every complete, valid element is kept even if the rest of the response
+        is truncated or malformed; raises only when nothing can be salvaged.
+        """
+        result = self.product_parser.parse(content)
+        if not result.items:
+            raise ValueError("; ".join(result.errors) or "No valid products in response")
+        
+        if result.truncated or result.rejected:
+            self.logger.warning(f"⚠️ Salvaged {len(result.items)} products "
+                                f"({result.rejected} rejected, truncated: {result.truncated})",
+                                extra={"count": len(result.items), "rejected": result.rejected})
+        
+        return [ProductRecommendation(**product) for product in result.items]
+
+    def generate_trending_products(self, category: str, count: int = 10) -> List[ProductRecommendation]:
+        """Generate trending product recommendations for a specific category"""
+        return self.generate_trending_products_batch([category], count)[category]
 
-    def generate_blog_post(self, topic: str, keywords: List[str], target_length: int = 1500) -> BlogPost:
-        """Generate a comprehensive blog post"""
+    def generate_trending_products_batch(self, categories: List[str], count: int = 10) -> Dict[str, List[ProductRecommendation]]:
+        """Generate trending products for several categories with concurrent requests"""
+        
+        if not self.openai_api_key:
+            # Fallback to predefined recommendations
+            for category in categories:
+                self.metrics.record_fallback("products", "OPENAI_API_KEY not configured")
+            return {category: self._get_fallback_products(category, count) for category in categories}
+        
+        async def generate_all():
+            return await asyncio.gather(*(
+                self._acached_completion("products", self._parse_products,
+                                         **self._trending_products_request(category, count))
+                for category in categories
+            ), return_exceptions=True)
+        
+        results = {}
+        for category, result in zip(categories, self.llm.run(generate_all())):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error generating products for {category}: {result}", extra={"category": category})
+                self.metrics.record_fallback("products", str(result))
+                result = self._get_fallback_products(category, count)
+            results[category] = result
+        
+        return results
+
+    def generate_blog_post(self, topic: str, keywords: List[str], target_length: int = 1500,
+                           stream: bool = False) -> BlogPost:
+        """Generate a comprehensive blog post
+        
+        With ``stream=True`` the completion is parsed as it arrives and written
+        to a draft file under ``generated_content/drafts``.
+        """
         
         current_date = datetime.datetime.now().strftime("%B %Y")
         
@@ -145,27 +196,70 @@ class VirginiaHomeAI:
         - Category classification
         """
         
+        request = {
+            "model": "gpt-4",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.7,
+            "max_tokens": 3000
+        }
+        
         try:
-            if self.openai_api_key:
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                    max_tokens=3000
-                )
-                
-                content = response.choices[0].message.content
-                
+            if self.openai_api_key and stream:
+                return self.llm.run(self._stream_blog_post(topic, keywords, request))
+            elif self.openai_api_key:
                 # Extract components from the response
-                # This would need more sophisticated parsing in production
-                return self._parse_blog_response(content, topic, keywords)
+                return self._cached_completion(
+                    "blog_post",
+                    lambda content: self._parse_blog_response(content, topic, keywords),
+                    **request
+                )
             else:
+                self.metrics.record_fallback("blog_post", "OPENAI_API_KEY not configured")
                 return self._get_fallback_blog_post(topic, keywords)
                 
         except Exception as e:
-            print(f"Error generating blog post: {e}")
+            self.logger.error(f"Error generating blog post: {e}")
+            self.metrics.record_fallback("blog_post", str(e))
             return self._get_fallback_blog_post(topic, keywords)
 
+    async def _stream_blog_post(self, topic: str, keywords: List[str], request: Dict[str, Any]) -> BlogPost:
+        """Stream a blog post into a draft file, parsing sections as they arrive"""
+        
+        cache_key = LLMCache.make_key(**request)
+        
+        with self.metrics.track("blog_post", request["model"]) as call:
+            cached = self.cache.get("blog_post", cache_key)
+            if cached is not None:
+                call.outcome = "cache"
+                return self._parse_blog_response(cached, topic, keywords)
+            
+            draft_dir = "../generated_content/drafts"
+            os.makedirs(draft_dir, exist_ok=True)
+            slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")
+            draft_path = f"{draft_dir}/{slug}.md"
+            partial_path = f"{draft_path}.partial"
+            usage = {}
+            
+            # A failed generation leaves the .partial draft behind for inspection
+            with open(partial_path, "w", encoding="utf-8") as draft_file:
+                parser = BlogStreamParser(draft_file)
+                async with aclosing(self.llm.stream(usage_out=usage, **request)) as stream:
+                    async for text in stream:
+                        section_count = len(parser.sections)
+                        parser.feed(text)
+                        if len(parser.sections) > section_count:
+                            self.logger.info(f"✍️ {parser.sections[-1]}")
+                parser.close()
+            
+            call.set_usage(usage)
+            os.replace(partial_path, draft_path)
+            self.logger.info(f"Draft saved to {draft_path}")
+            
+            with open(draft_path, "r", encoding="utf-8") as f:
+                self.cache.set("blog_post", cache_key, f.read())
+            
+            return self._parse_blog_response(None, topic, keywords, parser)
+
     def generate_market_insights(self) -> Dict[str, Any]:
         """Generate current market insights for Virginia"""
         
@@ -192,20 +286,51 @@ class VirginiaHomeAI:
         
         try:
             if self.openai_api_key:
-                response = openai.ChatCompletion.create(
+                return self._cached_completion(
+                    "market_insights",
+                    json.loads,
                     model="gpt-4",
                     messages=[{"role": "user", "content": prompt}],
                     temperature=0.6
                 )
-                
-                return json.loads(response.choices[0].message.content)
             else:
+                self.metrics.record_fallback("market_insights", "OPENAI_API_KEY not configured")
                 return self._get_fallback_market_insights()
                 
         except Exception as e:
-            print(f"Error generating market insights: {e}")
+            self.logger.error(f"Error generating market insights: {e}")
+            self.metrics.record_fallback("market_insights", str(e))
             return self._get_fallback_market_insights()
 
+    def _cached_completion(self, content_type: str, parse: Callable[[str], Any], **request) -> Any:
+        """Run a chat completion through the response cache.
+        
+        Responses are only stored once ``parse`` accepts them, so a malformed
+        completion is retried on the next run instead of being served again.
+        """
+        return self.llm.run(self._acached_completion(content_type, parse, **request))
+
+    async def _acached_completion(self, content_type: str, parse: Callable[[str], Any], **request) -> Any:
+        """Async variant of _cached_completion for concurrent generation"""
+        cache_key = LLMCache.make_key(**request)
+        
+        with self.metrics.track(content_type, request.get("model", "")) as call:
+            cached = self.cache.get(content_type, cache_key)
+            if cached is not None:
+                try:
+                    call.outcome = "cache"
+                    return parse(cached)
+                except Exception as e:
+                    call.outcome = "api"
+                    self.logger.warning(f"⚠️ Ignoring unusable cached {content_type} response: {e}")
+            
+            content, usage = await self.llm.complete_with_usage(**request)
+            call.set_usage(usage)
+            
+            result = parse(content)
+            self.cache.set(content_type, cache_key, content)
+            return result
+
     def generate_seasonal_content_calendar(self, year: int = 2025) -> Dict[str, List[Dict]]:
         """Generate a content calendar with seasonal topics"""
         
@@ -352,24 +477,40 @@ class VirginiaHomeAI:
             ]
         }
 
-    def _parse_blog_response(self, content: str, topic: str, keywords: List[str]) -> BlogPost:
-        """Parse AI response into BlogPost object"""
+    def _parse_blog_response(self, content: Optional[str], topic: str, keywords: List[str],
+                             parser: Optional[BlogStreamParser] = None) -> BlogPost:
+        """Parse AI response into BlogPost object
         
-        # This would need more sophisticated parsing in production
-        # For now, return a structured response
+        Pass an already-fed ``parser`` when the response was streamed. Responses
+        without markdown structure are kept verbatim with generated metadata.
+        """
+        
+        if parser is None:
+            parser = BlogStreamParser()
+            try:
+                parser.feed(content)
+                parser.close()
+            except MalformedOutputError:
+                parser = None
+        
+        meta = parser.meta if parser else {}
+        body = parser.content if parser else content
+        category = re.sub(r"[^a-z0-9]+", "-", meta.get("category", "").lower()).strip("-")
         
         return BlogPost(
-            title=f"{topic}: Complete Guide for Virginia Homeowners",
-            content=content,
-            excerpt=content[:200] + "...",
-            category="home-essentials",
+            title=(parser and parser.title) or f"{topic}: Complete Guide for Virginia Homeowners",
+            content=body,
+            excerpt=(parser and parser.excerpt) or body[:200] + "...",
+            category=category or "home-essentials",
             keywords=keywords,
             target_audience="New Virginia homeowners",
-            estimated_read_time="6-8 minutes",
+            estimated_read_time=meta.get("estimated_read_time") or meta.get("read_time") or "6-8 minutes",
             seo_meta={
-                "title": f"{topic} - Virginia Home Essentials",
-                "description": f"Expert guide to {topic} for Virginia homeowners. Tips, recommendations, and local insights."
-            }
+                "title": meta.get("seo_title") or f"{topic} - Virginia Home Essentials",
+                "description": meta.get("meta_description") or
+                    f"Expert guide to {topic} for Virginia homeowners. Tips, recommendations, and local insights."
+            },
+            sections=parser.sections if parser else []
         )
 
     def save_content_to_files(self, content_type: str, content: Any, filename: str = None):
@@ -411,7 +552,7 @@ class VirginiaHomeAI:
             with open(f"{output_dir}/{filename}.json", "w", encoding="utf-8") as f:
                 json.dump(content, f, indent=2)
         
-        print(f"Content saved to {output_dir}/{filename}")
+        self.logger.info(f"Content saved to {output_dir}/{filename}")
 
     def _convert_blog_to_html(self, blog_post: BlogPost) -> str:
         """Convert blog post to HTML format"""
@@ -456,6 +597,8 @@ class VirginiaHomeAI:
 def main():
     """Main function to demonstrate the AI content generator"""
     
+    setup_logging(name="content_generator")
+    
     # Initialize the AI system
     ai_generator = VirginiaHomeAI()
     
@@ -471,7 +614,8 @@ def main():
     print("\n2. Generating blog post...")
     blog_post = ai_generator.generate_blog_post(
         "Essential Smart Home Devices for New Virginia Homeowners",
-        ["smart home", "Virginia", "new homeowners", "home automation", "energy efficiency"]
+        ["smart home", "Virginia", "new homeowners", "home automation", "energy efficiency"],
+        stream=True
     )
     ai_generator.save_content_to_files("blog_post", blog_post, "smart_home_essentials")
     
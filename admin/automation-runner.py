@@ -8,9 +8,11 @@ import os
 import sys
 import json
 import datetime
-import schedule
 import time
 import logging
+import threading
+import signal
+from importlib import import_module
 from pathlib import Path
 import subprocess
 import argparse
@@ -22,29 +24,140 @@ load_dotenv()
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from ai_content_generator import VirginiaHomeAI
-from product_tracker import AmazonProductTracker
-from blog_automation import BlogAutomationSystem
+from db_lock import lock_stats, set_wait_observer
+from llm_cache import LLMCache
+from llm_metrics import LLMMetrics
+from log_setup import setup_logging, stop_logging
+from metrics import AutomationMetrics
+from run_state import RunState
+
+# Subsystems are imported and constructed on first use, so a single task
+# only pays for the modules it needs: attribute -> (module, class)
+SUBSYSTEMS = {
+    "ai_generator": ("ai_content_generator", "VirginiaHomeAI"),
+    "product_tracker": ("product_tracker", "AmazonProductTracker"),
+    "blog_system": ("blog_automation", "BlogAutomationSystem"),
+    "notifier": ("notifications", "NotificationDispatcher"),
+    "queue": ("job_queue", "JobQueue"),
+}
+
+# The system report only reads these once they exist, since reading them creates them
+JOB_QUEUE_DB = "job_queue.db"
+NOTIFICATIONS_DB = "notifications.db"
+
+# Modes of profiling.Profiler; profiling.py itself is only imported when a task is profiled
+PROFILE_MODES = ("cprofile", "sample")
+
+# Task name (CLI and job queue) -> method
+TASKS = {
+    "content": "run_content_generation",
+    "products": "run_product_tracking",
+    "blog": "run_blog_automation",
+    "full": "run_full_update",
+}
+
+# Job name (also the last_run key) -> (weekday or None for daily, HH:MM, task)
+SCHEDULE = {
+    "content_generation": (None, "09:00", "content"),
+    "product_tracking": (None, "10:00", "products"),
+    "blog_publishing": (None, "11:00", "blog"),
+    "full_update": ("sunday", "08:00", "full"),
+}
+
+# How often an idle worker checks the queue
+WORKER_POLL_INTERVAL = 5  # seconds
 
 class MasterAutomationSystem:
-    def __init__(self, config_file: str = "automation_config.json"):
+    def __init__(self, config_file: str = "automation_config.json", log_name: str = "automation"):
         """Initialize the master automation system"""
         self.config_file = config_file
+        self.log_name = log_name
         self.config = self.load_config()
         self.setup_logging()
         
         # Initialize subsystems with proper error handling for missing API keys
-        openai_key = self.config.get('openai_api_key')
-        if not openai_key:
+        if not self.config.get('openai_api_key'):
             self.logger.warning("OPENAI_API_KEY not configured. AI features will be limited.")
         
-        self.ai_generator = VirginiaHomeAI(openai_key)
-        self.product_tracker = AmazonProductTracker(self.config.get('amazon_associate_tag', 'virginiahomee-20'))
-        self.blog_system = BlogAutomationSystem(openai_key)
+        self._subsystems = {}
+        self._subsystem_lock = threading.Lock()
         
         # Automation status
         self.last_run = {}
         self.load_status()
+        self.scheduler = None
+        
+        # With resume, tasks continue their last unfinished run from its checkpoints
+        self.run_state = RunState()
+        self.resume = False
+        
+        # Manual tasks run under the profiler when a mode is set (see profiling.py)
+        self.profile = None
+        self.profile_sql = False
+        
+        # Per-stage counters, gauges and histograms, exported for Prometheus
+        self.metrics = AutomationMetrics()
+        
+        # Writers to products.db and blog_system.db take a per-database file lock; report how long they waited
+        set_wait_observer(self._on_lock_wait)
+
+    def _on_lock_wait(self, db_name: str, seconds: float, holder: str):
+        """Record a contended database write lock"""
+        self.metrics.observe("automation_db_lock_wait_seconds", seconds, db=db_name)
+        if seconds >= 1:
+            self.logger.warning(f"⚠️ Waited {seconds:.1f}s for the {db_name} write lock (held by {holder})",
+                                extra={"db": db_name, "wait_seconds": round(seconds, 3)})
+
+    def _subsystem_args(self, name: str) -> tuple:
+        if name == "notifier":
+            return (self.config.get("notification_settings", {}), NOTIFICATIONS_DB, self.logger)
+        if name == "queue":
+            return (JOB_QUEUE_DB,)
+        if name == "product_tracker":
+            return (self.config.get('amazon_associate_tag', 'virginiahomee-20'),)
+        return (self.config.get('openai_api_key'),)
+
+    def get_subsystem(self, name: str):
+        """Import and construct a subsystem on first use (thread-safe)"""
+        subsystem = self._subsystems.get(name)
+        if subsystem is None:
+            with self._subsystem_lock:
+                subsystem = self._subsystems.get(name)
+                if subsystem is None:
+                    module_name, class_name = SUBSYSTEMS[name]
+                    started = time.perf_counter()
+                    subsystem_class = getattr(import_module(module_name), class_name)
+                    subsystem = subsystem_class(*self._subsystem_args(name))
+                    self._subsystems[name] = subsystem
+                    self.logger.debug(f"Loaded {class_name} in {time.perf_counter() - started:.2f}s")
+        return subsystem
+
+    @property
+    def ai_generator(self):
+        return self.get_subsystem("ai_generator")
+
+    @property
+    def product_tracker(self):
+        return self.get_subsystem("product_tracker")
+
+    @property
+    def blog_system(self):
+        return self.get_subsystem("blog_system")
+
+    @property
+    def notifier(self):
+        # Alerts go to an outbox and are delivered by a background sender
+        return self.get_subsystem("notifier")
+
+    @property
+    def queue(self):
+        # Only --enqueue, the scheduler in queue mode and workers use the job queue
+        return self.get_subsystem("queue")
+
+    def stop_notifier(self):
+        """Deliver queued alerts and stop the sender, if this process ever loaded it"""
+        if "notifier" in self._subsystems:
+            self.notifier.stop()
 
     def load_config(self) -> dict:
         """Load configuration from file or create default"""
@@ -69,8 +182,14 @@ class MasterAutomationSystem:
                 },
                 "notification_settings": {
                     "email_alerts": False,
+                    "email_to": [],
+                    "email_from": "",
+                    "smtp_host": "",
+                    "smtp_port": 587,
                     "slack_webhook": "",
-                    "discord_webhook": ""
+                    "discord_webhook": "",
+                    "digest_window_seconds": 60,
+                    "rate_limit_per_minute": 6
                 }
             }
             
@@ -80,18 +199,8 @@ class MasterAutomationSystem:
             return default_config
 
     def setup_logging(self):
-        """Setup logging configuration"""
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(f"logs/automation_{datetime.date.today()}.log"),
-                logging.StreamHandler()
-            ]
-        )
+        """Setup logging: records are queued and written to logs/<log_name>.jsonl by a listener thread"""
+        setup_logging(log_dir="logs", name=self.log_name)
         
         self.logger = logging.getLogger("MasterAutomation")
 
@@ -111,21 +220,36 @@ class MasterAutomationSystem:
 
     def save_status(self):
         """Save current run status"""
-        with open("automation_status.json", 'w') as f:
+        # Worker processes share the file, so keep the newest time per job
+        status_file = "automation_status.json"
+        if os.path.exists(status_file):
+            with open(status_file, 'r') as f:
+                on_disk = json.load(f)
+            for name, value in on_disk.items():
+                if value and (not self.last_run.get(name) or value > self.last_run[name]):
+                    self.last_run[name] = value
+        
+        temp_file = f"{status_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
             json.dump(self.last_run, f, indent=2)
+        os.replace(temp_file, status_file)
 
     def run_content_generation(self):
         """Run AI content generation tasks"""
         self.logger.info("Starting content generation...")
+        stage = self.metrics.start_stage("content_generation")
         
         try:
             # Generate trending products for all categories
             categories = ["smart_home", "security", "kitchen", "tools", "decor"]
             
-            for category in categories:
-                self.logger.info(f"Generating products for {category}...")
-                products = self.ai_generator.generate_trending_products(category, 5)
+            # Categories are requested concurrently, so this takes about as long as the slowest one
+            self.logger.info(f"Generating products for {len(categories)} categories...")
+            products_by_category = self.ai_generator.generate_trending_products_batch(categories, 5)
+            
+            for category, products in products_by_category.items():
                 self.ai_generator.save_content_to_files("products", products, f"{category}_trending")
+                stage.add_items(len(products))
             
             # Generate market insights
             self.logger.info("Generating market insights...")
@@ -137,20 +261,25 @@ class MasterAutomationSystem:
             calendar = self.ai_generator.generate_seasonal_content_calendar()
             self.ai_generator.save_content_to_files("market_insights", calendar, "content_calendar_updated")
             
+            stage.finish()
             self.last_run["content_generation"] = datetime.datetime.now().isoformat()
             self.logger.info("✅ Content generation completed successfully")
+            return insights
             
         except Exception as e:
+            stage.fail(e)
             self.logger.error(f"❌ Content generation failed: {e}")
             raise
 
     def run_product_tracking(self):
         """Run product tracking and updates"""
         self.logger.info("Starting product tracking...")
+        checkpoint = self.run_state.start("product_tracking", resume=self.resume)
+        stage = self.metrics.start_stage("product_tracking")
         
         try:
             # Update all products
-            self.product_tracker.update_all_products()
+            stage.add_items(self.product_tracker.update_all_products(checkpoint))
             
             # Generate product report
             report = self.product_tracker.generate_product_report(f"reports/product_report_{datetime.date.today()}.json")
@@ -162,50 +291,68 @@ class MasterAutomationSystem:
             price_alerts = self.product_tracker.monitor_price_changes()
             if price_alerts:
                 self.logger.info(f"Found {len(price_alerts)} price alerts")
+                self.metrics.inc("automation_price_alerts_total", len(price_alerts))
                 self.send_price_alerts(price_alerts)
             
+            checkpoint.finish()
+            stage.finish()
             self.last_run["product_tracking"] = datetime.datetime.now().isoformat()
             self.logger.info("✅ Product tracking completed successfully")
             
         except Exception as e:
+            checkpoint.fail(e)
+            stage.fail(e)
             self.logger.error(f"❌ Product tracking failed: {e}")
             raise
 
     def run_blog_automation(self):
         """Run blog automation tasks"""
         self.logger.info("Starting blog automation...")
+        checkpoint = self.run_state.start("blog_publishing", resume=self.resume)
+        stage = self.metrics.start_stage("blog_publishing")
         
         try:
             # Run full blog automation
-            self.blog_system.run_automation()
+            published = self.blog_system.run_automation(checkpoint)
             
+            checkpoint.finish()
+            stage.finish(published)
             self.last_run["blog_publishing"] = datetime.datetime.now().isoformat()
             self.logger.info("✅ Blog automation completed successfully")
             
         except Exception as e:
+            checkpoint.fail(e)
+            stage.fail(e)
             self.logger.error(f"❌ Blog automation failed: {e}")
             raise
 
     def run_full_update(self):
         """Run complete system update"""
+        # Only the full update runs a stage graph, so single tasks don't import the executor
+        from pipeline import Pipeline
+
         self.logger.info("Starting full system update...")
+        stage = self.metrics.start_stage("full_update")
         
         try:
-            # Run all subsystems
-            self.run_content_generation()
-            self.run_product_tracking()
-            self.run_blog_automation()
-            
-            # Generate comprehensive reports
-            self.generate_system_report()
-            
-            # Update website files
-            self.update_website_files()
+            # Content, products and blog are independent and run concurrently;
+            # the report and website update start once all three are done
+            pipeline = Pipeline("full_update", max_workers=3, logger=self.logger)
+            pipeline.add_stage("content", self.run_content_generation, outputs=["market_insights"])
+            pipeline.add_stage("products", self.run_product_tracking, outputs=["products_tracked"])
+            pipeline.add_stage("blog", self.run_blog_automation, outputs=["blog_published"])
+            pipeline.add_stage("report", lambda **_: self.generate_system_report(),
+                               inputs=["market_insights", "products_tracked", "blog_published"])
+            pipeline.add_stage("website", lambda market_insights, **_: self.update_website_files(market_insights),
+                               inputs=["market_insights", "products_tracked", "blog_published"])
+            result = pipeline.run()
             
+            stage.finish(len(result.timings))
             self.last_run["full_update"] = datetime.datetime.now().isoformat()
             self.logger.info("✅ Full system update completed successfully")
             
         except Exception as e:
+            stage.fail(e)
             self.logger.error(f"❌ Full system update failed: {e}")
             raise
 
@@ -213,6 +360,22 @@ class MasterAutomationSystem:
         """Generate comprehensive system report"""
         self.logger.info("Generating system report...")
         
+        # Counts are trigger-maintained, so these are cheap lookups rather than table scans
+        product_stats = self.product_tracker.stats()
+        blog_stats = self.blog_system.stats()
+        statistics = {
+            "total_products_tracked": product_stats["total"],
+            "total_blog_posts": blog_stats["posts"]["total"],
+            "scheduled_posts": blog_stats["posts"].get("by_status", {}).get("scheduled", 0),
+            "products_by_category": product_stats.get("by_category", {}),
+            "posts_by_status": blog_stats["posts"].get("by_status", {}),
+            "posts_by_category": blog_stats["posts"].get("by_category", {})
+        }
+        self.metrics.set("automation_products_tracked", statistics["total_products_tracked"])
+        self.metrics.set("automation_blog_posts", statistics["total_blog_posts"])
+        self.metrics.set("automation_scheduled_posts", statistics["scheduled_posts"])
+        self.metrics.export()
+        
         report = {
             "generated_at": datetime.datetime.now().isoformat(),
             "system_status": {
@@ -221,14 +384,24 @@ class MasterAutomationSystem:
                 "blog_publishing": self.last_run.get("blog_publishing"),
                 "full_update": self.last_run.get("full_update")
             },
-            "statistics": {
-                "total_products_tracked": self.get_product_count(),
-                "total_blog_posts": self.get_blog_post_count(),
-                "scheduled_posts": self.get_scheduled_post_count()
-            },
+            "statistics": statistics,
+            "stages": self.metrics.summary()["stages"],
+            "llm_cache": LLMCache().get_stats(),
+            "llm_metrics": LLMMetrics().summary(),
+            "db_locks": lock_stats(),
             "next_scheduled_runs": self.get_next_scheduled_runs()
         }
         
+        # Reading these stats would create the databases, so they are only reported once they exist
+        if os.path.exists(JOB_QUEUE_DB):
+            report["job_queue"] = self.queue.get_stats()
+        if os.path.exists(NOTIFICATIONS_DB):
+            report["notifications"] = self.notifier.get_stats()
+        
+        # Parse statistics live in memory and only exist once content was generated
+        if "ai_generator" in self._subsystems:
+            report["structured_output"] = self.ai_generator.product_parser.get_stats()
+        
         # Save report
         os.makedirs("reports", exist_ok=True)
         report_file = f"reports/system_report_{datetime.date.today()}.json"
@@ -237,7 +410,7 @@ class MasterAutomationSystem:
         
         self.logger.info(f"System report saved to {report_file}")
 
-    def update_website_files(self):
+    def update_website_files(self, insights: dict = None):
         """Update website with latest content"""
         self.logger.info("Updating website files...")
         
@@ -249,7 +422,7 @@ class MasterAutomationSystem:
             self.update_blog_index()
             
             # Update market insights on homepage
-            self.update_homepage_insights()
+            self.update_homepage_insights(insights)
             
             self.logger.info("✅ Website files updated successfully")
             
@@ -261,8 +434,7 @@ class MasterAutomationSystem:
         # This would generate an updated blog index page
         # For now, we'll create a simple JSON file with blog data
         
-        import sqlite3
-        conn = sqlite3.connect(self.blog_system.db_path)
+        conn = self.blog_system.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -292,148 +464,222 @@ class MasterAutomationSystem:
         with open("../assets/blog-posts.json", 'w') as f:
             json.dump(blog_data, f, indent=2)
 
-    def update_homepage_insights(self):
+    def update_homepage_insights(self, insights: dict = None):
         """Update homepage with latest market insights"""
         # This would update the homepage with fresh market data
         # For now, we'll create a JSON file with insights
         
-        insights = self.ai_generator.generate_market_insights()
+        if insights is None:
+            insights = self.ai_generator.generate_market_insights()
         
         with open("../assets/market-insights.json", 'w') as f:
             json.dump(insights, f, indent=2)
 
     def send_price_alerts(self, alerts: list):
-        """Send price alerts via configured channels"""
+        """Queue price alerts for the configured channels; delivery happens in the background"""
         if not alerts:
             return
         
-        alert_message = f"🚨 Price Alert: {len(alerts)} products have significant price changes:\n\n"
-        
-        for alert in alerts[:5]:  # Limit to top 5 alerts
+        queued = 0
+        for alert in alerts:
             change_emoji = "📉" if alert["price_change_percent"] < 0 else "📈"
-            alert_message += f"{change_emoji} {alert['title']}: {alert['price_change_percent']:.1f}% change\n"
-        
-        # Log alerts
-        self.logger.info(f"Price alerts: {alert_message}")
-        
-        # Send notifications (implement based on config)
-        if self.config.get("notification_settings", {}).get("email_alerts"):
-            self.send_email_alert(alert_message)
-        
-        if self.config.get("notification_settings", {}).get("slack_webhook"):
-            self.send_slack_alert(alert_message)
-
-    def send_email_alert(self, message: str):
-        """Send email alert (placeholder)"""
-        # Implement email sending logic
-        self.logger.info("Email alert would be sent here")
-
-    def send_slack_alert(self, message: str):
-        """Send Slack alert (placeholder)"""
-        # Implement Slack webhook logic
-        self.logger.info("Slack alert would be sent here")
+            subject = f"{change_emoji} {alert['title']}: {alert['price_change_percent']:.1f}% change"
+            body = (f"{alert['category']} | ${alert['previous_price']:.2f} → ${alert['current_price']:.2f} "
+                    f"(ASIN {alert['asin']})")
+            queued += self.notifier.notify(subject, body)
+        
+        self.logger.info(f"Queued {len(alerts)} price alerts ({queued} notifications)")
+        if queued:
+            self.notifier.start()
 
     def get_product_count(self) -> int:
         """Get total number of tracked products"""
-        import sqlite3
-        conn = sqlite3.connect(self.product_tracker.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM products")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self.product_tracker.stats()["total"]
 
     def get_blog_post_count(self) -> int:
         """Get total number of blog posts"""
-        import sqlite3
-        conn = sqlite3.connect(self.blog_system.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM blog_posts")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self.blog_system.stats()["posts"]["total"]
 
     def get_scheduled_post_count(self) -> int:
         """Get number of scheduled posts"""
-        import sqlite3
-        conn = sqlite3.connect(self.blog_system.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM blog_posts WHERE status = "scheduled"')
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self.blog_system.stats()["posts"].get("by_status", {}).get("scheduled", 0)
 
     def get_next_scheduled_runs(self) -> dict:
         """Get next scheduled run times"""
-        # This would calculate next run times based on schedule
-        # For now, return placeholder data
-        return {
-            "content_generation": "Tomorrow 9:00 AM",
-            "product_tracking": "Tomorrow 10:00 AM", 
-            "blog_publishing": "Tomorrow 11:00 AM",
-            "full_update": "Next Sunday 8:00 AM"
-        }
+        if self.scheduler is not None:
+            return self.scheduler.next_runs()
+        
+        # Worked out from the schedule, without setting up a scheduler just to report on it
+        from scheduler import next_run_time
+        return {name: next_run_time(at, weekday, self.last_run.get(name)).isoformat(timespec="minutes")
+                for name, (weekday, at, _) in SCHEDULE.items()}
 
-    def setup_scheduler(self):
-        """Setup automated scheduling"""
-        self.logger.info("Setting up automation scheduler...")
+    def setup_scheduler(self, use_queue: bool = False):
+        """Setup automated scheduling; with use_queue, due jobs are handed to worker processes"""
+        from scheduler import Scheduler
         
-        # Daily tasks
-        schedule.every().day.at("09:00").do(self.run_content_generation)
-        schedule.every().day.at("10:00").do(self.run_product_tracking)
-        schedule.every().day.at("11:00").do(self.run_blog_automation)
+        self.logger.info("Setting up automation scheduler...")
         
-        # Weekly full update
-        schedule.every().sunday.at("08:00").do(self.run_full_update)
+        # Status is only written after a job has actually run
+        self.scheduler = Scheduler(self.logger, on_change=None if use_queue else self.save_status)
+        for name, (weekday, at, task) in SCHEDULE.items():
+            if use_queue:
+                func = lambda task=task: self.enqueue_task(task)
+            else:
+                func = getattr(self, TASKS[task])
+            if weekday:
+                self.scheduler.every_week(name, weekday, at, func)
+            else:
+                self.scheduler.every_day(name, at, func)
+        
+        # Jobs whose last due time passed while we were down run once on start
+        self.scheduler.restore(self.last_run)
         
         self.logger.info("✅ Scheduler configured")
 
     def run_scheduler(self):
         """Run the scheduler continuously"""
         self.logger.info("Starting automation scheduler...")
+        for name, next_run in self.scheduler.next_runs().items():
+            self.logger.info(f"Next {name}: {next_run}")
         
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-                
-                # Save status periodically
-                self.save_status()
-                
-            except KeyboardInterrupt:
-                self.logger.info("Scheduler stopped by user")
-                break
-            except Exception as e:
-                self.logger.error(f"Scheduler error: {e}")
-                time.sleep(300)  # Wait 5 minutes before retrying
+        try:
+            self.scheduler.run_forever()
+        except KeyboardInterrupt:
+            self.scheduler.stop()
+            self.logger.info("Scheduler stopped by user")
 
     def run_manual_task(self, task: str):
         """Run a specific task manually"""
         self.logger.info(f"Running manual task: {task}")
         
-        task_map = {
-            "content": self.run_content_generation,
-            "products": self.run_product_tracking,
-            "blog": self.run_blog_automation,
-            "full": self.run_full_update
-        }
-        
-        if task in task_map:
+        if task in TASKS:
             try:
-                task_map[task]()
+                if self.profile or self.profile_sql:
+                    from profiling import Profiler
+                    with Profiler(task, mode=self.profile, trace_sql=self.profile_sql, logger=self.logger):
+                        getattr(self, TASKS[task])()
+                else:
+                    getattr(self, TASKS[task])()
                 self.save_status()
                 self.logger.info(f"✅ Manual task '{task}' completed successfully")
             except Exception as e:
                 self.logger.error(f"❌ Manual task '{task}' failed: {e}")
         else:
             self.logger.error(f"Unknown task: {task}")
-            self.logger.info(f"Available tasks: {list(task_map.keys())}")
+            self.logger.info(f"Available tasks: {list(TASKS)}")
+
+    def enqueue_task(self, task: str) -> int:
+        """Queue a task for the worker processes; a task already waiting is not queued twice"""
+        job_id = self.queue.enqueue(task, unique=True)
+        if job_id:
+            self.logger.info(f"Queued task '{task}' as job {job_id}")
+        else:
+            self.logger.info(f"Task '{task}' is already queued or running")
+        return job_id
+
+    def run_worker(self, worker_id: str, stop_event=None, poll_interval: float = WORKER_POLL_INTERVAL):
+        """Claim and run queued jobs until stop_event is set"""
+        self.logger.info(f"Worker {worker_id} started")
+        stop_event = stop_event or threading.Event()
+        job = None
+        
+        try:
+            while not stop_event.is_set():
+                job = self.queue.claim(worker_id, list(TASKS))
+                if not job:
+                    stop_event.wait(poll_interval)
+                    continue
+                
+                self.logger.info(f"Worker {worker_id} running job {job.id} ({job.task}, attempt {job.attempts})")
+                try:
+                    # A retried job picks up from the failed attempt's checkpoints
+                    self.resume = job.attempts > 1
+                    with self.queue.keep_alive(job, worker_id):
+                        getattr(self, TASKS[job.task])()
+                except Exception as e:
+                    status = self.queue.fail(job.id, worker_id, str(e))
+                    self.logger.error(f"❌ Job {job.id} ({job.task}) failed, now {status}: {e}")
+                else:
+                    self.queue.complete(job.id, worker_id)
+                    self.save_status()
+                    self.logger.info(f"✅ Job {job.id} ({job.task}) completed")
+                job = None
+        except KeyboardInterrupt:
+            if job:
+                self.queue.release(job.id, worker_id)
+        
+        self.logger.info(f"Worker {worker_id} stopped")
+
+    def start_workers(self, count: int, stop_event) -> list:
+        """Start worker processes that share the job queue"""
+        import multiprocessing
+        import socket
+
+        processes = []
+        for index in range(count):
+            worker_id = f"{socket.gethostname()}-{os.getpid()}-{index + 1}"
+            process = multiprocessing.Process(target=_worker_main, args=(self.config_file, worker_id, stop_event),
+                                              name=f"worker-{index + 1}")
+            process.start()
+            processes.append(process)
+        self.logger.info(f"Started {count} worker processes")
+        return processes
+
+def _worker_main(config_file: str, worker_id: str, stop_event):
+    """Entry point of a worker process"""
+    # On SIGTERM the parent sets stop_event, so the current job finishes before the worker exits
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    # Each worker writes its own log file so processes never rotate the same file
+    automation = MasterAutomationSystem(config_file, log_name=f"worker-{worker_id}")
+    automation.run_worker(worker_id, stop_event)
+    automation.stop_notifier()
+    # Worker processes exit without running atexit hooks
+    stop_logging()
+
+def run_worker_pool(automation: MasterAutomationSystem, workers: int, with_scheduler: bool = False):
+    """Run worker processes, optionally with the scheduler feeding them, until interrupted"""
+    # Only the worker pool needs multiprocessing, so single tasks don't import it
+    import multiprocessing
+
+    stop_event = multiprocessing.Event()
+    processes = automation.start_workers(workers, stop_event)
+    
+    def shutdown(*_):
+        stop_event.set()
+        if automation.scheduler:
+            automation.scheduler.stop()
+    signal.signal(signal.SIGTERM, shutdown)
+    
+    try:
+        if with_scheduler:
+            automation.setup_scheduler(use_queue=True)
+            automation.run_scheduler()
+        else:
+            for process in processes:
+                process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        for process in processes:
+            process.join()
 
 def main():
     """Main function with command line interface"""
     parser = argparse.ArgumentParser(description="Virginia Home Essentials - Master Automation System")
-    parser.add_argument("--task", choices=["content", "products", "blog", "full", "schedule"], 
-                       help="Run specific task or start scheduler")
+    parser.add_argument("--task", choices=["content", "products", "blog", "full", "schedule", "worker"], 
+                       help="Run specific task, start scheduler, or start queue workers")
+    parser.add_argument("--workers", type=int, default=0,
+                       help="Worker processes; with --task schedule, due jobs run on these workers")
+    parser.add_argument("--enqueue", choices=list(TASKS), action="append",
+                       help="Queue a task for the worker processes")
+    parser.add_argument("--resume", action="store_true",
+                       help="Continue the last unfinished run of the task instead of starting over")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILE_MODES,
+                       help="Profile the task; writes .pstats and collapsed stacks to reports/ (default: cprofile)")
+    parser.add_argument("--profile-sql", action="store_true",
+                       help="Time every SQLite statement the task runs and log the slowest")
     parser.add_argument("--config", default="automation_config.json", 
                        help="Configuration file path")
     
@@ -444,15 +690,27 @@ def main():
     
     # Initialize system
     automation = MasterAutomationSystem(args.config)
+    automation.resume = args.resume
+    automation.profile = args.profile
+    automation.profile_sql = args.profile_sql
+    
+    if args.enqueue:
+        for task in args.enqueue:
+            automation.enqueue_task(task)
     
-    if args.task == "schedule":
+    if args.task == "worker":
+        run_worker_pool(automation, max(1, args.workers))
+    elif args.task == "schedule" and args.workers:
+        # Scheduler enqueues due jobs, worker processes run them
+        run_worker_pool(automation, args.workers, with_scheduler=True)
+    elif args.task == "schedule":
         # Run continuous scheduler
         automation.setup_scheduler()
         automation.run_scheduler()
     elif args.task:
         # Run specific task
         automation.run_manual_task(args.task)
-    else:
+    elif not args.enqueue:
         # Interactive mode
         print("\nAvailable commands:")
         print("1. content  - Generate AI content and product recommendations")
@@ -487,6 +745,8 @@ def main():
             except Exception as e:
                 print(f"Error: {e}")
     
+    # Deliver alerts still waiting in the outbox before exiting
+    automation.stop_notifier()
     print("\n✅ Automation system shutdown complete")
 
 if __name__ == "__main__":
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Benchmark Suite
+Runs the product and blog hot paths against seeded synthetic data at several scales and checks them against a baseline
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from blog_automation import BlogAutomationSystem
+from export_blog_posts import export_blog_pages, export_blog_posts
+from feed_generator import FeedGenerator
+from product_tracker import AmazonProductTracker, Product
+
+ADMIN_DIR = Path(__file__).resolve().parent
+# generate_sitemap.py lives in the site root
+sys.path.append(str(ADMIN_DIR.parent))
+import generate_sitemap  # noqa: E402
+
+BASELINE_FILE = ADMIN_DIR / "benchmark_baseline.json"
+REPORT_DIR = ADMIN_DIR / "reports"
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000)
+DEFAULT_SEED = 42
+DEFAULT_TOLERANCE = 0.25
+# Timings below this are too noisy to call a regression
+MIN_SIGNIFICANT_MS = 5.0
+
+PRICE_POINTS = 5  # price history rows per product
+PUBLISH_BATCH = 20  # posts scheduled for today before each publish run
+PRODUCTS_PER_KEYWORD = 5  # what update_all_products asks the search for
+
+POST_COLUMNS = ("id, title, slug, content, excerpt, category, tags, author, publish_date, status, "
+                "seo_title, meta_description, featured_image, read_time, affiliate_products, "
+                "created_at, updated_at")
+
+
+class SyntheticData:
+    """Seeded generator for products, price history, content ideas and blog posts"""
+
+    CATEGORIES = ["smart_home", "security", "kitchen", "tools", "decor"]
+    WORDS = ("smart thermostat doorbell camera lock sensor alarm kitchen cooker blender drill driver "
+             "lighting energy savings winter summer spring fall maintenance checklist budget guide "
+             "richmond norfolk alexandria beach county buyer closing inspection insurance mortgage "
+             "storage garage garden patio decor furniture cleaning organization safety wifi voice").split()
+
+    def __init__(self, seed: int = DEFAULT_SEED):
+        self.rng = random.Random(seed)
+        self.now = datetime.datetime.now()
+        self._post_count = 0
+
+    def _text(self, words: int) -> str:
+        return " ".join(self.rng.choice(self.WORDS) for _ in range(words))
+
+    def _timestamp(self, max_days: int) -> str:
+        return (self.now - datetime.timedelta(seconds=self.rng.randint(0, max_days * 86400))).isoformat()
+
+    def products(self, count: int, category: str, prefix: str) -> List[Product]:
+        """Products with stable ASINs per prefix and a fresh price on every call"""
+        products = []
+        for i in range(count):
+            asin = f"{prefix}{i:03d}"
+            rating = round(self.rng.uniform(3.0, 5.0), 1)
+            reviews = self.rng.randint(10, 250_000)
+            products.append(Product(
+                asin=asin,
+                title=self._text(6).title(),
+                price=round(self.rng.uniform(9.99, 499.99), 2),
+                rating=rating,
+                review_count=reviews,
+                category=category,
+                image_url=f"https://images.example.com/{asin}.jpg",
+                affiliate_url=f"https://amazon.com/dp/{asin}?tag=benchmark-20",
+                last_updated=self.now.isoformat(),
+                trending_score=round(rating / 5 * 0.4 + min(reviews / 100000, 1.0) * 0.4 + 0.1, 2),
+                availability="In Stock",
+                prime_eligible=self.rng.random() < 0.8
+            ))
+        return products
+
+    def catalog(self, count: int) -> List[Product]:
+        """count products spread over the categories"""
+        products = []
+        for index in range(0, count, PRODUCTS_PER_KEYWORD):
+            category = self.CATEGORIES[index // PRODUCTS_PER_KEYWORD % len(self.CATEGORIES)]
+            products += self.products(min(PRODUCTS_PER_KEYWORD, count - index), category, f"B{index:06d}")
+        return products
+
+    def price_history(self, products: List[Product], points: int = PRICE_POINTS) -> List[Tuple]:
+        """Older prices within +-30% of the current one, spread over the last 90 days"""
+        return [(p.asin, round(p.price * self.rng.uniform(0.7, 1.3), 2), self._timestamp(90))
+                for p in products for _ in range(points)]
+
+    def ideas(self, count: int) -> List[Tuple]:
+        """Rows for content_ideas"""
+        return [(self._text(5).title(), self.rng.choice(self.CATEGORIES), json.dumps(self._text(3).split()),
+                 self.rng.choice(["winter", "spring", "summer", "fall", "all"]), round(self.rng.random(), 3),
+                 "new homeowners", self.rng.choice(["guide", "review", "checklist"]),
+                 self.rng.choice(["pending", "used"]), self._timestamp(180)) for _ in range(count)]
+
+    def posts(self, count: int, status: str, publish_date: Optional[str] = None) -> List[Tuple]:
+        """Rows for blog_posts, with unique ids and slugs across calls"""
+        rows = []
+        for _ in range(count):
+            self._post_count += 1
+            title = self._text(7).title()
+            created = self._timestamp(365)
+            rows.append((
+                f"post-{self._post_count:07d}", title, f"{title.lower().replace(' ', '-')}-{self._post_count}",
+                "\n\n".join(f"## {self._text(4).title()}\n\n{self._text(60)}" for _ in range(3)),
+                self._text(25), self.rng.choice(self.CATEGORIES), json.dumps(self._text(4).split()),
+                "Virginia Home Essentials", publish_date or created, status, title, self._text(20),
+                "", "5 min read", "[]", created, created
+            ))
+        return rows
+
+
+class SyntheticProductTracker(AmazonProductTracker):
+    """Tracker whose simulated search returns synthetic products for any keyword, without the rate limit"""
+
+    def __init__(self, data: SyntheticData, products: int, db_path: str):
+        super().__init__("benchmark-20", db_path=db_path)
+        self.data = data
+        self.request_delay = 0
+        self.latencies: List[float] = []
+        keywords = max(1, products // PRODUCTS_PER_KEYWORD)
+        self.target_categories = {
+            category: [f"{category} {k:06d}" for k in range(index, keywords, len(data.CATEGORIES))]
+            for index, category in enumerate(data.CATEGORIES)
+        }
+
+    def _get_simulated_products(self, keyword: str, category: str, max_results: int) -> List[Product]:
+        return self.data.products(max_results, category, f"B{keyword.split()[-1]}")
+
+    def search_amazon_products(self, keyword: str, category: str, max_results: int = 20) -> List[Product]:
+        started = time.perf_counter()
+        products = super().search_amazon_products(keyword, category, max_results)
+        self.latencies.append(time.perf_counter() - started)
+        return products
+
+
+@dataclass
+class Benchmark:
+    """setup builds the fixture; run returns (items processed, per-unit latencies or None)"""
+    setup: Callable[[SyntheticData, int, Path], Dict[str, Any]]
+    run: Callable[[Dict[str, Any]], Tuple[int, Optional[List[float]]]]
+    reset: Optional[Callable[[Dict[str, Any]], None]] = None
+
+
+def _load_catalog(data: SyntheticData, scale: int, workdir: Path) -> Dict[str, Any]:
+    tracker = AmazonProductTracker("benchmark-20", db_path=str(workdir / "products.db"))
+    products = data.catalog(scale)
+    conn = tracker.connect()
+    conn.executemany('''
+        INSERT INTO products (asin, title, price, rating, review_count, category, image_url,
+                              affiliate_url, last_updated, trending_score, availability, prime_eligible)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(p.asin, p.title, p.price, p.rating, p.review_count, p.category, p.image_url, p.affiliate_url,
+           p.last_updated, p.trending_score, p.availability, p.prime_eligible) for p in products])
+    conn.executemany('INSERT INTO price_history (asin, price, timestamp) VALUES (?, ?, ?)',
+                     data.price_history(products))
+    conn.commit()
+    conn.close()
+    return {"tracker": tracker, "history": scale * PRICE_POINTS}
+
+
+def _load_blog(data: SyntheticData, workdir: Path, published: int = 0, drafts: int = 0,
+               related: bool = False) -> BlogAutomationSystem:
+    blog = BlogAutomationSystem(db_path=str(workdir / "blog_system.db"), blog_dir=str(workdir / "blog"))
+    conn = blog.connect()
+    placeholders = ",".join("?" * 17)
+    conn.executemany(f'INSERT INTO blog_posts ({POST_COLUMNS}) VALUES ({placeholders})',
+                     data.posts(published, "published") + data.posts(drafts, "draft"))
+    conn.executemany('''
+        INSERT INTO content_ideas (topic, category, keywords, seasonal_relevance, priority_score,
+                                   target_audience, content_type, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', data.ideas(max(published, drafts) // 10))
+    conn.commit()
+    if related:
+        # Publishing scores new posts against the existing graph, so build it up front
+        blog.related_posts.rebuild(conn)
+        conn.commit()
+    conn.close()
+    return blog
+
+
+def _schedule_batch(state: Dict[str, Any]):
+    """Put a batch of new drafts on today's publishing schedule"""
+    blog, data = state["blog"], state["data"]
+    today = data.now.isoformat()
+    rows = data.posts(PUBLISH_BATCH, "scheduled", today)
+    conn = blog.connect()
+    conn.executemany(f'INSERT INTO blog_posts ({POST_COLUMNS}) VALUES ({",".join("?" * 17)})', rows)
+    conn.executemany("INSERT INTO publishing_schedule (post_id, scheduled_date, status) VALUES (?, ?, 'scheduled')",
+                     [(row[0], today) for row in rows])
+    conn.commit()
+    conn.close()
+
+
+def _unschedule(state: Dict[str, Any]):
+    conn = state["blog"].connect()
+    conn.execute("UPDATE blog_posts SET status = 'draft' WHERE status = 'scheduled'")
+    conn.execute('DELETE FROM publishing_schedule')
+    conn.commit()
+    conn.close()
+
+
+def _setup_update(data: SyntheticData, scale: int, workdir: Path) -> Dict[str, Any]:
+    return {"tracker": SyntheticProductTracker(data, scale, str(workdir / "products.db"))}
+
+
+def _run_update(state: Dict[str, Any]) -> Tuple[int, List[float]]:
+    tracker = state["tracker"]
+    tracker.latencies = []
+    return tracker.update_all_products(), tracker.latencies
+
+
+def _setup_drafts(data: SyntheticData, scale: int, workdir: Path) -> Dict[str, Any]:
+    return {"blog": _load_blog(data, workdir, drafts=scale), "scale": scale}
+
+
+def _setup_publish(data: SyntheticData, scale: int, workdir: Path) -> Dict[str, Any]:
+    state = {"blog": _load_blog(data, workdir, published=scale, related=True), "data": data}
+    _schedule_batch(state)
+    return state
+
+
+def _setup_corpus(data: SyntheticData, scale: int, workdir: Path) -> Dict[str, Any]:
+    blog = _load_blog(data, workdir, published=scale)
+    return {"blog": blog, "workdir": workdir, "feeds": FeedGenerator(blog.db_path, str(workdir / "feeds")),
+            "scale": scale}
+
+
+def _run_monitor(state: Dict[str, Any]) -> Tuple[int, None]:
+    state["tracker"].monitor_price_changes()
+    return state["history"], None
+
+
+def _run_schedule(state: Dict[str, Any]) -> Tuple[int, None]:
+    # schedule_posts reads every draft to pick the next 20
+    state["blog"].schedule_posts(3)
+    return state["scale"], None
+
+
+def _run_publish(state: Dict[str, Any]) -> Tuple[int, None]:
+    return state["blog"].publish_scheduled_posts(), None
+
+
+def _run_export_posts(state: Dict[str, Any]) -> Tuple[int, None]:
+    posts = export_blog_posts(str(state["workdir"] / "posts.json"), db_path=state["blog"].db_path)
+    return len(posts or []), None
+
+
+def _run_export_pages(state: Dict[str, Any]) -> Tuple[int, None]:
+    export_blog_pages(str(state["workdir"] / "pages"), db_path=state["blog"].db_path)
+    return state["scale"], None
+
+
+def _run_feeds(state: Dict[str, Any]) -> Tuple[int, None]:
+    # Remove the previous output so every run writes all feeds instead of skipping unchanged ones
+    for path in state["workdir"].glob("feeds/**/*"):
+        if path.is_file():
+            path.unlink()
+    return state["feeds"].generate_feeds(), None
+
+
+def _run_sitemap(state: Dict[str, Any]) -> Tuple[int, None]:
+    # Keep the regeneration state of the real site untouched
+    state_file, generate_sitemap.STATE_FILE = generate_sitemap.STATE_FILE, state["workdir"] / "sitemap_state.json"
+    try:
+        generate_sitemap.generate_sitemap("https://benchmark.invalid", output_dir=state["workdir"],
+                                          db_path=state["blog"].db_path)
+    finally:
+        generate_sitemap.STATE_FILE = state_file
+    return state["scale"], None
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "update_all_products": Benchmark(_setup_update, _run_update),
+    "monitor_price_changes": Benchmark(_load_catalog, _run_monitor),
+    "schedule_posts": Benchmark(_setup_drafts, _run_schedule, _unschedule),
+    "publish_scheduled_posts": Benchmark(_setup_publish, _run_publish, _schedule_batch),
+    "export_blog_posts": Benchmark(_setup_corpus, _run_export_posts),
+    "export_blog_pages": Benchmark(_setup_corpus, _run_export_pages),
+    "generate_feeds": Benchmark(_setup_corpus, _run_feeds),
+    "generate_sitemap": Benchmark(_setup_corpus, _run_sitemap),
+}
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+def measure(name: str, scale: int, seed: int = DEFAULT_SEED, repeat: int = 3) -> Dict[str, Any]:
+    """Time repeat runs of a benchmark, then one more under tracemalloc for peak memory"""
+    benchmark = BENCHMARKS[name]
+    with tempfile.TemporaryDirectory(prefix="vhe-bench-") as tmp:
+        data = SyntheticData(seed)
+        started = time.perf_counter()
+        state = benchmark.setup(data, scale, Path(tmp))
+        setup_seconds = time.perf_counter() - started
+
+        latencies: List[float] = []
+        items = 0
+        elapsed = 0.0
+        peak = 0
+        for run in range(repeat + 1):
+            if run and benchmark.reset:
+                benchmark.reset(state)
+            traced = run == repeat
+            if traced:
+                tracemalloc.start()
+            # Library code prints progress; keep it out of the results table
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                run_items, units = benchmark.run(state)
+                run_elapsed = time.perf_counter() - started
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                latencies.extend(units or [run_elapsed])
+                items += run_items
+                elapsed += run_elapsed
+
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "runs": repeat,
+        "items": items,
+        "setup_s": round(setup_seconds, 2),
+        "throughput": round(items / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "peak_mb": round(peak / 1024 / 1024, 2)
+    }
+
+
+def load_baseline(path: Path) -> Optional[Dict]:
+    if path.exists():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Return a list of regressions against the baseline"""
+    failures = []
+    for result in results:
+        key = f"{result['benchmark']}@{result['scale']}"
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            continue
+
+        if base["throughput"] and result["throughput"] < base["throughput"] * (1 - tolerance):
+            failures.append(f"{key}: throughput {result['throughput']}/s below baseline {base['throughput']}/s")
+        if result["p95_ms"] > max(base["p95_ms"] * (1 + tolerance), MIN_SIGNIFICANT_MS):
+            failures.append(f"{key}: p95 {result['p95_ms']} ms above baseline {base['p95_ms']} ms")
+        if result["peak_mb"] > max(base["peak_mb"] * (1 + tolerance), 1.0):
+            failures.append(f"{key}: peak memory {result['peak_mb']} MB above baseline {base['peak_mb']} MB")
+
+    return failures
+
+
+def main():
+    """Run the benchmarks, save the results and fail on regressions against the baseline"""
+    parser = argparse.ArgumentParser(description="Virginia Home Essentials - Benchmark Suite")
+    parser.add_argument("--bench", choices=list(BENCHMARKS), action="append",
+                        help="Benchmark to run (default: all)")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="Comma-separated row counts, e.g. 10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark and scale")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Synthetic data seed")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, help="Allowed slowdown as a fraction (default: from baseline)")
+    parser.add_argument("--update", action="store_true", help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    print("Virginia Home Essentials - Benchmark Suite")
+    print("=" * 50)
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+    results = []
+    print(f"{'benchmark':<24} {'scale':>9} {'items/s':>11} {'p50 ms':>10} {'p95 ms':>10} {'peak MB':>9}")
+    for name in args.bench or BENCHMARKS:
+        for scale in scales:
+            result = measure(name, scale, args.seed, max(1, args.repeat))
+            results.append(result)
+            print(f"{name:<24} {scale:>9} {result['throughput']:>11.1f} {result['p50_ms']:>10.2f} "
+                  f"{result['p95_ms']:>10.2f} {result['peak_mb']:>9.2f}")
+
+    report = {
+        "generated_at": datetime.datetime.now().isoformat(),
+        "seed": args.seed,
+        "python": sys.version.split()[0],
+        "results": {f"{r['benchmark']}@{r['scale']}": r for r in results}
+    }
+    REPORT_DIR.mkdir(exist_ok=True)
+    report_file = REPORT_DIR / f"benchmark_{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {report_file}")
+
+    baseline = load_baseline(args.baseline)
+
+    if args.update:
+        if baseline:
+            # Keep entries for benchmarks and scales this run skipped
+            report["results"] = {**baseline.get("results", {}), **report["results"]}
+        report["tolerance"] = args.tolerance if args.tolerance is not None else \
+            (baseline or {}).get("tolerance", DEFAULT_TOLERANCE)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline updated: {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"⚠️  No baseline at {args.baseline}; run with --update to record one")
+        return
+
+    if baseline.get("seed") != args.seed:
+        print(f"⚠️  Baseline was recorded with seed {baseline.get('seed')}, this run used {args.seed}")
+
+    tolerance = args.tolerance if args.tolerance is not None else baseline.get("tolerance", DEFAULT_TOLERANCE)
+    failures = compare(results, baseline, tolerance)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+    print(f"✅ No regressions against baseline (tolerance {tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
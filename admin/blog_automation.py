@@ -11,11 +11,18 @@ import re
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 import sqlite3
-import requests
 from pathlib import Path
-import markdown
-import schedule
 import time
+import logging
+
+from build_assets import fingerprint_html
+from db_lock import write_lock
+from db_stats import ensure_table_stats, table_stats
+from search_index import ensure_search_index, export_search_index, search_posts
+from export_blog_posts import export_blog_pages
+from feed_generator import FeedGenerator
+from image_pipeline import image_url, picture_html
+from log_setup import setup_logging
 
 # SQLite timeout configuration for concurrent access
 DEFAULT_SQLITE_TIMEOUT = 30  # seconds
@@ -49,13 +56,18 @@ class ContentIdea:
     content_type: str  # guide, review, comparison, news
 
 class BlogAutomationSystem:
-    def __init__(self, openai_api_key: str = None):
+    def __init__(self, openai_api_key: str = None, logger: logging.Logger = None,
+                 db_path: str = "blog_system.db", blog_dir: str = "../blog"):
         """Initialize the blog automation system"""
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
-        self.db_path = "blog_system.db"
-        self.blog_dir = "../blog"
-        self.init_database()
+        self.logger = logger or logging.getLogger("BlogAutomation")
+        self.db_path = db_path
+        self.blog_dir = blog_dir
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
         self.init_blog_directory()
+        self._related_posts = None
+        self.feeds = FeedGenerator(self.db_path, f"{self.blog_dir}/feeds")
         
         # Virginia-specific content themes
         self.content_themes = {
@@ -143,9 +155,45 @@ class BlogAutomationSystem:
             )
         ''')
         
+        # Full-text search index kept in sync by triggers on blog_posts
+        ensure_search_index(conn)
+        
+        # Trigger-maintained counts by status and category
+        ensure_table_stats(conn, "blog_posts", ["status", "category"])
+        ensure_table_stats(conn, "publishing_schedule", ["status"])
+        
         conn.commit()
         conn.close()
 
+    @property
+    def related_posts(self):
+        """Related posts engine, built on first use since it pulls in numpy"""
+        if self._related_posts is None:
+            from related_posts import RelatedPostsEngine
+            self._related_posts = RelatedPostsEngine(self.db_path, f"{self.blog_dir}/related.json")
+        return self._related_posts
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            with write_lock(self.db_path, "blog schema"):
+                self.init_database()
+            self._schema_ready = True
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        # REPLACE only fires the search index and stats delete triggers with recursive triggers on
+        conn.execute("PRAGMA recursive_triggers = ON")
+        return conn
+
+    def stats(self) -> Dict[str, Any]:
+        """Post and schedule counts by status and category, without scanning the tables"""
+        conn = self.connect()
+        stats = {
+            "posts": table_stats(conn, "blog_posts"),
+            "schedule": table_stats(conn, "publishing_schedule")
+        }
+        conn.close()
+        return stats
+
     def init_blog_directory(self):
         """Initialize blog directory structure"""
         Path(self.blog_dir).mkdir(exist_ok=True)
@@ -219,23 +267,24 @@ class BlogAutomationSystem:
 
     def _save_content_ideas(self, ideas: List[ContentIdea]):
         """Save content ideas to database"""
-        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
-        cursor = conn.cursor()
-        
-        for idea in ideas:
-            cursor.execute('''
-                INSERT OR IGNORE INTO content_ideas 
-                (topic, category, keywords, seasonal_relevance, priority_score, 
-                 target_audience, content_type, status, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                idea.topic, idea.category, json.dumps(idea.keywords),
-                idea.seasonal_relevance, idea.priority_score, idea.target_audience,
-                idea.content_type, "pending", datetime.datetime.now().isoformat()
-            ))
-        
-        conn.commit()
-        conn.close()
+        with write_lock(self.db_path, "save ideas"):
+            conn = self.connect()
+            cursor = conn.cursor()
+            
+            for idea in ideas:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO content_ideas 
+                    (topic, category, keywords, seasonal_relevance, priority_score, 
+                     target_audience, content_type, status, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    idea.topic, idea.category, json.dumps(idea.keywords),
+                    idea.seasonal_relevance, idea.priority_score, idea.target_audience,
+                    idea.content_type, "pending", datetime.datetime.now().isoformat()
+                ))
+            
+            conn.commit()
+            conn.close()
 
     def generate_blog_post(self, content_idea: ContentIdea) -> BlogPost:
         """Generate a complete blog post from a content idea"""
@@ -783,7 +832,9 @@ Remember, every Virginia home and homeowner situation is unique. Use this guide
             "homeowner-guides": "https://images.unsplash.com/photo-1558618047-3c8c76ca7d13?w=800&h=400"
         }
         
-        return image_map.get(category, "https://images.unsplash.com/photo-1560518883-ce09059eeffa?w=800&h=400")
+        fallback = image_map.get(category, "https://images.unsplash.com/photo-1560518883-ce09059eeffa?w=800&h=400")
+        # A processed images/featured/<category>.* takes precedence over the hot-linked photo
+        return image_url(f"featured/{category}", fallback)
 
     def _calculate_read_time(self, content: str) -> str:
         """Calculate estimated read time"""
@@ -811,105 +862,146 @@ Remember, every Virginia home and homeowner situation is unique. Use this guide
 
     def _save_blog_post(self, post: BlogPost):
         """Save blog post to database"""
-        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO blog_posts 
-            (id, title, slug, content, excerpt, category, tags, author, publish_date,
-             status, seo_title, meta_description, featured_image, read_time, 
-             affiliate_products, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            post.id, post.title, post.slug, post.content, post.excerpt,
-            post.category, json.dumps(post.tags), post.author, post.publish_date,
-            post.status, post.seo_title, post.meta_description, post.featured_image,
-            post.read_time, json.dumps(post.affiliate_products),
-            datetime.datetime.now().isoformat(), datetime.datetime.now().isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        with write_lock(self.db_path, "save post"):
+            conn = self.connect()
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO blog_posts 
+                (id, title, slug, content, excerpt, category, tags, author, publish_date,
+                 status, seo_title, meta_description, featured_image, read_time, 
+                 affiliate_products, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                post.id, post.title, post.slug, post.content, post.excerpt,
+                post.category, json.dumps(post.tags), post.author, post.publish_date,
+                post.status, post.seo_title, post.meta_description, post.featured_image,
+                post.read_time, json.dumps(post.affiliate_products),
+                datetime.datetime.now().isoformat(), datetime.datetime.now().isoformat()
+            ))
+            
+            conn.commit()
+            conn.close()
 
     def schedule_posts(self, posts_per_week: int = 3):
         """Schedule blog posts for publication"""
-        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
-        cursor = conn.cursor()
-        
-        # Get draft posts
-        cursor.execute('SELECT * FROM blog_posts WHERE status = "draft" ORDER BY created_at')
-        draft_posts = cursor.fetchall()
-        
-        # Schedule posts
-        start_date = datetime.datetime.now()
-        days_between_posts = 7 // posts_per_week
-        
-        for i, post_row in enumerate(draft_posts[:20]):  # Schedule next 20 posts
-            post_id = post_row[0]
-            publish_date = start_date + datetime.timedelta(days=i * days_between_posts)
+        # Selecting and scheduling drafts under one lock keeps two runs from scheduling the same post
+        with write_lock(self.db_path, "schedule posts"):
+            conn = self.connect()
+            cursor = conn.cursor()
             
-            # Update post status and publish date
-            cursor.execute('''
-                UPDATE blog_posts 
-                SET status = "scheduled", publish_date = ?, updated_at = ?
-                WHERE id = ?
-            ''', (publish_date.isoformat(), datetime.datetime.now().isoformat(), post_id))
+            # Get draft posts
+            cursor.execute('SELECT * FROM blog_posts WHERE status = "draft" ORDER BY created_at')
+            draft_posts = cursor.fetchall()
             
-            # Add to publishing schedule
-            cursor.execute('''
-                INSERT INTO publishing_schedule (post_id, scheduled_date, status)
-                VALUES (?, ?, "scheduled")
-            ''', (post_id, publish_date.isoformat()))
-        
-        conn.commit()
-        conn.close()
+            # Schedule posts
+            start_date = datetime.datetime.now()
+            days_between_posts = 7 // posts_per_week
+            
+            for i, post_row in enumerate(draft_posts[:20]):  # Schedule next 20 posts
+                post_id = post_row[0]
+                publish_date = start_date + datetime.timedelta(days=i * days_between_posts)
+                
+                # Update post status and publish date
+                cursor.execute('''
+                    UPDATE blog_posts 
+                    SET status = "scheduled", publish_date = ?, updated_at = ?
+                    WHERE id = ?
+                ''', (publish_date.isoformat(), datetime.datetime.now().isoformat(), post_id))
+                
+                # Add to publishing schedule
+                cursor.execute('''
+                    INSERT INTO publishing_schedule (post_id, scheduled_date, status)
+                    VALUES (?, ?, "scheduled")
+                ''', (post_id, publish_date.isoformat()))
+            
+            conn.commit()
+            conn.close()
         
-        print(f"Scheduled {min(len(draft_posts), 20)} posts for publication")
+        self.logger.info(f"Scheduled {min(len(draft_posts), 20)} posts for publication")
 
     def publish_scheduled_posts(self):
         """Publish posts that are scheduled for today"""
-        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
-        cursor = conn.cursor()
-        
-        today = datetime.datetime.now().date().isoformat()
-        
-        # Get posts scheduled for today
-        cursor.execute('''
-            SELECT bp.* FROM blog_posts bp
-            JOIN publishing_schedule ps ON bp.id = ps.post_id
-            WHERE DATE(ps.scheduled_date) = ? AND ps.status = "scheduled"
-        ''', (today,))
-        
-        scheduled_posts = cursor.fetchall()
-        
-        for post_row in scheduled_posts:
-            post_id = post_row[0]
+        # Held until the commit so a concurrent run cannot publish the same posts twice;
+        # the exports below only read
+        with write_lock(self.db_path, "publish posts"):
+            conn = self.connect()
+            cursor = conn.cursor()
             
-            # Create HTML file
-            self._create_html_file(post_row)
+            today = datetime.datetime.now().date().isoformat()
             
-            # Update status
+            # Get posts scheduled for today
             cursor.execute('''
-                UPDATE blog_posts 
-                SET status = "published", updated_at = ?
-                WHERE id = ?
-            ''', (datetime.datetime.now().isoformat(), post_id))
+                SELECT bp.* FROM blog_posts bp
+                JOIN publishing_schedule ps ON bp.id = ps.post_id
+                WHERE DATE(ps.scheduled_date) = ? AND ps.status = "scheduled"
+            ''', (today,))
             
-            cursor.execute('''
-                UPDATE publishing_schedule 
-                SET status = "published"
-                WHERE post_id = ?
-            ''', (post_id,))
+            scheduled_posts = cursor.fetchall()
+            affected_ids = set()
+            
+            # The engine creates its tables on its own connection, so build it
+            # before the updates below start a write transaction
+            related_posts = self.related_posts if scheduled_posts else None
+            
+            for post_row in scheduled_posts:
+                post_id = post_row[0]
+                
+                # Update status
+                cursor.execute('''
+                    UPDATE blog_posts 
+                    SET status = "published", updated_at = ?
+                    WHERE id = ?
+                ''', (datetime.datetime.now().isoformat(), post_id))
+                
+                cursor.execute('''
+                    UPDATE publishing_schedule 
+                    SET status = "published"
+                    WHERE post_id = ?
+                ''', (post_id,))
+                
+                # Add to the related posts graph; older posts whose neighbor lists
+                # changed get their pages re-rendered below
+                affected_ids |= related_posts.add_post(conn, post_row)
+                
+                self.logger.info(f"Published: {post_row[1]}", extra={"post_id": post_id})
+            
+            if affected_ids:
+                # Create HTML files for new posts and refresh affected related sections
+                placeholders = ",".join("?" * len(affected_ids))
+                cursor.execute(f'''
+                    SELECT * FROM blog_posts
+                    WHERE status = "published" AND id IN ({placeholders})
+                ''', list(affected_ids))
+                
+                for post_row in cursor.fetchall():
+                    related_html = related_posts.render_related_html(conn, post_row[0])
+                    self._create_html_file(post_row, related_html)
+                
+                related_posts.export_json(conn)
             
-            print(f"Published: {post_row[1]}")  # Title
+            conn.commit()
+            conn.close()
         
-        conn.commit()
-        conn.close()
+        if scheduled_posts:
+            export_search_index(f"{self.blog_dir}/search", db_path=self.db_path)
+            export_blog_pages(f"{self.blog_dir}/pages", db_path=self.db_path)
+            # Only the site feed and the categories that gained a post change
+            self.feeds.generate_feeds({post_row[5] for post_row in scheduled_posts})
         
         return len(scheduled_posts)
 
-    def _create_html_file(self, post_row):
+    def search_posts(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Full-text search over published posts"""
+        conn = self.connect()
+        results = search_posts(conn, query, limit)
+        conn.close()
+        return results
+
+    def _create_html_file(self, post_row, related_html: str = ""):
         """Create HTML file for published post"""
+        import markdown
+
         post_id, title, slug, content, excerpt, category, tags, author, publish_date, status, seo_title, meta_description, featured_image, read_time, affiliate_products, created_at, updated_at = post_row
         
         html_content = f"""<!DOCTYPE html>
@@ -931,7 +1023,7 @@ Remember, every Virginia home and homeowner situation is unique. Use this guide
     
     <article class="blog-post">
         <header class="post-header">
-            <img src="{featured_image}" alt="{title}" class="featured-image">
+            {picture_html(featured_image, title, "featured-image")}
             <div class="post-meta">
                 <h1>{title}</h1>
                 <div class="meta-info">
@@ -968,15 +1060,15 @@ Remember, every Virginia home and homeowner situation is unique. Use this guide
     
     <aside class="related-posts">
         <h3>Related Articles</h3>
-        <!-- Related posts would be dynamically generated -->
+        {related_html}
     </aside>
 </body>
 </html>"""
         
-        # Save HTML file
+        # Save HTML file, pointing at the fingerprinted assets of the last build
         file_path = f"{self.blog_dir}/posts/{slug}.html"
         with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write(fingerprint_html(html_content))
 
     def generate_content_calendar(self, months: int = 6) -> Dict[str, List[Dict]]:
         """Generate content calendar for specified months"""
@@ -1005,31 +1097,49 @@ Remember, every Virginia home and homeowner situation is unique. Use this guide
         
         return calendar
 
-    def run_automation(self):
-        """Run the complete blog automation process"""
-        print("Starting blog automation process...")
+    def run_automation(self, checkpoint=None):
+        """Run the complete blog automation process.
+        
+        With a run_state Checkpoint, steps and posts finished by an earlier
+        attempt are skipped. Every unit is safe to redo: posts are replaced
+        by slug and scheduling/publishing only pick up posts not yet handled.
+        """
+        self.logger.info("Starting blog automation process...")
+        if checkpoint and checkpoint.resumed:
+            self.logger.info(f"Resuming: {checkpoint.completed('posts')} posts already created")
         
         # 1. Generate content ideas
-        print("1. Generating content ideas...")
-        ideas = self.generate_content_ideas(10)
-        print(f"   Generated {len(ideas)} content ideas")
+        self.logger.info("1. Generating content ideas...")
+        if checkpoint and checkpoint.is_done("steps", "ideas"):
+            self.logger.info("Content ideas already generated")
+        else:
+            ideas = self.generate_content_ideas(10)
+            self.logger.info(f"Generated {len(ideas)} content ideas", extra={"count": len(ideas)})
+            if checkpoint:
+                checkpoint.mark_done("steps", "ideas")
         
         # 2. Create blog posts from top ideas
-        print("2. Creating blog posts...")
-        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        self.logger.info("2. Creating blog posts...")
+        conn = self.connect()
         cursor = conn.cursor()
         
-        # Get top priority ideas that haven't been used
+        # Get top priority ideas that haven't been used; a resumed run only
+        # makes up the posts its earlier attempt did not get to
+        posts_per_run = 5 - (checkpoint.completed("posts") if checkpoint else 0)
         cursor.execute('''
             SELECT * FROM content_ideas 
             WHERE status = "pending" 
             ORDER BY priority_score DESC 
-            LIMIT 5
-        ''')
+            LIMIT ?
+        ''', (max(0, posts_per_run),))
         
         pending_ideas = cursor.fetchall()
+        conn.close()
         
         for idea_row in pending_ideas:
+            if checkpoint and checkpoint.is_done("posts", idea_row[0]):
+                continue
+            
             idea = ContentIdea(
                 topic=idea_row[1],
                 category=idea_row[2],
@@ -1041,30 +1151,41 @@ Remember, every Virginia home and homeowner situation is unique. Use this guide
             )
             
             blog_post = self.generate_blog_post(idea)
-            print(f"   Created: {blog_post.title}")
+            self.logger.info(f"Created: {blog_post.title}", extra={"idea_id": idea_row[0], "category": idea.category})
             
-            # Mark idea as used
-            cursor.execute('''
-                UPDATE content_ideas SET status = "used" WHERE id = ?
-            ''', (idea_row[0],))
-        
-        conn.commit()
-        conn.close()
+            # Mark idea as used; committed per idea so the post save above
+            # never waits on this connection's write lock
+            with write_lock(self.db_path, "mark idea used"):
+                conn = self.connect()
+                conn.execute('''
+                    UPDATE content_ideas SET status = "used" WHERE id = ?
+                ''', (idea_row[0],))
+                conn.commit()
+                conn.close()
+            
+            if checkpoint:
+                checkpoint.mark_done("posts", idea_row[0])
         
         # 3. Schedule posts
-        print("3. Scheduling posts...")
-        self.schedule_posts(3)  # 3 posts per week
-        
-        # 4. Publish scheduled posts
-        print("4. Publishing scheduled posts...")
+        self.logger.info("3. Scheduling posts...")
+        if not (checkpoint and checkpoint.is_done("steps", "schedule")):
+            self.schedule_posts(3)  # 3 posts per week
+            if checkpoint:
+                checkpoint.mark_done("steps", "schedule")
+        
+        # 4. Publish scheduled posts (only picks up posts still scheduled, so it always runs)
+        self.logger.info("4. Publishing scheduled posts...")
         published_count = self.publish_scheduled_posts()
-        print(f"   Published {published_count} posts")
+        self.logger.info(f"Published {published_count} posts", extra={"count": published_count})
         
-        print("✅ Blog automation complete!")
+        self.logger.info("✅ Blog automation complete!")
+        return published_count
 
 def main():
     """Main function to demonstrate blog automation"""
     
+    setup_logging(name="blog_automation")
+    
     print("Virginia Home Essentials - Blog Automation System")
     print("=" * 50)
     
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Blog Stream Parser
+Incrementally parses streamed blog post completions into title, excerpt and sections
+"""
+
+import re
+from typing import Dict, List, Optional, TextIO
+
+HEADING_PATTERN = re.compile(r"^(#{1,3})\s+(.+?)\s*#*$")
+META_PATTERN = re.compile(
+    r"^[*_]*(SEO Title|Meta Description|Excerpt|Estimated Read Time|Read Time|Category)[*_]*\s*:\s*[*_]*(.*?)[*_]*$",
+    re.IGNORECASE
+)
+
+
+class MalformedOutputError(ValueError):
+    """Raised when a streamed completion does not look like a blog post"""
+
+
+class BlogStreamParser:
+    def __init__(self, draft_file: Optional[TextIO] = None, max_preamble_chars: int = 1500,
+                 max_chars: int = 60000):
+        """Initialize the parser; chunks are copied to draft_file as they arrive"""
+        self.draft_file = draft_file
+        self.max_preamble_chars = max_preamble_chars
+        self.max_chars = max_chars
+
+        self.title: Optional[str] = None
+        self.excerpt: Optional[str] = None
+        self.sections: List[str] = []
+        self.meta: Dict[str, str] = {}
+
+        self._buffer = ""
+        self._received = 0
+        self._body_lines: List[str] = []
+        self._first_paragraph: List[str] = []
+        self._intro_done = False
+        self._checked_start = False
+        self._started = False
+
+    def feed(self, chunk: str):
+        """Consume a chunk of streamed text"""
+        if self.draft_file:
+            self.draft_file.write(chunk)
+            self.draft_file.flush()
+
+        self._received += len(chunk)
+        if self._received > self.max_chars:
+            raise MalformedOutputError(f"Response exceeded {self.max_chars} characters")
+
+        self._buffer += chunk
+        if not self._checked_start and self._buffer.strip():
+            # A JSON payload shows up in the very first character
+            self._checked_start = True
+            if self._buffer.lstrip()[0] in "{[":
+                raise MalformedOutputError("Expected a markdown article, got JSON")
+
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._process_line(line)
+
+        if not self._started and self._received > self.max_preamble_chars:
+            raise MalformedOutputError(f"No heading within the first {self.max_preamble_chars} characters")
+
+    def close(self):
+        """Flush the last partial line and check the post is complete"""
+        if self._buffer:
+            self._process_line(self._buffer)
+            self._buffer = ""
+
+        if not self._started:
+            raise MalformedOutputError("Response contained no headings")
+
+        if not self.excerpt and self._first_paragraph:
+            excerpt = " ".join(self._first_paragraph)
+            self.excerpt = excerpt if len(excerpt) <= 200 else excerpt[:200] + "..."
+
+    @property
+    def content(self) -> str:
+        """Article body without the title and metadata lines"""
+        return "\n".join(self._body_lines).strip()
+
+    def _process_line(self, line: str):
+        stripped = line.strip()
+
+        meta = META_PATTERN.match(stripped)
+        if meta:
+            key = meta.group(1).lower().replace(" ", "_")
+            self.meta[key] = meta.group(2).strip()
+            if key == "excerpt":
+                self.excerpt = self.meta[key]
+            return
+
+        heading = HEADING_PATTERN.match(stripped)
+        if heading:
+            self._started = True
+            level, text = len(heading.group(1)), heading.group(2).strip("*_ ")
+            if self.title is None and (level == 1 or not self._body_lines):
+                self.title = text
+                return
+            if level <= 2:
+                self.sections.append(text)
+            self._intro_done = self._intro_done or bool(self._first_paragraph)
+        elif self._started and not self._intro_done:
+            # The introduction doubles as the excerpt when none is given
+            if stripped:
+                self._first_paragraph.append(stripped)
+            elif self._first_paragraph:
+                self._intro_done = True
+
+        if self._started:
+            self._body_lines.append(line)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Static Asset Build
+Minifies the site's CSS and JavaScript, fingerprints them by content hash, precompresses them and rewrites HTML references
+"""
+
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+SITE_ROOT = Path(__file__).resolve().parent.parent
+SOURCES = [
+    "assets/styles.css",
+    "assets/script.js",
+    "blog/blog-styles.css",
+    "blog/blog-script.js",
+]
+MANIFEST_PATH = "assets/manifest.json"
+HTML_GLOBS = ["index.html", "blog/*.html", "blog/posts/*.html"]
+HASH_LENGTH = 10
+
+_FINGERPRINT = re.compile(r"\.[0-9a-f]{%d}(\.(?:css|js))$" % HASH_LENGTH)
+_ASSET_REF = re.compile(r"""((?:href|src)=)(["'])([^"']+)\2""")
+_JS_WORD = re.compile(r"[\w$]")
+# After these a '/' starts a regular expression rather than a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new",
+                   "delete", "void", "throw", "instanceof", "yield", "await"}
+
+_manifest_cache: Dict[str, object] = {"key": None, "mapping": {}}
+
+
+def _compact_css(chunk: str) -> str:
+    chunk = re.sub(r"\s+", " ", chunk)
+    # No space before ':' since "a :hover" and "a:hover" are different selectors
+    chunk = re.sub(r" ?([{};,>~]) ?", r"\1", chunk)
+    return chunk.replace(": ", ":")
+
+
+def minify_css(source: str) -> str:
+    """Strip comments and insignificant whitespace; strings are left untouched"""
+    out = []
+    code = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char in "\"'":
+            end = i + 1
+            while end < len(source) and source[end] != char:
+                end += 2 if source[end] == "\\" else 1
+            out.append(_compact_css("".join(code)))
+            out.append(source[i:end + 1])
+            code = []
+            i = end + 1
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = len(source) if end == -1 else end + 2
+        else:
+            code.append(char)
+            i += 1
+    out.append(_compact_css("".join(code)))
+    return re.sub(r";+}", "}", "".join(out)).strip()
+
+
+def _previous_word(out: List[str]) -> str:
+    text = "".join(out[-12:]).rstrip()
+    match = re.search(r"[\w$]+$", text)
+    return match.group(0) if match else ""
+
+
+def _previous_char(out: List[str]) -> str:
+    for piece in reversed(out):
+        stripped = piece.rstrip()
+        if stripped:
+            return stripped[-1]
+    return ""
+
+
+def minify_js(source: str) -> str:
+    """Strip comments and indentation, keeping line breaks wherever automatic semicolon insertion could need them.
+
+    Not a full parser: strings, template literals and regular expression
+    literals are recognised and copied verbatim, nothing is renamed.
+    """
+    out: List[str] = []
+    i = 0
+    length = len(source)
+    # One entry per open '${' of a template literal: the brace depth inside it
+    template_depths: List[int] = []
+    pending_space = False
+    pending_newline = False
+
+    def copy_template(start: int) -> int:
+        """Copy template text from start up to the closing backtick or a '${'"""
+        j = start
+        while j < length:
+            if source[j] == "\\":
+                j += 2
+            elif source[j] == "`":
+                out.append(source[start:j + 1])
+                return j + 1
+            elif source.startswith("${", j):
+                out.append(source[start:j + 2])
+                template_depths.append(0)
+                return j + 2
+            else:
+                j += 1
+        out.append(source[start:])
+        return length
+
+    while i < length:
+        char = source[i]
+
+        if char in " \t\r\n\f\v":
+            if char == "\n":
+                pending_newline = True
+            pending_space = True
+            i += 1
+            continue
+
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = length if end == -1 else end + 2
+            if "\n" in source[i:end]:
+                pending_newline = True
+            pending_space = True
+            i = end
+            continue
+
+        prev = _previous_char(out)
+        if pending_newline and prev and prev not in "{;,(" and char != "}":
+            out.append("\n")
+        elif pending_space and prev and (
+                (_JS_WORD.match(prev) or prev == "\\") and (_JS_WORD.match(char) or char == "\\")
+                or prev in "+-" and char in "+-"):
+            out.append(" ")
+        pending_space = pending_newline = False
+
+        if char in "\"'":
+            end = i + 1
+            while end < length and source[end] != char and source[end] != "\n":
+                end += 2 if source[end] == "\\" else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif char == "`":
+            out.append("`")
+            i = copy_template(i + 1)
+        elif char == "/" and (not prev or prev in _REGEX_PRECEDERS or _previous_word(out) in _REGEX_KEYWORDS):
+            end = i + 1
+            in_class = False
+            while end < length and source[end] != "\n":
+                if source[end] == "\\":
+                    end += 2
+                    continue
+                if source[end] == "[":
+                    in_class = True
+                elif source[end] == "]":
+                    in_class = False
+                elif source[end] == "/" and not in_class:
+                    break
+                end += 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif template_depths and char == "{":
+            template_depths[-1] += 1
+            out.append(char)
+            i += 1
+        elif template_depths and char == "}":
+            if template_depths[-1] == 0:
+                template_depths.pop()
+                out.append("}")
+                i = copy_template(i + 1)
+            else:
+                template_depths[-1] -= 1
+                out.append(char)
+                i += 1
+        else:
+            start = i
+            i += 1
+            if _JS_WORD.match(char):
+                while i < length and _JS_WORD.match(source[i]):
+                    i += 1
+            out.append(source[start:i])
+
+    return "".join(out).strip() + "\n"
+
+
+def fingerprint(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def _rewrite_refs(html: str, mapping: Dict[str, str]) -> str:
+    """Point every local href/src whose file name is a known asset at its current name"""
+
+    def replace(match: re.Match) -> str:
+        url = match.group(3)
+        if "://" in url or url.startswith(("//", "data:", "#", "mailto:")):
+            return match.group(0)
+        path, query = re.match(r"([^?#]*)(.*)", url).groups()
+        directory, _, name = path.rpartition("/")
+        target = mapping.get(_FINGERPRINT.sub(r"\1", name))
+        if target is None:
+            return match.group(0)
+        new_path = f"{directory}/{target}" if directory else target
+        return f"{match.group(1)}{match.group(2)}{new_path}{query}{match.group(2)}"
+
+    return _ASSET_REF.sub(replace, html)
+
+
+def load_manifest(root: Path = SITE_ROOT) -> Dict[str, object]:
+    path = root / MANIFEST_PATH
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _mapping(manifest: Dict[str, object]) -> Dict[str, str]:
+    return {Path(source).name: Path(entry["file"]).name for source, entry in manifest.get("assets", {}).items()}
+
+
+def fingerprint_html(html: str, root: Path = SITE_ROOT) -> str:
+    """Rewrite asset references in freshly generated HTML to the fingerprinted names of the last build.
+
+    Returns the HTML unchanged when no build has been run. The manifest is
+    re-read only when it changes, so this is cheap to call once per page.
+    """
+    path = root / MANIFEST_PATH
+    try:
+        key = (str(path), path.stat().st_mtime_ns)
+    except OSError:
+        return html
+    if _manifest_cache["key"] != key:
+        _manifest_cache["mapping"] = _mapping(load_manifest(root))
+        _manifest_cache["key"] = key
+    mapping = _manifest_cache["mapping"]
+    return _rewrite_refs(html, mapping) if mapping else html
+
+
+def html_files(root: Path = SITE_ROOT) -> Iterable[Path]:
+    for pattern in HTML_GLOBS:
+        yield from sorted(root.glob(pattern))
+
+
+def rewrite_html_files(mapping: Dict[str, str], root: Path = SITE_ROOT) -> List[Path]:
+    """Rewrite asset references in every site page; returns the pages that changed"""
+    changed = []
+    for page in html_files(root):
+        html = page.read_text(encoding="utf-8")
+        updated = _rewrite_refs(html, mapping)
+        if updated != html:
+            page.write_text(updated, encoding="utf-8")
+            changed.append(page)
+    return changed
+
+
+def _build_outputs(source: Path) -> List[Path]:
+    """Fingerprinted files of a source, with their compressed variants"""
+    pattern = re.compile(rf"^{re.escape(source.stem)}\.[0-9a-f]{{{HASH_LENGTH}}}{re.escape(source.suffix)}(\.gz|\.br)?$")
+    return [path for path in source.parent.iterdir() if pattern.match(path.name)]
+
+
+def build(root: Path = SITE_ROOT) -> Dict[str, object]:
+    """Build every source asset, rewrite the pages and write the manifest"""
+    previous = load_manifest(root).get("assets", {})
+    brotli = _brotli()
+    if brotli is None:
+        print("⚠️ brotli is not installed; skipping .br files (pip install brotli)")
+
+    assets = {}
+    for relative in SOURCES:
+        source = root / relative
+        if not source.exists():
+            print(f"⚠️ {relative} not found, skipping")
+            continue
+        text = source.read_text(encoding="utf-8")
+        minified = (minify_css(text) if source.suffix == ".css" else minify_js(text)).encode("utf-8")
+        target = source.with_name(f"{source.stem}.{fingerprint(minified)}{source.suffix}")
+
+        target.write_bytes(minified)
+        compressed = gzip.compress(minified, compresslevel=9, mtime=0)
+        Path(f"{target}.gz").write_bytes(compressed)
+        entry = {
+            "file": target.relative_to(root).as_posix(),
+            "bytes": len(text.encode("utf-8")),
+            "minified_bytes": len(minified),
+            "gzip_bytes": len(compressed),
+        }
+        if brotli:
+            compressed = brotli.compress(minified, quality=11)
+            Path(f"{target}.br").write_bytes(compressed)
+            entry["brotli_bytes"] = len(compressed)
+        assets[relative] = entry
+
+        # Keep the previous build so pages cached before this deploy still load
+        keep = {target.name, Path(previous.get(relative, {}).get("file", "")).name}
+        for output in _build_outputs(source):
+            if re.sub(r"\.(gz|br)$", "", output.name) not in keep:
+                output.unlink()
+
+    manifest = {"generated": datetime.datetime.now().isoformat(timespec="seconds"), "assets": assets}
+    with open(root / MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    manifest["pages"] = [page.relative_to(root).as_posix() for page in rewrite_html_files(_mapping(manifest), root)]
+    return manifest
+
+
+def clean(root: Path = SITE_ROOT) -> List[Path]:
+    """Point pages back at the source files and delete all build output"""
+    changed = rewrite_html_files({Path(relative).name: Path(relative).name for relative in SOURCES}, root)
+    for relative in SOURCES:
+        source = root / relative
+        if source.parent.exists():
+            for output in _build_outputs(source):
+                output.unlink()
+    manifest = root / MANIFEST_PATH
+    if manifest.exists():
+        manifest.unlink()
+    return changed
+
+
+def main():
+    print("Virginia Home Essentials - Static Asset Build")
+    print("=" * 50)
+
+    parser = argparse.ArgumentParser(description="Minify, fingerprint and precompress CSS and JavaScript")
+    parser.add_argument("--clean", action="store_true",
+                        help="Restore plain asset names in the pages and delete build output")
+    parser.add_argument("--root", default=str(SITE_ROOT), help="Site root directory")
+    args = parser.parse_args()
+    root = Path(args.root).resolve()
+
+    if args.clean:
+        changed = clean(root)
+        print(f"✅ Removed build output; restored references in {len(changed)} pages")
+        return
+
+    manifest = build(root)
+    for relative, entry in manifest["assets"].items():
+        sizes = f"{entry['bytes']:>7,} → {entry['minified_bytes']:>7,} min → {entry['gzip_bytes']:>6,} gz"
+        if "brotli_bytes" in entry:
+            sizes += f" → {entry['brotli_bytes']:>6,} br"
+        print(f"✅ {entry['file']:<36} {sizes}")
+    print(f"✅ Rewrote references in {len(manifest['pages'])} pages")
+    print(f"✅ Manifest: {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
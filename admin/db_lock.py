@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Database Write Lock
+Advisory per-database file locks so one writer at a time, across threads and processes, owns a SQLite file
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_LOCK_TIMEOUT = 600  # seconds
+# Waits shorter than this count as uncontended and are not reported
+WAIT_REPORT_THRESHOLD = 0.001  # seconds
+POLL_MIN = 0.005  # seconds
+POLL_MAX = 0.05  # seconds
+
+
+class DatabaseLockTimeout(sqlite3.OperationalError):
+    """Raised when the write lock could not be taken in time; handled like 'database is locked'"""
+
+
+class _LockState:
+    """Per-process state of one database lock: thread reentrancy plus the open lock file"""
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+
+_states: Dict[str, _LockState] = {}
+_states_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+_observer: Optional[Callable[[str, float, str], None]] = None
+
+
+def _reset_after_fork():
+    """A forked child does not own its parent's locks"""
+    global _states_lock
+    _states.clear()
+    _stats.clear()
+    _states_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def set_wait_observer(observer: Optional[Callable[[str, float, str], None]]):
+    """Call observer(db_name, wait_seconds, holder) for every contended acquisition, once the lock is released"""
+    global _observer
+    _observer = observer
+
+
+def _state_for(path: str) -> _LockState:
+    with _states_lock:
+        state = _states.get(path)
+        if state is None:
+            state = _states[path] = _LockState()
+        return state
+
+
+def _try_lock(lock_file) -> bool:
+    try:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(lock_file):
+    if fcntl:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read_holder(path: str) -> str:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _record(name: str, waited: float, timed_out: bool = False):
+    with _states_lock:
+        stats = _stats.setdefault(name, {"acquired": 0, "contended": 0, "timeouts": 0,
+                                         "wait_seconds": 0.0, "max_wait_seconds": 0.0})
+        if timed_out:
+            stats["timeouts"] += 1
+        else:
+            stats["acquired"] += 1
+        if waited >= WAIT_REPORT_THRESHOLD:
+            stats["contended"] += 1
+            stats["wait_seconds"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+
+@contextmanager
+def write_lock(db_path: str, holder: str = "", timeout: float = DEFAULT_LOCK_TIMEOUT):
+    """Hold the write lock of a database for the duration of the block.
+
+    Reentrant within a thread, so a locked method may call another one.
+    Readers do not take the lock; in WAL mode they read a consistent
+    snapshot while the writer works.
+    """
+    lock_path = f"{os.path.abspath(db_path)}.lock"
+    name = os.path.basename(db_path)
+    state = _state_for(lock_path)
+    started = time.perf_counter()
+    holder_seen = ""
+    contended_wait = None
+
+    if not state.thread_lock.acquire(timeout=timeout):
+        _record(name, time.perf_counter() - started, timed_out=True)
+        raise DatabaseLockTimeout(f"Timed out after {timeout}s waiting for the {name} write lock")
+
+    try:
+        if state.depth == 0:
+            lock_file = open(lock_path, "a+")
+            delay = POLL_MIN
+            while not _try_lock(lock_file):
+                if not holder_seen:
+                    holder_seen = _read_holder(lock_path)
+                if time.perf_counter() - started >= timeout:
+                    lock_file.close()
+                    _record(name, time.perf_counter() - started, timed_out=True)
+                    raise DatabaseLockTimeout(f"Timed out after {timeout}s waiting for the {name} write lock "
+                                              f"(held by {holder_seen})")
+                time.sleep(delay)
+                delay = min(delay * 2, POLL_MAX)
+
+            # Note who holds the lock so waiting processes can report it
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(f"pid {os.getpid()} {holder or 'writer'} since {datetime.datetime.now():%H:%M:%S}")
+            lock_file.flush()
+            state.file = lock_file
+
+            waited = time.perf_counter() - started
+            _record(name, waited)
+            if waited >= WAIT_REPORT_THRESHOLD:
+                contended_wait = waited
+        state.depth += 1
+    except BaseException:
+        state.thread_lock.release()
+        raise
+
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if state.depth == 0:
+            lock_file, state.file = state.file, None
+            _unlock(lock_file)
+            lock_file.close()
+        state.thread_lock.release()
+        # Reported once the lock is released, since the observer may write to a database itself
+        if _observer and contended_wait is not None:
+            _observer(name, contended_wait, holder_seen or "another thread")
+
+
+def lock_stats() -> Dict[str, Dict[str, float]]:
+    """Acquisitions, contended waits and timeouts per database in this process"""
+    with _states_lock:
+        return {name: {key: round(value, 3) if isinstance(value, float) else value
+                       for key, value in stats.items()}
+                for name, stats in _stats.items()}
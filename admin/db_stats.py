@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Table Statistics
+Row counts per table and per status/category value, kept exact by triggers so reading them costs no table scan
+"""
+
+import sqlite3
+from typing import Any, Dict, Sequence
+
+# Column name used for the whole-table row count
+TOTAL = "*"
+
+
+def _bump(table: str, column: str, value_expr: str, delta: int) -> str:
+    """Trigger statement adding delta to one counter row"""
+    return f'''
+            INSERT INTO table_stats (table_name, column_name, value, row_count)
+            VALUES ('{table}', '{column}', {value_expr}, {delta})
+            ON CONFLICT (table_name, column_name, value)
+            DO UPDATE SET row_count = row_count + excluded.row_count;'''
+
+
+def ensure_table_stats(conn: sqlite3.Connection, table: str, columns: Sequence[str] = ()):
+    """Create the counter table and the triggers that keep counts for table in sync.
+
+    Connections that write with INSERT OR REPLACE must enable
+    PRAGMA recursive_triggers, otherwise the implicit delete is not counted.
+    """
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_stats (
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            value TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            PRIMARY KEY (table_name, column_name, value)
+        )
+    ''')
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                   (f"{table}_stats_insert",))
+    exists = cursor.fetchone() is not None
+
+    insert_body = _bump(table, TOTAL, "''", 1)
+    delete_body = _bump(table, TOTAL, "''", -1)
+    for column in columns:
+        insert_body += _bump(table, column, f"COALESCE(new.{column}, '')", 1)
+        delete_body += _bump(table, column, f"COALESCE(old.{column}, '')", -1)
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table} BEGIN{insert_body}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table} BEGIN{delete_body}
+        END
+    ''')
+    for column in columns:
+        update_body = (_bump(table, column, f"COALESCE(old.{column}, '')", -1) +
+                       _bump(table, column, f"COALESCE(new.{column}, '')", 1))
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_stats_update_{column}
+            AFTER UPDATE OF {column} ON {table}
+            WHEN old.{column} IS NOT new.{column} BEGIN{update_body}
+            END
+        ''')
+
+    if not exists:
+        # Backfill rows written before the triggers existed
+        cursor.execute('DELETE FROM table_stats WHERE table_name = ?', (table,))
+        cursor.execute(f'''
+            INSERT INTO table_stats (table_name, column_name, value, row_count)
+            SELECT ?, ?, '', COUNT(*) FROM {table}
+        ''', (table, TOTAL))
+        for column in columns:
+            cursor.execute(f'''
+                INSERT INTO table_stats (table_name, column_name, value, row_count)
+                SELECT ?, ?, COALESCE({column}, ''), COUNT(*) FROM {table}
+                GROUP BY COALESCE({column}, '')
+            ''', (table, column))
+
+
+def table_stats(conn: sqlite3.Connection, table: str) -> Dict[str, Any]:
+    """Row count of a table and counts per tracked column value, e.g. {"total": 12, "by_status": {...}}"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT column_name, value, row_count FROM table_stats
+        WHERE table_name = ? AND row_count != 0
+        ORDER BY column_name, value
+    ''', (table,))
+
+    stats: Dict[str, Any] = {"total": 0}
+    for column, value, count in cursor.fetchall():
+        if column == TOTAL:
+            stats["total"] = count
+        else:
+            stats.setdefault(f"by_{column}", {})[value] = count
+    return stats
@@ -5,14 +5,91 @@ Exports blog posts from database to JSON for website consumption
 """
 
 import json
+import os
+import re
 import sqlite3
 from pathlib import Path
 from datetime import datetime
 
-def export_blog_posts(output_file="../blog/posts.json", limit=50):
+POST_COLUMNS = """
+    id, title, slug, excerpt, category, tags, author,
+    publish_date, featured_image, read_time, updated_at
+"""
+
+def _row_to_post(row):
+    """Convert a blog_posts row into the website JSON shape"""
+    post_id, title, slug, excerpt, category, tags, author, publish_date, featured_image, read_time, updated_at = row
+    
+    return {
+        "id": post_id,
+        "title": title,
+        "slug": slug,
+        "excerpt": excerpt,
+        "category": category,
+        "tags": json.loads(tags) if tags else [],
+        "author": author,
+        "publish_date": publish_date,
+        "featured_image": featured_image,
+        "read_time": read_time,
+        "updated_at": updated_at,
+        "url": f"/blog/{slug}.html"
+    }
+
+
+class _PageWriter:
+    """Streams posts into fixed-size posts-page-N.json files"""
+    
+    def __init__(self, directory: Path, page_size: int):
+        self.directory = directory
+        self.page_size = page_size
+        self.total = 0
+        self.pages = 0
+        self._file = None
+        self._tmp_path = None
+        self._count_in_page = 0
+        directory.mkdir(parents=True, exist_ok=True)
+    
+    def write(self, post: dict):
+        if self._file is None:
+            self._open_page()
+        
+        if self._count_in_page:
+            self._file.write(",")
+        self._file.write(json.dumps(post, ensure_ascii=False, separators=(',', ':')))
+        self._count_in_page += 1
+        self.total += 1
+        
+        if self._count_in_page == self.page_size:
+            self._close_page()
+    
+    def _open_page(self):
+        self.pages += 1
+        self._count_in_page = 0
+        self._tmp_path = self.directory / f"posts-page-{self.pages}.json.tmp"
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._file.write(f'{{"page":{self.pages},"posts":[')
+    
+    def _close_page(self):
+        self._file.write("]}")
+        self._file.close()
+        os.replace(self._tmp_path, self.directory / f"posts-page-{self.pages}.json")
+        self._file = None
+    
+    def close(self):
+        if self._file is not None:
+            self._close_page()
+        
+        # Drop pages left over from a previous, larger export
+        for path in self.directory.glob("posts-page-*.json"):
+            match = re.fullmatch(r"posts-page-(\d+)\.json", path.name)
+            if match and int(match.group(1)) > self.pages:
+                path.unlink()
+
+
+def export_blog_posts(output_file="../blog/posts.json", limit=50, db_path=None):
     """Export published blog posts to JSON file"""
     
-    db_path = Path(__file__).parent / "blog_system.db"
+    db_path = Path(db_path) if db_path else Path(__file__).parent / "blog_system.db"
     
     if not db_path.exists():
         print("⚠️  Blog database not found. Run blog automation first.")
@@ -22,33 +99,15 @@ def export_blog_posts(output_file="../blog/posts.json", limit=50):
         conn = sqlite3.connect(str(db_path), timeout=30)
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT id, title, slug, excerpt, category, tags, author, 
-                   publish_date, featured_image, read_time, updated_at
+        cursor.execute(f"""
+            SELECT {POST_COLUMNS}
             FROM blog_posts 
             WHERE status = 'published'
             ORDER BY publish_date DESC
             LIMIT ?
         """, (limit,))
         
-        posts = []
-        for row in cursor.fetchall():
-            post_id, title, slug, excerpt, category, tags, author, publish_date, featured_image, read_time, updated_at = row
-            
-            posts.append({
-                "id": post_id,
-                "title": title,
-                "slug": slug,
-                "excerpt": excerpt,
-                "category": category,
-                "tags": json.loads(tags) if tags else [],
-                "author": author,
-                "publish_date": publish_date,
-                "featured_image": featured_image,
-                "read_time": read_time,
-                "updated_at": updated_at,
-                "url": f"/blog/{slug}.html"
-            })
+        posts = [_row_to_post(row) for row in cursor.fetchall()]
         
         conn.close()
         
@@ -66,6 +125,97 @@ def export_blog_posts(output_file="../blog/posts.json", limit=50):
         print(f"❌ Error exporting blog posts: {e}")
         return []
 
+def export_blog_pages(output_dir="../blog/pages", page_size=6, db_path=None):
+    """Stream published posts into paginated JSON files plus a manifest.
+    
+    Rows are written straight from the cursor, so memory stays proportional
+    to one page. Per-category pages go to pages/<category>/.
+    """
+    
+    db_path = Path(db_path) if db_path else Path(__file__).parent / "blog_system.db"
+    
+    if not db_path.exists():
+        print("⚠️  Blog database not found. Run blog automation first.")
+        return
+    
+    output_path = Path(__file__).parent / output_dir
+    
+    try:
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        cursor = conn.cursor()
+        
+        # All posts, newest first
+        writer = _PageWriter(output_path, page_size)
+        cursor.execute(f"""
+            SELECT {POST_COLUMNS}
+            FROM blog_posts 
+            WHERE status = 'published'
+            ORDER BY publish_date DESC
+        """)
+        for row in cursor:
+            writer.write(_row_to_post(row))
+        writer.close()
+        
+        manifest = {
+            "generated_at": datetime.now().isoformat(),
+            "page_size": page_size,
+            "total": writer.total,
+            "pages": writer.pages,
+            "categories": {}
+        }
+        
+        # One pass per category keeps a single page buffer open at a time
+        category_cursor = conn.cursor()
+        category_cursor.execute("""
+            SELECT DISTINCT category FROM blog_posts
+            WHERE status = 'published' AND category IS NOT NULL
+        """)
+        categories = [row[0] for row in category_cursor.fetchall()]
+        
+        for category in categories:
+            category_dir = re.sub(r"[^a-z0-9-]+", "-", category.lower()).strip("-") or "uncategorized"
+            category_writer = _PageWriter(output_path / category_dir, page_size)
+            cursor.execute(f"""
+                SELECT {POST_COLUMNS}
+                FROM blog_posts 
+                WHERE status = 'published' AND category = ?
+                ORDER BY publish_date DESC
+            """, (category,))
+            for row in cursor:
+                category_writer.write(_row_to_post(row))
+            category_writer.close()
+            
+            manifest["categories"][category] = {
+                "path": category_dir,
+                "total": category_writer.total,
+                "pages": category_writer.pages
+            }
+        
+        conn.close()
+
+        # Swap the manifest in whole so readers never see a partial one
+        tmp_path = output_path / "manifest.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, output_path / "manifest.json")
+
+        # Then drop pages of categories that no longer have published posts
+        current_dirs = {entry["path"] for entry in manifest["categories"].values()}
+        for stale_dir in output_path.iterdir():
+            if not stale_dir.is_dir() or stale_dir.name in current_dirs:
+                continue
+            for path in stale_dir.glob("posts-page-*.json*"):
+                path.unlink()
+            if not any(stale_dir.iterdir()):
+                stale_dir.rmdir()
+
+        print(f"✅ Exported {manifest['total']} blog posts in {manifest['pages']} pages to {output_path}")
+        return manifest
+        
+    except Exception as e:
+        print(f"❌ Error exporting blog pages: {e}")
+        return None
+
 if __name__ == "__main__":
     import sys
     
@@ -74,3 +224,4 @@ if __name__ == "__main__":
     print("Virginia Home Essentials - Blog Export")
     print("=" * 50)
     export_blog_posts(limit=limit)
+    export_blog_pages()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Feed Generator
+Builds Atom and RSS feeds for the blog, site-wide and per category
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+SITE_TITLE = "Virginia Home Essentials"
+SITE_SUBTITLE = "Expert advice, product guides and market insights for new Virginia homeowners"
+
+
+class FeedGenerator:
+    def __init__(self, db_path: str = "blog_system.db", feed_dir: str = "../blog/feeds",
+                 site_url: str = "https://yourdomain.com", max_entries: int = 20):
+        """Initialize the feed generator"""
+        self.db_path = db_path
+        self.feed_dir = Path(feed_dir)
+        self.site_url = site_url.rstrip("/")
+        self.max_entries = max_entries
+        self.meta_file = self.feed_dir / "feeds.json"
+
+    def _category_path(self, category: str) -> str:
+        return re.sub(r"[^a-z0-9-]+", "-", category.lower()).strip("-") or "uncategorized"
+
+    def _parse_date(self, value: str) -> datetime.datetime:
+        """Stored timestamps are naive ISO strings; feeds publish them as UTC"""
+        try:
+            parsed = datetime.datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            parsed = datetime.datetime.now()
+        return parsed.replace(tzinfo=datetime.timezone.utc) if parsed.tzinfo is None else parsed
+
+    def _fetch_entries(self, cursor, category: Optional[str]) -> List[Dict]:
+        """Latest published posts, optionally limited to one category"""
+        query = '''
+            SELECT id, title, slug, excerpt, category, author,
+                   COALESCE(NULLIF(publish_date, ''), created_at) AS published, updated_at
+            FROM blog_posts
+            WHERE status = 'published'
+        '''
+        params: list = []
+        if category:
+            query += ' AND category = ?'
+            params.append(category)
+        query += ' ORDER BY published DESC, id DESC LIMIT ?'
+        params.append(self.max_entries)
+
+        cursor.execute(query, params)
+        return [
+            {
+                "id": post_id,
+                "title": title,
+                "url": f"{self.site_url}/blog/{slug}.html",
+                "summary": excerpt or "",
+                "category": post_category or "",
+                "author": author or SITE_TITLE,
+                "published": self._parse_date(published),
+                "updated": self._parse_date(updated_at or published),
+            }
+            for post_id, title, slug, excerpt, post_category, author, published, updated_at
+            in cursor.fetchall()
+        ]
+
+    def _render_atom(self, title: str, feed_url: str, entries: List[Dict], updated: datetime.datetime) -> str:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<feed xmlns="http://www.w3.org/2005/Atom">',
+            f'  <title>{escape(title)}</title>',
+            f'  <subtitle>{escape(SITE_SUBTITLE)}</subtitle>',
+            f'  <link href={quoteattr(feed_url)} rel="self"/>',
+            f'  <link href={quoteattr(self.site_url + "/blog/")}/>',
+            f'  <id>{escape(feed_url)}</id>',
+            f'  <updated>{updated.isoformat()}</updated>',
+        ]
+        for entry in entries:
+            lines += [
+                '  <entry>',
+                f'    <title>{escape(entry["title"])}</title>',
+                f'    <link href={quoteattr(entry["url"])}/>',
+                f'    <id>{escape(entry["url"])}</id>',
+                f'    <published>{entry["published"].isoformat()}</published>',
+                f'    <updated>{entry["updated"].isoformat()}</updated>',
+                f'    <author><name>{escape(entry["author"])}</name></author>',
+                f'    <category term={quoteattr(entry["category"])}/>',
+                f'    <summary>{escape(entry["summary"])}</summary>',
+                '  </entry>',
+            ]
+        lines.append('</feed>')
+        return "\n".join(lines) + "\n"
+
+    def _render_rss(self, title: str, feed_url: str, entries: List[Dict], updated: datetime.datetime) -> str:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">',
+            '  <channel>',
+            f'    <title>{escape(title)}</title>',
+            f'    <link>{escape(self.site_url)}/blog/</link>',
+            f'    <description>{escape(SITE_SUBTITLE)}</description>',
+            f'    <atom:link href={quoteattr(feed_url)} rel="self" type="application/rss+xml"/>',
+            f'    <lastBuildDate>{format_datetime(updated)}</lastBuildDate>',
+        ]
+        for entry in entries:
+            lines += [
+                '    <item>',
+                f'      <title>{escape(entry["title"])}</title>',
+                f'      <link>{escape(entry["url"])}</link>',
+                f'      <guid isPermaLink="true">{escape(entry["url"])}</guid>',
+                f'      <pubDate>{format_datetime(entry["published"])}</pubDate>',
+                f'      <category>{escape(entry["category"])}</category>',
+                f'      <description>{escape(entry["summary"])}</description>',
+                '    </item>',
+            ]
+        lines += ['  </channel>', '</rss>']
+        return "\n".join(lines) + "\n"
+
+    def _write_feed(self, relative_path: str, content: str, updated: datetime.datetime, meta: Dict) -> bool:
+        """Write a feed only when its bytes changed; returns True if written.
+
+        Unchanged feeds keep their file and mtime, so servers keep answering
+        conditional requests with 304. Written feeds get their mtime set to the
+        newest entry, which static servers report as Last-Modified.
+        """
+        data = content.encode("utf-8")
+        etag = hashlib.sha256(data).hexdigest()[:16]
+        path = self.feed_dir / relative_path
+
+        meta[relative_path] = {
+            "etag": f'"{etag}"',
+            "last_modified": format_datetime(updated, usegmt=True),
+            "bytes": len(data)
+        }
+
+        if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        os.utime(path, (updated.timestamp(), updated.timestamp()))
+        return True
+
+    def generate_feeds(self, categories: Optional[Iterable[str]] = None) -> int:
+        """Regenerate the site feeds plus the given categories (all when None).
+
+        Returns the number of feed files that actually changed.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        if categories is None:
+            cursor.execute('''
+                SELECT DISTINCT category FROM blog_posts
+                WHERE status = 'published' AND category IS NOT NULL
+            ''')
+            categories = [row[0] for row in cursor.fetchall()]
+
+        meta = {}
+        if self.meta_file.exists():
+            with open(self.meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+        targets = [(None, "")] + [(c, f"{self._category_path(c)}/") for c in sorted(set(categories)) if c]
+        changed = 0
+
+        for category, prefix in targets:
+            entries = self._fetch_entries(cursor, category)
+            if not entries:
+                continue
+
+            updated = max(entry["updated"] for entry in entries)
+            title = SITE_TITLE if category is None else \
+                f"{SITE_TITLE} - {category.replace('-', ' ').title()}"
+
+            atom_url = f"{self.site_url}/blog/feeds/{prefix}atom.xml"
+            rss_url = f"{self.site_url}/blog/feeds/{prefix}rss.xml"
+            changed += self._write_feed(f"{prefix}atom.xml",
+                                        self._render_atom(title, atom_url, entries, updated), updated, meta)
+            changed += self._write_feed(f"{prefix}rss.xml",
+                                        self._render_rss(title, rss_url, entries, updated), updated, meta)
+
+        conn.close()
+
+        self.feed_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.meta_file, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        print(f"Feeds updated: {changed} file(s) changed")
+        return changed
+
+
+def main():
+    """Regenerate every feed"""
+
+    print("Virginia Home Essentials - Feed Generator")
+    print("=" * 50)
+
+    generator = FeedGenerator()
+    generator.generate_feeds()
+
+if __name__ == "__main__":
+    main()
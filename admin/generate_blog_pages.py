@@ -9,6 +9,9 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from build_assets import fingerprint_html
+from image_pipeline import picture_html
+
 def generate_blog_page(post):
     """Generate a single blog post HTML page"""
     
@@ -135,7 +138,7 @@ def generate_blog_page(post):
                     </div>
                 </div>
 
-                {f'<img src="{post.get("featured_image")}" alt="{post.get("title")}" class="blog-featured-image">' if post.get('featured_image') else ''}
+                {picture_html(post["featured_image"], post.get("title", ""), "blog-featured-image") if post.get('featured_image') else ''}
 
                 <div class="blog-content">
                     {post.get('content', '<p>Content not available</p>')}
@@ -381,7 +384,7 @@ def main():
         slug = post['slug']
         filename = blog_dir / f"{slug}.html"
         
-        html_content = generate_blog_page(post)
+        html_content = fingerprint_html(generate_blog_page(post))
         
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(html_content)
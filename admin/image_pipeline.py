@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Image Pipeline
+Resizes local source images into AVIF, WebP and JPEG variants and renders responsive <picture> markup for them
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SITE_ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIR = "images"
+OUTPUT_DIR = "assets/images"
+URL_PREFIX = "/assets/images"
+MANIFEST_NAME = "manifest.json"
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+
+WIDTHS = (400, 800, 1200, 1600)
+# The plain <img> src, and the stable URL stored in the database and products.json
+FALLBACK_WIDTH = 800
+# Best format first; the browser takes the first <source> it supports
+FORMATS = {
+    "avif": {"mime": "image/avif", "ext": "avif", "save": {"quality": 60}},
+    "webp": {"mime": "image/webp", "ext": "webp", "save": {"quality": 80, "method": 6}},
+    "jpeg": {"mime": "image/jpeg", "ext": "jpg", "save": {"quality": 82, "optimize": True, "progressive": True}},
+}
+DEFAULT_SIZES = "(max-width: 840px) 100vw, 800px"
+HASH_LENGTH = 10
+
+_manifest_cache: Dict[str, object] = {"key": None, "images": {}, "by_url": {}}
+
+
+def available_formats() -> List[str]:
+    """Formats this Pillow build can write; AVIF needs Pillow built with libavif"""
+    from PIL import features
+    return [name for name in FORMATS if name == "jpeg" or features.check(name)]
+
+
+def source_hash(data: bytes, widths: tuple, formats: List[str]) -> str:
+    """Content hash of a source image plus the settings, so changing either reprocesses it"""
+    settings = json.dumps({"widths": widths, "formats": {name: FORMATS[name]["save"] for name in formats}},
+                          sort_keys=True)
+    return hashlib.sha256(data + settings.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+
+def _target_widths(width: int, widths: tuple) -> List[int]:
+    """Requested widths below the source width, plus the source width itself; never upscales"""
+    targets = [w for w in widths if w < width]
+    if width <= max(widths):
+        targets.append(width)
+    return targets or [width]
+
+
+def _render(source: Path, key: str, digest: str, output_dir: Path, widths: tuple,
+            formats: List[str]) -> Dict[str, object]:
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        icc_profile = opened.info.get("icc_profile")
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+    target_dir = output_dir / Path(key).parent
+    target_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(key).name
+    variants = []
+    for width in _target_widths(image.width, widths):
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for name in formats:
+            spec = FORMATS[name]
+            frame = resized
+            if name == "jpeg" and frame.mode == "RGBA":
+                frame = Image.new("RGB", frame.size, "white")
+                frame.paste(resized, mask=resized.getchannel("A"))
+            path = target_dir / f"{stem}.{digest}-{width}w.{spec['ext']}"
+            save_options = dict(spec["save"])
+            if icc_profile:
+                save_options["icc_profile"] = icc_profile
+            frame.save(path, name.upper(), **save_options)
+            variants.append({
+                "format": name,
+                "width": width,
+                "height": height,
+                "url": f"{URL_PREFIX}/{path.relative_to(output_dir).as_posix()}",
+                "bytes": path.stat().st_size,
+            })
+
+    # A copy under a name that never changes, for places that store a plain URL
+    jpegs = [v for v in variants if v["format"] == "jpeg"]
+    fallback = max((v for v in jpegs if v["width"] <= FALLBACK_WIDTH), key=lambda v: v["width"], default=jpegs[0])
+    stable = target_dir / f"{stem}.jpg"
+    stable.write_bytes((output_dir / fallback["url"][len(URL_PREFIX) + 1:]).read_bytes())
+
+    return {
+        "hash": digest,
+        "width": image.width,
+        "height": image.height,
+        "source_bytes": source.stat().st_size,
+        "src": f"{URL_PREFIX}/{stable.relative_to(output_dir).as_posix()}",
+        "fallback": fallback,
+        "variants": variants,
+    }
+
+
+def _remove(output_dir: Path, urls: List[str]):
+    for url in urls:
+        path = output_dir / url[len(URL_PREFIX) + 1:]
+        if path.exists():
+            path.unlink()
+
+
+def process_images(root: Path = SITE_ROOT, widths: tuple = WIDTHS,
+                   formats: Optional[List[str]] = None, force: bool = False) -> Dict[str, object]:
+    """Render every source image whose content or settings changed and write the manifest.
+
+    Images are keyed by their path under images/ without the extension, so
+    images/featured/seasonal.jpg is "featured/seasonal". The variants of the
+    previous version of an image are kept until it changes again, so pages
+    generated before a change still load.
+    """
+    source_dir = root / SOURCE_DIR
+    output_dir = root / OUTPUT_DIR
+    formats = formats or available_formats()
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = {}
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f).get("images", {})
+
+    images, results = {}, []
+    sources = sorted(p for p in source_dir.rglob("*") if p.suffix.lower() in SOURCE_EXTENSIONS) \
+        if source_dir.exists() else []
+    for source in sources:
+        key = source.relative_to(source_dir).with_suffix("").as_posix()
+        digest = source_hash(source.read_bytes(), widths, formats)
+        old = previous.get(key)
+        if not force and old and old["hash"] == digest and all(
+                (output_dir / v["url"][len(URL_PREFIX) + 1:]).exists() for v in old["variants"]):
+            images[key] = old
+            results.append({"image": key, "status": "cached"})
+            continue
+
+        try:
+            entry = _render(source, key, digest, output_dir, widths, formats)
+        except OSError as e:
+            results.append({"image": key, "status": "failed", "error": str(e)})
+            if old:
+                images[key] = old
+            continue
+
+        if old and old["hash"] != digest:
+            _remove(output_dir, old.get("previous", []))
+            entry["previous"] = [v["url"] for v in old["variants"]]
+        images[key] = entry
+        results.append({"image": key, "status": "processed",
+                         "source_bytes": entry["source_bytes"],
+                         "variant_bytes": sum(v["bytes"] for v in entry["variants"]),
+                         "fallback_width": entry["fallback"]["width"],
+                         "fallback_bytes": entry["fallback"]["bytes"]})
+
+    for key, old in previous.items():
+        if key not in images:
+            _remove(output_dir, [v["url"] for v in old["variants"]] + old.get("previous", []) + [old["src"]])
+            results.append({"image": key, "status": "removed"})
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"widths": list(widths), "formats": formats, "images": images}, f, indent=2)
+    return {"images": images, "results": results}
+
+
+def _load(root: Path = SITE_ROOT) -> Dict[str, object]:
+    """The manifest, re-read only when it changes"""
+    path = root / OUTPUT_DIR / MANIFEST_NAME
+    try:
+        key = (str(path), path.stat().st_mtime_ns)
+    except OSError:
+        return {"images": {}, "by_url": {}}
+    if _manifest_cache["key"] != key:
+        with open(path, "r", encoding="utf-8") as f:
+            images = json.load(f).get("images", {})
+        by_url = {}
+        for entry in images.values():
+            by_url[entry["src"]] = entry
+            for variant in entry["variants"]:
+                by_url[variant["url"]] = entry
+        _manifest_cache.update(key=key, images=images, by_url=by_url)
+    return _manifest_cache
+
+
+def image_url(key: str, fallback: str, root: Path = SITE_ROOT) -> str:
+    """Stable URL of a processed image, or fallback when images/<key>.* has not been processed"""
+    entry = _load(root)["images"].get(key)
+    return entry["src"] if entry else fallback
+
+
+def picture_html(src: str, alt: str, css_class: str = "", sizes: str = DEFAULT_SIZES,
+                 lazy: bool = False, root: Path = SITE_ROOT) -> str:
+    """<picture> with AVIF/WebP/JPEG srcsets for a processed image, or a plain <img> for any other URL.
+
+    Above-the-fold images (lazy=False) get fetchpriority="high" since they are
+    usually the page's largest contentful paint.
+    """
+    # image_url is imported by product tracking at startup; only page rendering needs html
+    import html
+
+    alt = html.escape(alt or "", quote=True)
+    class_attr = f' class="{css_class}"' if css_class else ""
+    loading = ' loading="lazy" decoding="async"' if lazy else ' fetchpriority="high"'
+    entry = _load(root)["by_url"].get(src)
+    if entry is None:
+        return f'<img src="{html.escape(src, quote=True)}" alt="{alt}"{class_attr}{loading}>'
+
+    def srcset(name: str) -> str:
+        return ", ".join(f"{v['url']} {v['width']}w" for v in entry["variants"] if v["format"] == name)
+
+    fallback = entry["fallback"]
+    sources = "".join(f'<source type="{FORMATS[name]["mime"]}" srcset="{srcset(name)}" sizes="{sizes}">'
+                      for name in FORMATS
+                      if name != "jpeg" and any(v["format"] == name for v in entry["variants"]))
+    return (f'<picture>{sources}<img src="{fallback["url"]}" srcset="{srcset("jpeg")}" sizes="{sizes}" '
+            f'width="{fallback["width"]}" height="{fallback["height"]}" alt="{alt}"{class_attr}{loading}></picture>')
+
+
+def main():
+    print("Virginia Home Essentials - Image Pipeline")
+    print("=" * 50)
+
+    parser = argparse.ArgumentParser(description="Resize images/ into responsive AVIF, WebP and JPEG variants")
+    parser.add_argument("--root", default=str(SITE_ROOT), help="Site root directory")
+    parser.add_argument("--widths", default=",".join(str(w) for w in WIDTHS),
+                        help="Comma-separated target widths in pixels")
+    parser.add_argument("--force", action="store_true", help="Reprocess images even if unchanged")
+    args = parser.parse_args()
+    root = Path(args.root).resolve()
+    widths = tuple(sorted(int(w) for w in re.split(r"\s*,\s*", args.widths.strip())))
+
+    formats = available_formats()
+    if "avif" not in formats:
+        print("⚠️ This Pillow build cannot write AVIF; generating WebP and JPEG only")
+    if not (root / SOURCE_DIR).exists():
+        print(f"⚠️ No {SOURCE_DIR}/ directory; add source images as {SOURCE_DIR}/<group>/<name>.jpg")
+
+    outcome = process_images(root, widths, formats, force=args.force)
+    for result in outcome["results"]:
+        if result["status"] == "processed":
+            print(f"✅ {result['image']}: {result['source_bytes']:,} bytes → "
+                  f"{result['fallback_bytes']:,} byte {result['fallback_width']}w JPEG "
+                  f"({result['variant_bytes']:,} bytes across all variants)")
+        elif result["status"] == "failed":
+            print(f"❌ {result['image']}: {result['error']}")
+        elif result["status"] == "removed":
+            print(f"✅ {result['image']}: source gone, variants removed")
+    cached = sum(1 for r in outcome["results"] if r["status"] == "cached")
+    print(f"✅ {len(outcome['images'])} images in {OUTPUT_DIR}/{MANIFEST_NAME} ({cached} unchanged)")
+
+
+if __name__ == "__main__":
+    main()
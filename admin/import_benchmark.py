@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Import Time Benchmark
+Measures cold-start import cost per automation task with -X importtime and checks it against a budget
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+ADMIN_DIR = Path(__file__).resolve().parent
+BUDGET_FILE = ADMIN_DIR / "import_budget.json"
+
+# Subsystems each runner task loads before doing any work
+TASK_SUBSYSTEMS = {
+    "products": ["product_tracker"],
+    "content": ["ai_generator"],
+    "blog": ["blog_system"],
+    "full": ["ai_generator", "product_tracker", "blog_system"],
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+STARTUP_SCRIPT = """
+import importlib, importlib.util, sys
+sys.path.insert(0, {admin_dir!r})
+spec = importlib.util.spec_from_file_location("automation_runner", {runner!r})
+runner = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(runner)
+for name in {subsystems!r}:
+    importlib.import_module(runner.SUBSYSTEMS[name][0])
+"""
+
+
+def _run_importtime(code: str) -> Tuple[float, Set[str]]:
+    """Run code in a fresh interpreter; returns (top-level import ms, imported modules)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ADMIN_DIR
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module)
+        # Nested imports are already included in their parent's cumulative time
+        if len(indent) <= 1:
+            total_us += cumulative
+    return total_us / 1000, modules
+
+
+def measure_task(task: str, runs: int = 5) -> Dict:
+    """Median import time of a task, net of bare interpreter startup"""
+    code = STARTUP_SCRIPT.format(admin_dir=str(ADMIN_DIR), runner=str(ADMIN_DIR / "automation-runner.py"),
+                                 subsystems=TASK_SUBSYSTEMS[task])
+    baseline = statistics.median(_run_importtime("pass")[0] for _ in range(runs))
+
+    timings: List[float] = []
+    modules: Set[str] = set()
+    for _ in range(runs):
+        elapsed, modules = _run_importtime(code)
+        timings.append(elapsed)
+
+    return {
+        "task": task,
+        "import_ms": round(max(0.0, statistics.median(timings) - baseline), 1),
+        "modules": modules
+    }
+
+
+def load_budget() -> Dict:
+    if BUDGET_FILE.exists():
+        with open(BUDGET_FILE, 'r') as f:
+            return json.load(f)
+    return {"tolerance": 0.25, "tasks": {}}
+
+
+def check_budget(results: List[Dict], budget: Dict) -> List[str]:
+    """Return a list of budget violations"""
+    failures = []
+    tolerance = budget.get("tolerance", 0.25)
+
+    for result in results:
+        task_budget = budget.get("tasks", {}).get(result["task"])
+        if not task_budget:
+            continue
+
+        limit = task_budget["max_ms"] * (1 + tolerance)
+        if result["import_ms"] > limit:
+            failures.append(f"{result['task']}: {result['import_ms']} ms exceeds budget "
+                            f"{task_budget['max_ms']} ms (+{tolerance:.0%})")
+
+        for module in task_budget.get("forbidden", []):
+            if module in result["modules"]:
+                failures.append(f"{result['task']}: imports '{module}' at startup")
+
+    return failures
+
+
+def main():
+    """Measure every task and fail on budget regressions"""
+    parser = argparse.ArgumentParser(description="Virginia Home Essentials - Import Time Benchmark")
+    parser.add_argument("--task", choices=list(TASK_SUBSYSTEMS), action="append",
+                        help="Task to measure (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter runs per task")
+    parser.add_argument("--update", action="store_true",
+                        help="Write the measured times as the new budget")
+    args = parser.parse_args()
+
+    print("Virginia Home Essentials - Import Time Benchmark")
+    print("=" * 50)
+
+    results = [measure_task(task, args.runs) for task in (args.task or TASK_SUBSYSTEMS)]
+    for result in results:
+        print(f"{result['task']:<10} {result['import_ms']:>8.1f} ms  ({len(result['modules'])} modules)")
+
+    budget = load_budget()
+
+    if args.update:
+        for result in results:
+            task_budget = budget["tasks"].setdefault(result["task"], {"forbidden": []})
+            task_budget["max_ms"] = round(result["import_ms"], 1)
+        with open(BUDGET_FILE, 'w') as f:
+            json.dump(budget, f, indent=2)
+        print(f"✅ Budget updated: {BUDGET_FILE}")
+        return
+
+    failures = check_budget(results, budget)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+    print("✅ Import times within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Job Queue
+Durable SQLite job queue with atomic claims, leases and retries for worker processes
+"""
+
+import datetime
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+# A claimed job that is not heartbeated within this time is handed to another worker
+DEFAULT_VISIBILITY_TIMEOUT = 30 * 60  # seconds
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 60  # seconds, doubled after every failed attempt
+
+
+@dataclass
+class QueuedJob:
+    id: int
+    task: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    def __init__(self, db_path: str = "job_queue.db", visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, retry_delay: int = DEFAULT_RETRY_DELAY):
+        """Initialize the job queue"""
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
+
+    def init_database(self):
+        """Create the jobs table"""
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        # WAL lets workers poll while another worker is writing
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                payload TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_expires REAL,
+                worker TEXT,
+                last_error TEXT,
+                result TEXT,
+                created_at TEXT NOT NULL,
+                finished_at TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at)')
+
+        conn.commit()
+        conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            self.init_database()
+            self._schema_ready = True
+        return sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+
+    def enqueue(self, task: str, payload: Dict[str, Any] = None, delay: float = 0,
+                max_attempts: int = None, unique: bool = False) -> Optional[int]:
+        """Add a job; with unique=True nothing is added while the same task is queued or running"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        if unique:
+            cursor.execute("SELECT id FROM jobs WHERE task = ? AND status IN ('queued', 'running') LIMIT 1",
+                           (task,))
+            existing = cursor.fetchone()
+            if existing:
+                conn.close()
+                return None
+
+        cursor.execute('''
+            INSERT INTO jobs (task, payload, max_attempts, available_at, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (task, json.dumps(payload or {}), max_attempts or self.max_attempts,
+              time.time() + delay, datetime.datetime.now().isoformat()))
+        job_id = cursor.lastrowid
+
+        conn.commit()
+        conn.close()
+        return job_id
+
+    def claim(self, worker: str, tasks: List[str] = None) -> Optional[QueuedJob]:
+        """Atomically take the oldest ready job, or a job whose lease has expired"""
+        now = time.time()
+        task_filter = ""
+        params: List[Any] = [worker, now + self.visibility_timeout, now, now]
+        if tasks:
+            task_filter = f"AND task IN ({', '.join('?' for _ in tasks)})"
+            params.extend(tasks)
+
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        self._reap(cursor, now)
+
+        # A single UPDATE ... RETURNING, so two workers can never claim the same row
+        cursor.execute(f'''
+            UPDATE jobs
+            SET status = 'running', attempts = attempts + 1, worker = ?, lease_expires = ?
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE ((status = 'queued' AND available_at <= ?)
+                       OR (status = 'running' AND lease_expires <= ? AND attempts < max_attempts))
+                {task_filter}
+                ORDER BY available_at, id
+                LIMIT 1
+            )
+            RETURNING id, task, payload, attempts, max_attempts
+        ''', params)
+        row = cursor.fetchone()
+
+        conn.commit()
+        conn.close()
+
+        if not row:
+            return None
+        return QueuedJob(row[0], row[1], json.loads(row[2]), row[3], row[4])
+
+    def _reap(self, cursor, now: float):
+        """Fail jobs whose lease expired on their last allowed attempt"""
+        cursor.execute('''
+            UPDATE jobs
+            SET status = 'failed', finished_at = ?,
+                last_error = COALESCE(last_error, 'lease expired on worker ' || worker)
+            WHERE status = 'running' AND lease_expires <= ? AND attempts >= max_attempts
+        ''', (datetime.datetime.now().isoformat(), now))
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Extend a lease; returns False if the job was taken over by another worker"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs SET lease_expires = ?
+            WHERE id = ? AND worker = ? AND status = 'running'
+        ''', (time.time() + self.visibility_timeout, job_id, worker))
+        extended = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+        return extended
+
+    @contextmanager
+    def keep_alive(self, job: QueuedJob, worker: str):
+        """Heartbeat the job's lease in the background while the block runs"""
+        stop = threading.Event()
+        interval = max(1.0, self.visibility_timeout / 3)
+
+        def beat():
+            while not stop.wait(interval):
+                if not self.heartbeat(job.id, worker):
+                    break
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job.id}", daemon=True)
+        thread.start()
+        try:
+            yield job
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job_id: int, worker: str, result: Any = None) -> bool:
+        """Mark a job done; ignored if the worker no longer holds the lease"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs SET status = 'done', result = ?, finished_at = ?, lease_expires = NULL
+            WHERE id = ? AND worker = ? AND status = 'running'
+        ''', (json.dumps(result, default=str), datetime.datetime.now().isoformat(), job_id, worker))
+        completed = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+        return completed
+
+    def fail(self, job_id: int, worker: str, error: str) -> str:
+        """Record a failure; the job is retried with backoff until it runs out of attempts"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                available_at = ? * (1 << (attempts - 1)) + ?,
+                finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END,
+                last_error = ?, lease_expires = NULL
+            WHERE id = ? AND worker = ? AND status = 'running'
+            RETURNING status
+        ''', (self.retry_delay, time.time(), datetime.datetime.now().isoformat(),
+              str(error)[:1000], job_id, worker))
+        row = cursor.fetchone()
+        conn.commit()
+        conn.close()
+        return row[0] if row else "lost"
+
+    def release(self, job_id: int, worker: str):
+        """Hand a job back untouched, e.g. when a worker is shutting down"""
+        conn = self.connect()
+        conn.execute('''
+            UPDATE jobs SET status = 'queued', attempts = attempts - 1, available_at = ?,
+                            lease_expires = NULL, worker = NULL
+            WHERE id = ? AND worker = ? AND status = 'running'
+        ''', (time.time(), job_id, worker))
+        conn.commit()
+        conn.close()
+
+    def purge(self, older_than_days: int = 30) -> int:
+        """Delete finished jobs older than the given age"""
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=older_than_days)).isoformat()
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Job counts per status and per task"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT task, status, COUNT(*) FROM jobs GROUP BY task, status ORDER BY task')
+        by_task: Dict[str, Dict[str, int]] = {}
+        totals: Dict[str, int] = {}
+        for task, status, count in cursor.fetchall():
+            by_task.setdefault(task, {})[status] = count
+            totals[status] = totals.get(status, 0) + count
+
+        cursor.execute("SELECT MIN(available_at) FROM jobs WHERE status = 'queued'")
+        oldest = cursor.fetchone()[0]
+        conn.close()
+
+        return {
+            "by_status": totals,
+            "by_task": by_task,
+            "oldest_ready_age_s": round(max(0.0, time.time() - oldest), 1) if oldest else 0.0
+        }
+
+
+def main():
+    """Show queue statistics"""
+
+    print("Virginia Home Essentials - Job Queue")
+    print("=" * 50)
+
+    stats = JobQueue().get_stats()
+    for status, count in sorted(stats["by_status"].items()):
+        print(f"{status}: {count}")
+    for task, counts in stats["by_task"].items():
+        print(f"  {task}: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+
+if __name__ == "__main__":
+    main()
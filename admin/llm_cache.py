@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - LLM Response Cache
+Persistent SQLite cache for model completions with per-type TTLs and LRU eviction
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+# How long a completion stays valid, per content type (seconds)
+DEFAULT_TTLS = {
+    "products": 24 * 3600,
+    "blog_post": 7 * 24 * 3600,
+    "market_insights": 12 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+
+
+class LLMCache:
+    def __init__(self, db_path: str = "llm_cache.db", ttls: Optional[Dict[str, int]] = None,
+                 max_entries: int = 1000, max_bytes: int = 50 * 1024 * 1024):
+        """Initialize the response cache"""
+        self.db_path = db_path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
+
+    def init_database(self):
+        """Create cache tables"""
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                content_type TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_lru ON llm_cache (last_accessed)')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache_stats (
+                content_type TEXT PRIMARY KEY,
+                hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0,
+                evictions INTEGER DEFAULT 0
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            self.init_database()
+            self._schema_ready = True
+        return sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+
+    @staticmethod
+    def make_key(model: str, messages: Any, **params) -> str:
+        """Stable hash of everything that determines a completion"""
+        payload = json.dumps({"model": model, "messages": messages, "params": params},
+                             sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _record(self, cursor, content_type: str, column: str, amount: int = 1):
+        cursor.execute(f'''
+            INSERT INTO llm_cache_stats (content_type, {column}) VALUES (?, ?)
+            ON CONFLICT(content_type) DO UPDATE SET {column} = {column} + excluded.{column}
+        ''', (content_type, amount))
+
+    def get(self, content_type: str, cache_key: str) -> Optional[str]:
+        """Return a cached response, or None on a miss or expired entry"""
+        now = time.time()
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT response, expires_at FROM llm_cache WHERE cache_key = ?', (cache_key,))
+        row = cursor.fetchone()
+
+        if row and row[1] > now:
+            cursor.execute('UPDATE llm_cache SET last_accessed = ? WHERE cache_key = ?', (now, cache_key))
+            self._record(cursor, content_type, "hits")
+            response = row[0]
+        else:
+            if row:
+                cursor.execute('DELETE FROM llm_cache WHERE cache_key = ?', (cache_key,))
+            self._record(cursor, content_type, "misses")
+            response = None
+
+        conn.commit()
+        conn.close()
+        return response
+
+    def set(self, content_type: str, cache_key: str, response: str):
+        """Store a response and evict least recently used entries over the limits"""
+        now = time.time()
+        ttl = self.ttls.get(content_type, DEFAULT_TTL)
+
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO llm_cache
+            (cache_key, content_type, response, size, created_at, expires_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (cache_key, content_type, response, len(response.encode("utf-8")), now, now + ttl, now))
+
+        # Expired entries go first, then least recently used ones
+        cursor.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (now,))
+
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache')
+        entries, total_bytes = cursor.fetchone()
+
+        if entries > self.max_entries or total_bytes > self.max_bytes:
+            cursor.execute('SELECT cache_key, content_type, size FROM llm_cache ORDER BY last_accessed')
+            victims = []
+            for key, victim_type, size in cursor.fetchall():
+                if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+                if key == cache_key:
+                    continue
+                victims.append((key, victim_type))
+                entries -= 1
+                total_bytes -= size
+
+            cursor.executemany('DELETE FROM llm_cache WHERE cache_key = ?', [(k,) for k, _ in victims])
+            for _, victim_type in victims:
+                self._record(cursor, victim_type, "evictions")
+
+        conn.commit()
+        conn.close()
+
+    def clear(self, content_type: Optional[str] = None):
+        """Drop cached responses, optionally for one content type"""
+        conn = self.connect()
+        if content_type:
+            conn.execute('DELETE FROM llm_cache WHERE content_type = ?', (content_type,))
+        else:
+            conn.execute('DELETE FROM llm_cache')
+        conn.commit()
+        conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts per content type plus current cache size"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT content_type, hits, misses, evictions FROM llm_cache_stats ORDER BY content_type')
+        by_type = {}
+        for content_type, hits, misses, evictions in cursor.fetchall():
+            lookups = hits + misses
+            by_type[content_type] = {
+                "hits": hits,
+                "misses": misses,
+                "evictions": evictions,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+            }
+
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache')
+        entries, total_bytes = cursor.fetchone()
+        conn.close()
+
+        hits = sum(s["hits"] for s in by_type.values())
+        lookups = hits + sum(s["misses"] for s in by_type.values())
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "by_type": by_type
+        }
+
+
+def main():
+    """Show cache statistics"""
+
+    print("Virginia Home Essentials - LLM Response Cache")
+    print("=" * 50)
+
+    stats = LLMCache().get_stats()
+    print(f"Entries: {stats['entries']} ({stats['bytes'] / 1024:.1f} KB)")
+    print(f"Hit rate: {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses)")
+    for content_type, type_stats in stats["by_type"].items():
+        print(f"  {content_type}: {type_stats['hit_rate']:.1%} hit rate, "
+              f"{type_stats['evictions']} evictions")
+
+if __name__ == "__main__":
+    main()
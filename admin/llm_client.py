@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - LLM Client
+Async chat completion client with bounded concurrency, retries and request coalescing
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Status codes worth retrying: rate limits and transient server errors
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class LLMClient:
+    def __init__(self, api_key: str = None, base_url: str = None, max_concurrency: int = 8,
+                 max_retries: int = 4, request_timeout: float = 60.0,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0):
+        """Initialize the LLM client"""
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.base_url = base_url or os.getenv('OPENAI_BASE_URL')
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.stats = {"requests": 0, "retries": 0, "coalesced": 0, "failures": 0}
+
+        # The SDK client, semaphore and in-flight table belong to one event loop
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _bind_loop(self):
+        """(Re)create loop-bound state when called from a new event loop.
+
+        A client is tied to the loop it was created on; run() and aclose()
+        close it on that loop before the loop goes away.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            from openai import AsyncOpenAI
+            # Retries are handled here so backoff and stats stay in one place
+            self._client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._inflight = {}
+
+    @staticmethod
+    def request_key(**request) -> str:
+        """Identity of a request for coalescing identical prompts"""
+        payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _is_retryable(self, error: Exception) -> bool:
+        import openai
+        if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+        return False
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff with full jitter, honouring Retry-After when given"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _retry_or_raise(self, attempt: int, error: Exception):
+        """Sleep before the next attempt, or re-raise when out of retries"""
+        if attempt >= self.max_retries or not self._is_retryable(error):
+            self.stats["failures"] += 1
+            raise error
+        self.stats["retries"] += 1
+        await asyncio.sleep(self._backoff_delay(attempt, error))
+
+    @staticmethod
+    def _usage(response) -> Optional[Dict[str, int]]:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+        return {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+
+    async def _request(self, request: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, int]]]:
+        """Send one completion with retries, holding a concurrency slot per attempt"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    self.stats["requests"] += 1
+                    response = await asyncio.wait_for(
+                        self._client.chat.completions.create(**request),
+                        timeout=self.request_timeout
+                    )
+                return response.choices[0].message.content, self._usage(response)
+            except Exception as e:
+                await self._retry_or_raise(attempt, e)
+
+    async def complete(self, **request) -> str:
+        """Return the completion text; identical in-flight requests share one call"""
+        content, _ = await self.complete_with_usage(**request)
+        return content
+
+    async def complete_with_usage(self, **request) -> Tuple[str, Optional[Dict[str, int]]]:
+        """Return the completion text and token usage.
+
+        Callers coalesced onto another caller's request get no usage, so
+        tokens are only counted once.
+        """
+        self._bind_loop()
+        key = self.request_key(**request)
+
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+            content, _ = await asyncio.shield(self._inflight[key])
+            return content, None
+
+        future = asyncio.ensure_future(self._request(request))
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+            else:
+                # The caller was cancelled; let the shared request finish for other waiters
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+    async def stream(self, usage_out: Optional[Dict[str, int]] = None, **request) -> AsyncIterator[str]:
+        """Yield completion text as it arrives.
+
+        Only opening the stream is retried; once text has been handed out a
+        failure propagates so the caller keeps what it already received. The
+        request timeout applies to the gap between chunks. Token usage is
+        written into ``usage_out`` when the stream reports it.
+        """
+        self._bind_loop()
+        if usage_out is not None:
+            request.setdefault("stream_options", {"include_usage": True})
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.stats["requests"] += 1
+                    response = await asyncio.wait_for(
+                        self._client.chat.completions.create(stream=True, **request),
+                        timeout=self.request_timeout
+                    )
+                    break
+                except Exception as e:
+                    await self._retry_or_raise(attempt, e)
+
+            try:
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.request_timeout)
+                    except StopAsyncIteration:
+                        return
+                    if usage_out is not None and getattr(chunk, "usage", None):
+                        usage_out.update(self._usage(chunk))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await response.close()
+
+    async def complete_many(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Run many completions concurrently; failures are returned as exceptions"""
+        return await asyncio.gather(*(self.complete(**request) for request in requests),
+                                    return_exceptions=True)
+
+    async def aclose(self):
+        """Close the SDK client and its connection pool; the next call opens a new one"""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.close()
+            self._client = self._loop = None
+
+    def run(self, coro):
+        """asyncio.run for code using this client: the client is closed before its loop is"""
+        async def run_and_close():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        return asyncio.run(run_and_close())
+
+    def complete_sync(self, **request) -> str:
+        """Blocking wrapper for callers outside an event loop"""
+        return self.run(self.complete(**request))
+
+
+def main():
+    """Send a single test prompt"""
+
+    print("Virginia Home Essentials - LLM Client")
+    print("=" * 50)
+
+    client = LLMClient()
+    if not client.api_key:
+        print("⚠️  OPENAI_API_KEY not configured")
+        return
+
+    reply = client.complete_sync(model="gpt-4", messages=[{"role": "user", "content": "Say hello"}])
+    print(reply)
+    print(f"Stats: {client.stats}")
+
+if __name__ == "__main__":
+    main()
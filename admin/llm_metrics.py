@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - LLM Metrics
+Records latency, token usage, estimated cost and outcome of every model call
+"""
+
+import datetime
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+# Upper bounds of the latency histogram buckets (milliseconds)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# USD per 1K prompt / completion tokens
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# How a call was answered
+OUTCOMES = ("api", "cache", "fallback", "error")
+
+
+@dataclass
+class LLMCall:
+    content_type: str
+    model: str = ""
+    outcome: str = "api"
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[str] = None
+
+    def set_usage(self, usage: Optional[Dict[str, int]]):
+        if usage:
+            self.prompt_tokens = usage.get("prompt_tokens") or 0
+            self.completion_tokens = usage.get("completion_tokens") or 0
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call; unknown models are priced at zero"""
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return prompt_tokens / 1000 * prompt_price + completion_tokens / 1000 * completion_price
+
+
+class LLMMetrics:
+    def __init__(self, db_path: str = "llm_metrics.db"):
+        """Initialize the metrics store"""
+        self.db_path = db_path
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
+
+    def init_database(self):
+        """Create the call log table"""
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content_type TEXT NOT NULL,
+                model TEXT,
+                outcome TEXT NOT NULL,
+                latency_ms REAL NOT NULL,
+                prompt_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                cost_usd REAL DEFAULT 0,
+                error TEXT,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_calls_created ON llm_calls (created_at)')
+
+        conn.commit()
+        conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            self.init_database()
+            self._schema_ready = True
+        return sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+
+    def record(self, call: LLMCall, latency_ms: float):
+        """Persist one call"""
+        conn = self.connect()
+        conn.execute('''
+            INSERT INTO llm_calls
+            (content_type, model, outcome, latency_ms, prompt_tokens, completion_tokens,
+             cost_usd, error, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            call.content_type, call.model, call.outcome, latency_ms,
+            call.prompt_tokens, call.completion_tokens,
+            estimate_cost(call.model, call.prompt_tokens, call.completion_tokens),
+            call.error, datetime.datetime.now().isoformat()
+        ))
+        conn.commit()
+        conn.close()
+
+    @contextmanager
+    def track(self, content_type: str, model: str = ""):
+        """Time a model call; exceptions are recorded as errors and re-raised"""
+        call = LLMCall(content_type, model)
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            call.outcome = "error"
+            call.error = str(e)[:500]
+            raise
+        finally:
+            self.record(call, (time.perf_counter() - start) * 1000)
+
+    def record_fallback(self, content_type: str, reason: str = None):
+        """Record that canned content was served instead of a generation"""
+        self.record(LLMCall(content_type, outcome="fallback", error=reason), 0.0)
+
+    def summary(self, days: int = 7) -> Dict[str, Any]:
+        """Per content type API latency histogram and percentiles, cache hit latency, tokens, cost and rates"""
+        since = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT content_type, outcome, latency_ms, prompt_tokens, completion_tokens, cost_usd
+            FROM llm_calls
+            WHERE created_at >= ?
+            ORDER BY content_type, latency_ms
+        ''', (since,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        by_type: Dict[str, Dict[str, Any]] = {}
+        latencies: Dict[str, list] = {}
+        cache_latencies: Dict[str, list] = {}
+
+        for content_type, outcome, latency_ms, prompt_tokens, completion_tokens, cost in rows:
+            stats = by_type.setdefault(content_type, {
+                "calls": 0,
+                "outcomes": {o: 0 for o in OUTCOMES},
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost_usd": 0.0,
+                "latency_histogram_ms": {str(b): 0 for b in LATENCY_BUCKETS_MS + ["+Inf"]}
+            })
+            stats["calls"] += 1
+            stats["outcomes"][outcome] = stats["outcomes"].get(outcome, 0) + 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost_usd"] += cost
+
+            # Latency figures describe the API; cache hits are timed separately and
+            # fallbacks never reach the model
+            if outcome == "cache":
+                cache_latencies.setdefault(content_type, []).append(latency_ms)
+            elif outcome != "fallback":
+                bucket = next((b for b in LATENCY_BUCKETS_MS if latency_ms <= b), "+Inf")
+                stats["latency_histogram_ms"][str(bucket)] += 1
+                latencies.setdefault(content_type, []).append(latency_ms)
+
+        for content_type, stats in by_type.items():
+            values = latencies.get(content_type, [])
+            stats["p50_ms"] = round(values[len(values) // 2], 1) if values else None
+            stats["p95_ms"] = round(values[min(len(values) - 1, int(len(values) * 0.95))], 1) if values else None
+            cached = cache_latencies.get(content_type, [])
+            stats["cache_p50_ms"] = round(cached[len(cached) // 2], 1) if cached else None
+            # A failed call is followed by a fallback, so rates are per served request
+            outcomes = stats["outcomes"]
+            served = outcomes["api"] + outcomes["cache"] + outcomes["fallback"]
+            stats["cache_hit_rate"] = round(outcomes["cache"] / served, 3) if served else 0.0
+            stats["fallback_rate"] = round(outcomes["fallback"] / served, 3) if served else 0.0
+            stats["cost_usd"] = round(stats["cost_usd"], 4)
+
+        return {
+            "period_days": days,
+            "total_calls": sum(s["calls"] for s in by_type.values()),
+            "total_cost_usd": round(sum(s["cost_usd"] for s in by_type.values()), 4),
+            "by_content_type": by_type
+        }
+
+
+def main():
+    """Print the last week's summary"""
+
+    print("Virginia Home Essentials - LLM Metrics")
+    print("=" * 50)
+
+    summary = LLMMetrics().summary()
+    print(f"Calls: {summary['total_calls']}, estimated cost: ${summary['total_cost_usd']:.2f}")
+    for content_type, stats in summary["by_content_type"].items():
+        print(f"  {content_type}: {stats['calls']} calls, API p50 {stats['p50_ms']} ms, "
+              f"p95 {stats['p95_ms']} ms, cache {stats['cache_hit_rate']:.0%} (p50 {stats['cache_p50_ms']} ms), "
+              f"fallback {stats['fallback_rate']:.0%}, ${stats['cost_usd']:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Logging Setup
+Queue-based logging: callers only enqueue records, a listener thread writes rotated, gzipped JSON lines
+"""
+
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from typing import Optional
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 14
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the standard fields plus any extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback out of the message so it lands in its own JSON field"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class CompressingRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """Rotates at midnight or when the file exceeds max_bytes; rotated files are gzipped"""
+
+    def __init__(self, filename: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT, encoding: str = "utf-8"):
+        super().__init__(filename, "a", encoding=encoding, delay=True)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rollover_at = self._next_midnight()
+
+    @staticmethod
+    def _next_midnight() -> float:
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+        return time.mktime(tomorrow.timetuple())
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self.rollover_at:
+            return os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0
+        if self.max_bytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes
+
+    def rotate(self, source: str, dest: str):
+        # Rotation is rare, so gzip is only imported when it happens
+        import gzip
+
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        # Stamps sort lexically in rotation order, which pruning relies on
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        dest = f"{self.baseFilename}.{stamp}.gz"
+        counter = 1
+        while os.path.exists(dest):
+            dest = f"{self.baseFilename}.{stamp}{counter}.gz"
+            counter += 1
+        if os.path.exists(self.baseFilename):
+            self.rotate(self.baseFilename, dest)
+
+        if self.backup_count > 0:
+            import glob
+
+            backups = sorted(glob.glob(f"{glob.escape(self.baseFilename)}.*.gz"))
+            for old in backups[:-self.backup_count]:
+                os.remove(old)
+
+        self.rollover_at = self._next_midnight()
+        self.stream = self._open()
+
+
+def setup_logging(log_dir: str = "logs", name: str = "automation", level: int = logging.INFO,
+                  console: bool = True, max_bytes: int = DEFAULT_MAX_BYTES,
+                  backup_count: int = DEFAULT_BACKUP_COUNT) -> logging.handlers.QueueListener:
+    """Route all logging through a queue to a JSON lines file and optionally the console.
+
+    Safe to call more than once; a forked child process gets its own listener
+    and should pass its own name so processes never rotate the same file.
+    """
+    global _listener, _listener_pid
+
+    if _listener and _listener_pid == os.getpid():
+        return _listener
+
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = CompressingRotatingFileHandler(os.path.join(log_dir, f"{name}.jsonl"), max_bytes, backup_count)
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(StructuredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener"""
+    global _listener
+    if _listener and _listener_pid == os.getpid():
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
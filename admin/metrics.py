@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Automation Metrics
+Counters, gauges and histograms per automation stage, exported as a Prometheus textfile, JSON summary and trend charts
+"""
+
+import datetime
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+# Upper bounds of the stage duration histogram buckets (seconds)
+DURATION_BUCKETS = [1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600]
+# Most lock waits are well under a second, so they get finer buckets
+LOCK_WAIT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# Histograms that don't use DURATION_BUCKETS
+HISTOGRAM_BUCKETS = {
+    "automation_db_lock_wait_seconds": LOCK_WAIT_BUCKETS,
+}
+
+METRIC_HELP = {
+    "automation_stage_runs_total": ("counter", "Stage runs by outcome"),
+    "automation_stage_items_total": ("counter", "Items processed by a stage"),
+    "automation_stage_errors_total": ("counter", "Errors seen by a stage"),
+    "automation_stage_duration_seconds": ("histogram", "Stage wall time"),
+    "automation_stage_last_run_timestamp_seconds": ("gauge", "Unix time the stage last finished"),
+    "automation_stage_last_success_timestamp_seconds": ("gauge", "Unix time the stage last succeeded"),
+    "automation_stage_items_per_second": ("gauge", "Throughput of the stage's last run"),
+    "automation_price_alerts_total": ("counter", "Price alerts raised by product tracking"),
+    "automation_db_lock_wait_seconds": ("histogram", "Time writers waited for a database write lock"),
+    "automation_products_tracked": ("gauge", "Products in the tracking database"),
+    "automation_blog_posts": ("gauge", "Blog posts in the database"),
+    "automation_scheduled_posts": ("gauge", "Blog posts waiting to be published"),
+}
+
+
+def _escape_label(value: Any) -> str:
+    # The exposition format escapes backslash, double quote and newline in label values
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_key(labels: Dict[str, Any]) -> str:
+    return ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items()))
+
+
+def _format_value(value: float) -> str:
+    """A sample value at full precision; timestamps and large counters must not be rounded"""
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(value)
+
+
+class StageRun:
+    """Timing and counts of one stage run; finish or fail it exactly once"""
+
+    def __init__(self, metrics: "AutomationMetrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.items = 0
+        self.errors = 0
+        self.started_at = datetime.datetime.now()
+        self._start = time.perf_counter()
+
+    def add_items(self, count: int = 1):
+        self.items += count
+
+    def add_error(self, count: int = 1):
+        self.errors += count
+
+    def finish(self, items: int = None):
+        if items is not None:
+            self.items = items
+        self.metrics._record_stage(self, "success", time.perf_counter() - self._start)
+
+    def fail(self, error: Exception = None):
+        self.errors += 1
+        self.metrics._record_stage(self, "error", time.perf_counter() - self._start)
+
+
+class AutomationMetrics:
+    def __init__(self, db_path: str = "automation_metrics.db", metrics_dir: str = "metrics"):
+        """Initialize the metrics store"""
+        self.db_path = db_path
+        self.textfile = f"{metrics_dir}/automation.prom"
+        self.summary_file = f"{metrics_dir}/summary.json"
+        self.trends_file = f"{metrics_dir}/trends.html"
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
+
+    def init_database(self):
+        """Create metric value and stage history tables"""
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        # Current value of every series; counters accumulate across processes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS metric_values (
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                value REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (name, labels)
+            )
+        ''')
+
+        # One row per stage run, for trends
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stage_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stage TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                duration_s REAL NOT NULL,
+                items INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_stage_runs_stage ON stage_runs (stage, started_at)')
+
+        conn.commit()
+        conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            self.init_database()
+            self._schema_ready = True
+        return sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+
+    def _inc(self, cursor, name: str, amount: float, labels: Dict[str, Any]):
+        cursor.execute('''
+            INSERT INTO metric_values (name, labels, value, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(name, labels) DO UPDATE
+            SET value = value + excluded.value, updated_at = excluded.updated_at
+        ''', (name, _label_key(labels), amount, time.time()))
+
+    def _set(self, cursor, name: str, value: float, labels: Dict[str, Any]):
+        cursor.execute('''
+            INSERT INTO metric_values (name, labels, value, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(name, labels) DO UPDATE
+            SET value = excluded.value, updated_at = excluded.updated_at
+        ''', (name, _label_key(labels), value, time.time()))
+
+    def _observe(self, cursor, name: str, value: float, labels: Dict[str, Any]):
+        for bound in HISTOGRAM_BUCKETS.get(name, DURATION_BUCKETS) + ["+Inf"]:
+            if bound == "+Inf" or value <= bound:
+                self._inc(cursor, f"{name}_bucket", 1, {**labels, "le": bound})
+        self._inc(cursor, f"{name}_sum", value, labels)
+        self._inc(cursor, f"{name}_count", 1, labels)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Add to a counter"""
+        conn = self.connect()
+        self._inc(conn.cursor(), name, amount, labels)
+        conn.commit()
+        conn.close()
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge"""
+        conn = self.connect()
+        self._set(conn.cursor(), name, value, labels)
+        conn.commit()
+        conn.close()
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a histogram observation"""
+        conn = self.connect()
+        self._observe(conn.cursor(), name, value, labels)
+        conn.commit()
+        conn.close()
+
+    def start_stage(self, stage: str) -> StageRun:
+        """Begin timing a stage"""
+        return StageRun(self, stage)
+
+    def _record_stage(self, run: StageRun, outcome: str, duration: float):
+        now = time.time()
+        labels = {"stage": run.stage}
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        self._inc(cursor, "automation_stage_runs_total", 1, {**labels, "outcome": outcome})
+        self._inc(cursor, "automation_stage_items_total", run.items, labels)
+        self._inc(cursor, "automation_stage_errors_total", run.errors, labels)
+        self._observe(cursor, "automation_stage_duration_seconds", duration, labels)
+        self._set(cursor, "automation_stage_last_run_timestamp_seconds", now, labels)
+        if outcome == "success":
+            self._set(cursor, "automation_stage_last_success_timestamp_seconds", now, labels)
+            self._set(cursor, "automation_stage_items_per_second",
+                      run.items / duration if duration > 0 else 0.0, labels)
+
+        cursor.execute('''
+            INSERT INTO stage_runs (stage, outcome, started_at, duration_s, items, errors)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (run.stage, outcome, run.started_at.isoformat(), duration, run.items, run.errors))
+        conn.commit()
+        conn.close()
+
+        self.export()
+
+    def _write_atomic(self, path: str, text: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def render_textfile(self) -> str:
+        """Prometheus text exposition of every series"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT name, labels, value FROM metric_values ORDER BY name, labels')
+        rows = cursor.fetchall()
+        conn.close()
+
+        # Histogram buckets must be listed in increasing order of their bound
+        def bucket_order(row):
+            match = re.search(r'le="([^"]+)"', row[1])
+            return (row[0], re.sub(r',?le="[^"]+"', "", row[1]), float(match.group(1)) if match else 0.0)
+        rows.sort(key=bucket_order)
+
+        lines = []
+        described = set()
+        for name, labels, value in rows:
+            family = next((f for f in METRIC_HELP if name == f or name.startswith(f"{f}_")), name)
+            if family not in described:
+                kind, help_text = METRIC_HELP.get(family, ("untyped", family))
+                lines.append(f"# HELP {family} {help_text}")
+                lines.append(f"# TYPE {family} {kind}")
+                described.add(family)
+            sample = _format_value(value)
+            lines.append(f"{name}{{{labels}}} {sample}" if labels else f"{name} {sample}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, days: int = 30) -> Dict[str, Any]:
+        """Per stage run counts, durations, throughput and error rate over recent runs"""
+        since = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT stage, outcome, started_at, duration_s, items, errors
+            FROM stage_runs WHERE started_at >= ?
+            ORDER BY stage, started_at
+        ''', (since,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        stages: Dict[str, Dict[str, Any]] = {}
+        for stage, outcome, started_at, duration, items, errors in rows:
+            stats = stages.setdefault(stage, {"runs": 0, "failures": 0, "items": 0, "errors": 0, "durations": []})
+            stats["runs"] += 1
+            stats["failures"] += outcome != "success"
+            stats["items"] += items
+            stats["errors"] += errors
+            stats["durations"].append(duration)
+            stats["last_run"] = started_at
+            stats["last_duration_s"] = round(duration, 2)
+            stats["last_items"] = items
+
+        for stats in stages.values():
+            durations = sorted(stats.pop("durations"))
+            total_time = sum(durations)
+            stats["p50_duration_s"] = round(durations[len(durations) // 2], 2)
+            stats["p95_duration_s"] = round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 2)
+            stats["items_per_second"] = round(stats["items"] / total_time, 3) if total_time else 0.0
+            stats["failure_rate"] = round(stats["failures"] / stats["runs"], 3)
+
+        return {"generated_at": datetime.datetime.now().isoformat(), "period_days": days, "stages": stages}
+
+    def trends(self, days: int = 90) -> Dict[str, List[Dict[str, Any]]]:
+        """Per stage series of (started_at, duration, items per second) for successful runs"""
+        since = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT stage, started_at, duration_s, items
+            FROM stage_runs WHERE started_at >= ? AND outcome = 'success'
+            ORDER BY stage, started_at
+        ''', (since,))
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        for stage, started_at, duration, items in cursor.fetchall():
+            series.setdefault(stage, []).append({
+                "started_at": started_at,
+                "duration_s": duration,
+                "items_per_second": items / duration if duration > 0 else 0.0
+            })
+        conn.close()
+        return series
+
+    def _svg_chart(self, points: List[Dict[str, Any]], key: str, title: str,
+                   width: int = 480, height: int = 140) -> str:
+        values = [p[key] for p in points]
+        top = max(values) or 1.0
+        step = (width - 20) / max(1, len(values) - 1)
+        coords = " ".join(f"{10 + i * step:.1f},{height - 20 - (v / top) * (height - 40):.1f}"
+                          for i, v in enumerate(values))
+        return (
+            f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img">'
+            f'<title>{title}</title>'
+            f'<text x="10" y="14" font-size="12">{title} (max {top:.2f})</text>'
+            f'<line x1="10" y1="{height - 20}" x2="{width - 10}" y2="{height - 20}" stroke="#ccc"/>'
+            f'<polyline fill="none" stroke="#2c5f2d" stroke-width="2" points="{coords}"/>'
+            f'<text x="10" y="{height - 5}" font-size="10">{points[0]["started_at"][:10]}</text>'
+            f'<text x="{width - 10}" y="{height - 5}" font-size="10" text-anchor="end">'
+            f'{points[-1]["started_at"][:10]}</text>'
+            f'</svg>'
+        )
+
+    def render_trends(self, days: int = 90) -> str:
+        """Write an HTML page with duration and throughput charts per stage"""
+        sections = []
+        for stage, points in self.trends(days).items():
+            sections.append(
+                f"<section><h2>{stage}</h2>"
+                f"{self._svg_chart(points, 'duration_s', 'Duration (s)')}"
+                f"{self._svg_chart(points, 'items_per_second', 'Items per second')}"
+                f"</section>"
+            )
+
+        html = (
+            "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+            "<title>Automation Trends</title>"
+            "<style>body{font-family:sans-serif;margin:2rem}svg{margin-right:1rem}</style>"
+            f"</head><body><h1>Automation Trends (last {days} days)</h1>"
+            f"{''.join(sections) or '<p>No successful stage runs yet.</p>'}"
+            "</body></html>"
+        )
+        self._write_atomic(self.trends_file, html)
+        return self.trends_file
+
+    def export(self):
+        """Write the Prometheus textfile and JSON summary"""
+        self._write_atomic(self.textfile, self.render_textfile())
+        self._write_atomic(self.summary_file, json.dumps(self.summary(), indent=2))
+
+
+def main():
+    """Export metrics and render trend charts"""
+
+    print("Virginia Home Essentials - Automation Metrics")
+    print("=" * 50)
+
+    metrics = AutomationMetrics()
+    metrics.export()
+    for stage, stats in metrics.summary()["stages"].items():
+        print(f"{stage}: {stats['runs']} runs, p50 {stats['p50_duration_s']}s, "
+              f"p95 {stats['p95_duration_s']}s, {stats['items_per_second']} items/s, "
+              f"{stats['failure_rate']:.0%} failed")
+
+    print(f"✅ Textfile: {metrics.textfile}")
+    print(f"✅ Trends: {metrics.render_trends()}")
+
+if __name__ == "__main__":
+    main()
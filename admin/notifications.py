@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Notification Dispatcher
+Durable outbox for alerts, delivered as per-channel digests by a background async sender
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+CHANNELS = ("email", "slack", "discord")
+
+# Alerts arriving within this window go out together as one digest
+DEFAULT_DIGEST_WINDOW = 60  # seconds
+# At most this many sends per channel per minute
+DEFAULT_RATE_PER_MINUTE = 6
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE = 5  # seconds
+BACKOFF_MAX = 15 * 60  # seconds
+# A claimed batch whose sender died is handed back after this long
+CLAIM_TIMEOUT = 5 * 60  # seconds
+SEND_TIMEOUT = 20  # seconds
+MAX_DIGEST_ITEMS = 50
+
+
+class NotificationDispatcher:
+    def __init__(self, settings: Dict[str, Any] = None, db_path: str = "notifications.db",
+                 logger: logging.Logger = None, poll_interval: float = 5.0):
+        """Initialize the dispatcher from the notification_settings config section"""
+        self.settings = settings or {}
+        self.db_path = db_path
+        self.logger = logger or logging.getLogger("Notifications")
+        self.poll_interval = poll_interval
+        self.digest_window = self.settings.get("digest_window_seconds", DEFAULT_DIGEST_WINDOW)
+        self.rate_interval = 60.0 / max(1, self.settings.get("rate_limit_per_minute", DEFAULT_RATE_PER_MINUTE))
+        self.max_attempts = self.settings.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+
+        self._thread: Optional[threading.Thread] = None
+        # asyncio, smtplib and email are imported by the sender thread, not at module load
+        self._loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._wakeup: Optional["asyncio.Event"] = None
+        self._stopping = False
+        self._flush = False
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
+
+    def init_database(self):
+        """Create outbox and rate limit tables"""
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                claimed_at REAL,
+                created_at REAL NOT NULL,
+                sent_at REAL,
+                last_error TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (channel, status, next_attempt_at)')
+
+        # Shared by every process, so the per-channel rate limit holds across workers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notification_rate (
+                channel TEXT PRIMARY KEY,
+                next_allowed_at REAL NOT NULL
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            self.init_database()
+            self._schema_ready = True
+        return sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+
+    def enabled_channels(self) -> List[str]:
+        """Channels with a destination configured"""
+        channels = []
+        if self.settings.get("email_alerts") and self.settings.get("email_to"):
+            channels.append("email")
+        if self.settings.get("slack_webhook"):
+            channels.append("slack")
+        if self.settings.get("discord_webhook"):
+            channels.append("discord")
+        return channels
+
+    def notify(self, subject: str, body: str, channels: List[str] = None) -> int:
+        """Write a notification to the outbox for each channel; returns the number of rows queued"""
+        channels = [c for c in (channels or self.enabled_channels()) if c in self.enabled_channels()]
+        if not channels:
+            return 0
+
+        now = time.time()
+        conn = self.connect()
+        conn.executemany('''
+            INSERT INTO outbox (channel, subject, body, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(channel, subject, body, now, now) for channel in channels])
+        conn.commit()
+        conn.close()
+
+        self._wake()
+        return len(channels)
+
+    # Background sender
+
+    def start(self):
+        """Start the background sender thread if it is not running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._thread_main, args=(ready,),
+                                        name="notification-dispatcher", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, flush: bool = True, timeout: float = 30.0):
+        """Stop the sender; with flush, pending notifications are sent first, ignoring the digest window"""
+        if not self._thread:
+            return
+        self._flush = flush
+        self._stopping = True
+        self._wake()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning("⚠️ Notification dispatcher did not finish in time; undelivered alerts stay in the outbox")
+        self._thread = None
+
+    def _wake(self):
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _thread_main(self, ready: threading.Event):
+        import asyncio
+
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._wakeup = None
+
+    async def _run(self):
+        import asyncio
+
+        while True:
+            # Cleared before dispatching so an alert queued meanwhile still wakes us
+            self._wakeup.clear()
+            flushing = self._stopping and self._flush
+            waits = await asyncio.gather(*(self._dispatch(channel, flushing) for channel in CHANNELS))
+
+            if self._stopping:
+                # Stop once a flushing pass finds nothing left, or right away without flush
+                if not self._flush or (flushing and all(w is None for w in waits)):
+                    break
+                if not flushing:
+                    continue
+
+            # Sleep until the soonest channel can send, or a new alert arrives
+            delay = min([w for w in waits if w is not None] + [self.poll_interval])
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.05, delay))
+            except asyncio.TimeoutError:
+                pass
+
+    def _claim(self, channel: str, flushing: bool):
+        """Atomically take a digest's worth of due rows; returns (rows, seconds to wait)"""
+        now = time.time()
+        conn = self.connect()
+        conn.isolation_level = None
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            # Batches claimed by a sender that died go back to pending
+            cursor.execute('''
+                UPDATE outbox SET status = 'pending', claimed_at = NULL
+                WHERE channel = ? AND status = 'sending' AND claimed_at <= ?
+            ''', (channel, now - CLAIM_TIMEOUT))
+
+            cursor.execute('''
+                SELECT MIN(created_at), MIN(next_attempt_at) FROM outbox
+                WHERE channel = ? AND status = 'pending'
+            ''', (channel,))
+            oldest, next_attempt = cursor.fetchone()
+            if oldest is None:
+                cursor.execute('COMMIT')
+                return [], None
+
+            # Wait for the digest window to fill unless flushing or retrying
+            due_at = max(next_attempt, oldest + (0 if flushing else self.digest_window))
+            cursor.execute('SELECT next_allowed_at FROM notification_rate WHERE channel = ?', (channel,))
+            row = cursor.fetchone()
+            if row:
+                due_at = max(due_at, row[0])
+            if due_at > now:
+                cursor.execute('COMMIT')
+                return [], due_at - now
+
+            cursor.execute('''
+                UPDATE outbox SET status = 'sending', claimed_at = ?, attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM outbox
+                    WHERE channel = ? AND status = 'pending' AND next_attempt_at <= ?
+                    ORDER BY created_at LIMIT ?
+                )
+                RETURNING id, subject, body, created_at, attempts
+            ''', (now, channel, now, MAX_DIGEST_ITEMS))
+            rows = sorted(cursor.fetchall(), key=lambda r: r[3])
+
+            cursor.execute('''
+                INSERT INTO notification_rate (channel, next_allowed_at) VALUES (?, ?)
+                ON CONFLICT(channel) DO UPDATE SET next_allowed_at = excluded.next_allowed_at
+            ''', (channel, now + self.rate_interval))
+            cursor.execute('COMMIT')
+            return rows, None
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    async def _dispatch(self, channel: str, flushing: bool) -> Optional[float]:
+        """Send one digest for a channel if due; returns seconds until it should be checked again"""
+        import asyncio
+
+        try:
+            rows, wait = await asyncio.to_thread(self._claim, channel, flushing)
+        except sqlite3.Error as e:
+            self.logger.warning(f"⚠️ Could not read the {channel} outbox: {e}")
+            return self.poll_interval
+        if not rows:
+            return wait
+
+        subject, body = self._digest(rows)
+        started = time.time()
+        try:
+            if channel == "email":
+                await asyncio.to_thread(self._send_email, subject, body)
+            else:
+                await self._send_webhook(channel, subject, body)
+        except Exception as e:
+            await asyncio.to_thread(self._record_failure, rows, str(e))
+            self.logger.warning(f"⚠️ {channel} notification failed (attempt {rows[0][4]}): {e}")
+        else:
+            await asyncio.to_thread(self._record_success, rows)
+            self.logger.info(f"✅ Sent {channel} digest with {len(rows)} alert(s) in {time.time() - started:.2f}s")
+        return 0.0
+
+    def _digest(self, rows) -> tuple:
+        if len(rows) == 1:
+            return rows[0][1], rows[0][2]
+        subject = f"{len(rows)} alerts: {rows[0][1]}"
+        body = "\n\n".join(f"{row[1]}\n{row[2]}" for row in rows)
+        return subject, body
+
+    async def _send_webhook(self, channel: str, subject: str, body: str):
+        import httpx
+
+        url = self.settings.get(f"{channel}_webhook")
+        text = f"*{subject}*\n{body}" if channel == "slack" else f"**{subject}**\n{body}"
+        # Discord rejects messages over 2000 characters
+        payload = {"text": text} if channel == "slack" else {"content": text[:2000]}
+        async with httpx.AsyncClient(timeout=SEND_TIMEOUT) as client:
+            response = await client.post(url, json=payload)
+        # Webhook URLs are credentials, so keep them out of the error
+        if response.status_code >= 400:
+            raise RuntimeError(f"{channel} webhook returned HTTP {response.status_code}")
+
+    def _send_email(self, subject: str, body: str):
+        import smtplib
+        from email.message import EmailMessage
+
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.settings.get("email_from") or "alerts@localhost"
+        recipients = self.settings.get("email_to")
+        message["To"] = ", ".join(recipients) if isinstance(recipients, list) else recipients
+        message.set_content(body)
+
+        with smtplib.SMTP(self.settings.get("smtp_host") or "localhost", self.settings.get("smtp_port", 587),
+                          timeout=SEND_TIMEOUT) as smtp:
+            if self.settings.get("smtp_use_tls", True):
+                smtp.starttls()
+            user = self.settings.get("smtp_user") or os.getenv("SMTP_USER")
+            if user:
+                smtp.login(user, self.settings.get("smtp_password") or os.getenv("SMTP_PASSWORD", ""))
+            smtp.send_message(message)
+
+    def _record_success(self, rows):
+        now = time.time()
+        conn = self.connect()
+        conn.executemany("UPDATE outbox SET status = 'sent', sent_at = ?, claimed_at = NULL WHERE id = ?",
+                         [(now, row[0]) for row in rows])
+        conn.commit()
+        conn.close()
+
+    def _record_failure(self, rows, error: str):
+        now = time.time()
+        updates = []
+        for row_id, _, _, _, attempts in rows:
+            if attempts >= self.max_attempts:
+                updates.append(('failed', now, error[:500], row_id))
+            else:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+                updates.append(('pending', now + random.uniform(delay / 2, delay), error[:500], row_id))
+
+        conn = self.connect()
+        conn.executemany('''
+            UPDATE outbox SET status = ?, next_attempt_at = ?, last_error = ?, claimed_at = NULL
+            WHERE id = ?
+        ''', updates)
+        conn.commit()
+        conn.close()
+
+    def get_stats(self, days: int = 7) -> Dict[str, Any]:
+        """Delivered, failed and pending counts, failed attempts and delivery latency per channel"""
+        since = time.time() - days * 86400
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT channel, status, attempts, created_at, sent_at FROM outbox
+            WHERE created_at >= ?
+        ''', (since,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        latencies: Dict[str, List[float]] = {}
+        for channel, status, attempts, created_at, sent_at in rows:
+            channel_stats = stats.setdefault(channel, {"sent": 0, "failed": 0, "pending": 0, "failed_attempts": 0})
+            if status == "sent":
+                channel_stats["sent"] += 1
+                channel_stats["failed_attempts"] += attempts - 1
+                latencies.setdefault(channel, []).append((sent_at - created_at) * 1000)
+            elif status == "failed":
+                channel_stats["failed"] += 1
+                channel_stats["failed_attempts"] += attempts
+            else:
+                channel_stats["pending"] += 1
+                channel_stats["failed_attempts"] += max(0, attempts - (status == "sending"))
+
+        for channel, values in latencies.items():
+            values.sort()
+            stats[channel]["p50_latency_ms"] = round(values[len(values) // 2], 1)
+            stats[channel]["p95_latency_ms"] = round(values[min(len(values) - 1, int(len(values) * 0.95))], 1)
+
+        return stats
+
+
+def main():
+    """Show outbox statistics"""
+
+    print("Virginia Home Essentials - Notification Dispatcher")
+    print("=" * 50)
+
+    stats = NotificationDispatcher().get_stats()
+    if not stats:
+        print("No notifications in the last 7 days")
+    for channel, channel_stats in stats.items():
+        print(f"{channel}: {channel_stats['sent']} sent, {channel_stats['pending']} pending, "
+              f"{channel_stats['failed']} failed, {channel_stats['failed_attempts']} failed attempts, "
+              f"p95 latency {channel_stats.get('p95_latency_ms')} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Pipeline Executor
+Runs stages as a dependency graph, starting each stage as soon as its inputs are ready
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PipelineError(RuntimeError):
+    """Raised when a stage fails; carries the name of the failing stage"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[..., Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    executor: str = "thread"  # "thread" or "process" (func and inputs must be picklable)
+
+
+@dataclass
+class StageTiming:
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class PipelineResult:
+    artifacts: Dict[str, Any]
+    timings: Dict[str, StageTiming]
+    critical_path: List[str]
+    wall_time: float
+
+    @property
+    def critical_path_time(self) -> float:
+        return sum(self.timings[name].duration for name in self.critical_path)
+
+    @property
+    def total_stage_time(self) -> float:
+        return sum(timing.duration for timing in self.timings.values())
+
+
+class Pipeline:
+    def __init__(self, name: str = "pipeline", max_workers: int = 4, logger: logging.Logger = None):
+        """Initialize an empty pipeline"""
+        self.name = name
+        self.max_workers = max_workers
+        self.logger = logger or logging.getLogger("Pipeline")
+        self.stages: Dict[str, Stage] = {}
+
+    def add_stage(self, name: str, func: Callable[..., Any], inputs: List[str] = None,
+                  outputs: List[str] = None, executor: str = "thread") -> "Pipeline":
+        """Register a stage; it is called with its inputs as keyword arguments.
+
+        A stage with one output returns that value; a stage with several
+        outputs returns a dict keyed by output name.
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage '{name}'")
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor '{executor}'")
+        self.stages[name] = Stage(name, func, list(inputs or []), list(outputs or []), executor)
+        return self
+
+    def _producers(self) -> Dict[str, str]:
+        """Map each artifact to the stage that produces it, validating the graph"""
+        producers = {}
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Artifact '{output}' produced by both '{producers[output]}' and '{stage.name}'")
+                producers[output] = stage.name
+
+        for stage in self.stages.values():
+            for artifact in stage.inputs:
+                if artifact not in producers:
+                    raise ValueError(f"Stage '{stage.name}' needs '{artifact}', which no stage produces")
+
+        # Kahn's algorithm; leftover stages form a cycle
+        remaining = {name: {producers[a] for a in stage.inputs} for name, stage in self.stages.items()}
+        while True:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                break
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        if remaining:
+            raise ValueError(f"Dependency cycle between stages: {', '.join(sorted(remaining))}")
+
+        return producers
+
+    def _critical_path(self, producers: Dict[str, str], timings: Dict[str, StageTiming]) -> List[str]:
+        """Chain of dependent stages with the longest total duration"""
+        longest: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+
+        for name in sorted(timings, key=lambda n: timings[n].end):
+            upstream = {producers[a] for a in self.stages[name].inputs}
+            best = max(upstream, key=lambda n: longest[n], default=None)
+            longest[name] = timings[name].duration + (longest[best] if best else 0.0)
+            previous[name] = best
+
+        path = []
+        current = max(longest, key=longest.get, default=None)
+        while current:
+            path.append(current)
+            current = previous[current]
+        return list(reversed(path))
+
+    def _store_outputs(self, stage: Stage, value: Any, artifacts: Dict[str, Any]):
+        if len(stage.outputs) == 1:
+            artifacts[stage.outputs[0]] = value
+        elif stage.outputs:
+            for output in stage.outputs:
+                artifacts[output] = value[output]
+
+    def run(self, artifacts: Dict[str, Any] = None) -> PipelineResult:
+        """Execute all stages; independent stages run concurrently"""
+        producers = self._producers()
+        artifacts = dict(artifacts or {})
+        timings: Dict[str, StageTiming] = {}
+
+        pending = dict(self.stages)
+        running = {}
+        executors: Dict[str, Executor] = {}
+        failure = None
+        started = time.perf_counter()
+
+        def get_executor(kind: str) -> Executor:
+            if kind not in executors:
+                if kind == "process":
+                    # Imports multiprocessing, so only pipelines with process stages pay for it
+                    from concurrent.futures import ProcessPoolExecutor as pool
+                else:
+                    pool = ThreadPoolExecutor
+                executors[kind] = pool(max_workers=self.max_workers)
+            return executors[kind]
+
+        try:
+            while pending or running:
+                if failure is None:
+                    ready = [stage for stage in pending.values()
+                             if all(producers[a] in timings for a in stage.inputs)]
+                    for stage in ready:
+                        del pending[stage.name]
+                        kwargs = {a: artifacts[a] for a in stage.inputs}
+                        self.logger.info(f"▶️  [{self.name}] {stage.name} started")
+                        future = get_executor(stage.executor).submit(stage.func, **kwargs)
+                        running[future] = (stage, time.perf_counter())
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, stage_start = running.pop(future)
+                    end = time.perf_counter()
+                    try:
+                        self._store_outputs(stage, future.result(), artifacts)
+                    except Exception as e:
+                        self.logger.error(f"❌ [{self.name}] {stage.name} failed after {end - stage_start:.1f}s: {e}")
+                        # Let running stages finish but start nothing new
+                        failure = failure or PipelineError(stage.name, e)
+                        continue
+
+                    timings[stage.name] = StageTiming(stage_start - started, end - started)
+                    self.logger.info(f"✅ [{self.name}] {stage.name} finished in {end - stage_start:.1f}s")
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        if failure:
+            raise failure
+
+        result = PipelineResult(artifacts, timings, self._critical_path(producers, timings),
+                                time.perf_counter() - started)
+        self.logger.info(
+            f"[{self.name}] finished in {result.wall_time:.1f}s "
+            f"(stages total {result.total_stage_time:.1f}s, "
+            f"critical path {' → '.join(result.critical_path)} {result.critical_path_time:.1f}s)"
+        )
+        return result
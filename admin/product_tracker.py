@@ -4,7 +4,6 @@ Virginia Home Essentials - Product Tracker
 Automated system for tracking trending products, prices, and affiliate opportunities
 """
 
-import requests
 import json
 import csv
 import datetime
@@ -13,8 +12,13 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 import sqlite3
 import os
-from bs4 import BeautifulSoup
 import re
+import logging
+
+from db_lock import write_lock
+from db_stats import ensure_table_stats, table_stats
+from image_pipeline import image_url
+from log_setup import setup_logging
 
 @dataclass
 class Product:
@@ -40,11 +44,16 @@ class TrendingProduct:
     recommended_products: List[str]
 
 class AmazonProductTracker:
-    def __init__(self, associate_tag: str = "your-tag-20"):
+    def __init__(self, associate_tag: str = "your-tag-20", logger: logging.Logger = None,
+                 db_path: str = "products.db"):
         """Initialize the product tracker"""
         self.associate_tag = associate_tag
-        self.db_path = "products.db"
-        self.init_database()
+        self.logger = logger or logging.getLogger("ProductTracker")
+        self.db_path = db_path
+        # Pause between keyword searches to stay under the product API rate limit
+        self.request_delay = 1.0  # seconds
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
         
         # Virginia-specific product categories for new homeowners
         self.target_categories = {
@@ -89,6 +98,8 @@ class AmazonProductTracker:
     def init_database(self):
         """Initialize SQLite database for product tracking"""
         conn = sqlite3.connect(self.db_path)
+        # Readers get a WAL snapshot instead of waiting on the writer
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
         
         # Products table
@@ -131,9 +142,30 @@ class AmazonProductTracker:
             )
         ''')
         
+        # Trigger-maintained product counts per category
+        ensure_table_stats(conn, "products", ["category"])
+        
         conn.commit()
         conn.close()
 
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            with write_lock(self.db_path, "products schema"):
+                self.init_database()
+            self._schema_ready = True
+        conn = sqlite3.connect(self.db_path)
+        # INSERT OR REPLACE only fires the stats delete trigger with recursive triggers on
+        conn.execute("PRAGMA recursive_triggers = ON")
+        return conn
+
+    def stats(self) -> Dict[str, Any]:
+        """Product counts, total and by category, without scanning the table"""
+        conn = self.connect()
+        stats = table_stats(conn, "products")
+        conn.close()
+        return stats
+
     def search_amazon_products(self, keyword: str, category: str, max_results: int = 20) -> List[Product]:
         """Search for products on Amazon (simulated - would use actual API in production)"""
         
@@ -231,7 +263,7 @@ class AmazonProductTracker:
                 rating=product_data["rating"],
                 review_count=product_data["review_count"],
                 category=category,
-                image_url=f"https://images.unsplash.com/photo-{1500000000 + i}?w=400&h=400",
+                image_url=image_url(f"products/{category}", f"https://images.unsplash.com/photo-{1500000000 + i}?w=400&h=400"),
                 affiliate_url=f"https://amazon.com/dp/{asin}?tag={self.associate_tag}",
                 last_updated=datetime.datetime.now().isoformat(),
                 trending_score=self._calculate_trending_score(product_data),
@@ -257,36 +289,37 @@ class AmazonProductTracker:
     def _save_products_to_db(self, products: List[Product]):
         """Save products to database"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for product in products:
-            # Insert or update product
-            cursor.execute('''
-                INSERT OR REPLACE INTO products 
-                (asin, title, price, rating, review_count, category, image_url, 
-                 affiliate_url, last_updated, trending_score, availability, prime_eligible)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                product.asin, product.title, product.price, product.rating,
-                product.review_count, product.category, product.image_url,
-                product.affiliate_url, product.last_updated, product.trending_score,
-                product.availability, product.prime_eligible
-            ))
+        with write_lock(self.db_path, "save products"):
+            conn = self.connect()
+            cursor = conn.cursor()
             
-            # Add price history
-            cursor.execute('''
-                INSERT INTO price_history (asin, price, timestamp)
-                VALUES (?, ?, ?)
-            ''', (product.asin, product.price, product.last_updated))
-        
-        conn.commit()
-        conn.close()
+            for product in products:
+                # Insert or update product
+                cursor.execute('''
+                    INSERT OR REPLACE INTO products 
+                    (asin, title, price, rating, review_count, category, image_url, 
+                     affiliate_url, last_updated, trending_score, availability, prime_eligible)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    product.asin, product.title, product.price, product.rating,
+                    product.review_count, product.category, product.image_url,
+                    product.affiliate_url, product.last_updated, product.trending_score,
+                    product.availability, product.prime_eligible
+                ))
+            
+                # Add price history
+                cursor.execute('''
+                    INSERT INTO price_history (asin, price, timestamp)
+                    VALUES (?, ?, ?)
+                ''', (product.asin, product.price, product.last_updated))
+            
+            conn.commit()
+            conn.close()
 
     def get_trending_products(self, category: str = None, limit: int = 10) -> List[Product]:
         """Get trending products from database"""
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
         if category:
@@ -318,29 +351,47 @@ class AmazonProductTracker:
         
         return products
 
-    def update_all_products(self):
-        """Update all products in database with current data"""
+    def update_all_products(self, checkpoint=None) -> int:
+        """Update all products in database with current data; returns the number of products found.
         
-        print("Starting product update process...")
+        With a run_state Checkpoint, keywords finished by an earlier attempt
+        are skipped; saving products is an upsert, so redoing one is safe.
+        """
+        
+        self.logger.info("Starting product update process...")
+        found = 0
+        if checkpoint and checkpoint.resumed:
+            self.logger.info(f"Resuming: {checkpoint.completed('keywords')} keywords already done")
         
         for category, keywords in self.target_categories.items():
-            print(f"\nUpdating {category} products...")
+            self.logger.info(f"Updating {category} products...", extra={"category": category})
             
             for keyword in keywords:
-                print(f"  Searching for: {keyword}")
+                unit = f"{category}/{keyword}"
+                if checkpoint and checkpoint.is_done("keywords", unit):
+                    continue
+                
+                self.logger.debug(f"Searching for: {keyword}", extra={"category": category, "keyword": keyword})
                 
                 try:
                     products = self.search_amazon_products(keyword, category, 5)
-                    print(f"    Found {len(products)} products")
+                    self.logger.info(f"Found {len(products)} products for {keyword}",
+                                     extra={"category": category, "keyword": keyword, "count": len(products)})
+                    found += len(products)
+                    
+                    if checkpoint:
+                        checkpoint.mark_done("keywords", unit)
                     
                     # Rate limiting
-                    time.sleep(1)
+                    time.sleep(self.request_delay)
                     
                 except Exception as e:
-                    print(f"    Error searching for {keyword}: {e}")
+                    self.logger.error(f"Error searching for {keyword}: {e}",
+                                      extra={"category": category, "keyword": keyword})
                     continue
         
-        print("\n✅ Product update complete!")
+        self.logger.info(f"✅ Product update complete: {found} products found", extra={"count": found})
+        return found
 
     def generate_product_report(self, output_file: str = "product_report.json"):
         """Generate comprehensive product report"""
@@ -366,7 +417,7 @@ class AmazonProductTracker:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
         
-        print(f"Product report saved to {output_file}")
+        self.logger.info(f"Product report saved to {output_file}")
         
         return report
 
@@ -400,7 +451,7 @@ class AmazonProductTracker:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(website_data, f, indent=2)
         
-        print(f"Website products exported to {output_file}")
+        self.logger.info(f"Website products exported to {output_file}")
         
         return website_data
 
@@ -429,7 +480,7 @@ class AmazonProductTracker:
     def monitor_price_changes(self, threshold_percent: float = 10.0) -> List[Dict]:
         """Monitor for significant price changes"""
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
         # Get products with price history
@@ -474,6 +525,8 @@ class AmazonProductTracker:
 def main():
     """Main function to demonstrate the product tracker"""
     
+    setup_logging(name="product_tracker")
+    
     print("Virginia Home Essentials - Product Tracker")
     print("=" * 50)
     
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Task Profiler
+Profiles an automation task with cProfile and a stack sampler, writing .pstats and flame graph input to reports/
+"""
+
+import datetime
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_MODES = ("cprofile", "sample")
+DEFAULT_TOP_N = 25
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _function_label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return re.sub(r" at 0x[0-9a-f]+", "", name)  # built-in
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class StackSampler:
+    """Samples the stacks of non-daemon threads on a timer and counts them in collapsed form.
+
+    Background daemon threads (log listener, notification sender, heartbeats)
+    are idle most of the time and are left out. Work done in process pools
+    is not visible to the sampler.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            threads = {t.ident: t.name for t in threading.enumerate() if not t.daemon}
+            for ident, frame in sys._current_frames().items():
+                if ident not in threads:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(threads[ident])
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str):
+        """Write 'frame;frame;frame count' lines, the input format of flamegraph.pl and speedscope"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int) -> List[Dict[str, float]]:
+        """Functions by sampled self time, with the time of samples they appear in at all"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # drop the thread name
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return [{
+            "function": frame,
+            "self_seconds": round(count * self.interval, 3),
+            "cumulative_seconds": round(total[frame] * self.interval, 3)
+        } for frame, count in own.most_common(limit)]
+
+
+class SQLTimer:
+    """Times SQLite statements on every connection opened while installed.
+
+    sqlite3.connect is swapped for a wrapper that adds a timing cursor and a
+    trace callback. The callback fires once per statement, once per trigger
+    firing and once per statement in the trigger body, but on newer Pythons
+    trigger callbacks carry the outer statement's SQL, so trigger work is
+    counted as the callbacks an execute() produces beyond one per statement.
+    """
+
+    # Implicit and explicit transaction control is traced too, but never fires triggers
+    TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "END", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+    def __init__(self):
+        self.statements: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])  # count, total, max
+        self.traced: Counter = Counter()
+        self._lock = threading.Lock()
+        # Trace callbacks run synchronously in the thread that executes the statement
+        self._callbacks = threading.local()
+        self._connect = None
+
+    @staticmethod
+    def _normalize(sql: str) -> str:
+        return re.sub(r"\s+", " ", sql).strip()[:200]
+
+    def record(self, sql: str, elapsed: float):
+        key = self._normalize(sql)
+        with self._lock:
+            entry = self.statements[key]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+    def _trace(self, statement: str):
+        if not statement.lstrip().upper().startswith(self.TRANSACTION_CONTROL):
+            self._callbacks.count = self._callback_count() + 1
+
+    def _callback_count(self) -> int:
+        return getattr(self._callbacks, "count", 0)
+
+    def _count_traced(self, runs: int, callbacks: int):
+        """Count statements run by execute() and the trigger steps they caused"""
+        with self._lock:
+            self.traced["statement"] += runs
+            self.traced["trigger"] += max(0, callbacks - runs)
+
+    def install(self):
+        timer = self
+        self._connect = original = sqlite3.connect
+
+        class TimedCursor(sqlite3.Cursor):
+            def execute(self, sql, parameters=()):
+                callbacks = timer._callback_count()
+                started = time.perf_counter()
+                try:
+                    return super().execute(sql, parameters)
+                finally:
+                    timer.record(sql, time.perf_counter() - started)
+                    timer._count_traced(1, timer._callback_count() - callbacks)
+
+            def executemany(self, sql, seq_of_parameters):
+                # Materialized so the number of runs is known
+                seq_of_parameters = list(seq_of_parameters)
+                callbacks = timer._callback_count()
+                started = time.perf_counter()
+                try:
+                    return super().executemany(sql, seq_of_parameters)
+                finally:
+                    timer.record(sql, time.perf_counter() - started)
+                    timer._count_traced(len(seq_of_parameters), timer._callback_count() - callbacks)
+
+        class TimedConnection(sqlite3.Connection):
+            def cursor(self, factory=TimedCursor):
+                return super().cursor(factory)
+
+            # The built-in shortcuts bypass cursor(), so route them through it
+            def execute(self, sql, parameters=()):
+                return self.cursor().execute(sql, parameters)
+
+            def executemany(self, sql, seq_of_parameters):
+                return self.cursor().executemany(sql, seq_of_parameters)
+
+        def connect(*args, **kwargs):
+            kwargs.setdefault("factory", TimedConnection)
+            conn = original(*args, **kwargs)
+            conn.set_trace_callback(timer._trace)
+            return conn
+
+        sqlite3.connect = connect
+
+    def uninstall(self):
+        if self._connect:
+            sqlite3.connect = self._connect
+            self._connect = None
+
+    def slowest(self, limit: int) -> List[Dict[str, object]]:
+        """Statements by total time spent in execute()"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [{
+            "sql": sql,
+            "count": count,
+            "total_ms": round(total * 1000, 2),
+            "max_ms": round(longest * 1000, 2)
+        } for sql, (count, total, longest) in ranked[:limit]]
+
+
+class Profiler:
+    """Context manager that profiles one task run and reports where its time went.
+
+    mode "cprofile" runs cProfile (main thread, exact call counts) alongside
+    the stack sampler; "sample" runs only the sampler, which costs much less.
+    mode None with trace_sql only times SQL statements.
+    """
+
+    def __init__(self, task: str, mode: Optional[str] = "cprofile", trace_sql: bool = False,
+                 output_dir: str = "reports", top_n: int = DEFAULT_TOP_N,
+                 interval: float = DEFAULT_SAMPLE_INTERVAL, logger: logging.Logger = None):
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.task = task
+        self.mode = mode
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.logger = logger or logging.getLogger("Profiler")
+        self.profile = None
+        if mode == "cprofile":
+            # cProfile and pstats are only imported once a task is actually profiled
+            import cProfile
+            self.profile = cProfile.Profile()
+        self.sampler = StackSampler(interval) if mode else None
+        self.sql_timer = SQLTimer() if trace_sql else None
+        self.files: Dict[str, str] = {}
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        if self.sql_timer:
+            self.sql_timer.install()
+        if self.sampler:
+            self.sampler.start()
+        self._started = time.perf_counter()
+        if self.profile:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile:
+            self.profile.disable()
+        self.elapsed = time.perf_counter() - self._started
+        if self.sampler:
+            self.sampler.stop()
+        if self.sql_timer:
+            self.sql_timer.uninstall()
+        try:
+            self.report()
+        except OSError as e:
+            self.logger.error(f"❌ Could not write profile for {self.task}: {e}")
+        return False
+
+    def report(self):
+        """Write the profile files and log the hottest functions and statements"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.output_dir, f"profile_{self.task}_{stamp}")
+        self.logger.info(f"Profile of '{self.task}': {self.elapsed:.2f}s wall time",
+                         extra={"task": self.task, "elapsed_seconds": round(self.elapsed, 3)})
+
+        if self.profile:
+            import pstats
+
+            self.files["pstats"] = f"{base}.pstats"
+            self.profile.dump_stats(self.files["pstats"])
+            self.logger.info(f"Top {self.top_n} functions by self time (cProfile, main thread):")
+            for row in top_functions(pstats.Stats(self.profile), self.top_n):
+                self.logger.info(f"  {row['self_seconds']:8.3f}s self {row['cumulative_seconds']:8.3f}s cum "
+                                 f"{row['calls']:>8} calls  {row['function']}", extra=row)
+
+        if self.sampler:
+            self.files["collapsed"] = f"{base}.collapsed"
+            self.sampler.write_collapsed(self.files["collapsed"])
+            if not self.profile:
+                self.logger.info(f"Top {self.top_n} functions by self time "
+                                 f"({self.sampler.samples} samples every {self.sampler.interval * 1000:.0f}ms):")
+                for row in self.sampler.top_functions(self.top_n):
+                    self.logger.info(f"  {row['self_seconds']:8.3f}s self {row['cumulative_seconds']:8.3f}s cum  "
+                                     f"{row['function']}", extra=row)
+
+        if self.sql_timer:
+            traced = self.sql_timer.traced
+            self.logger.info(f"SQL: {traced['statement']} statements, {traced['trigger']} trigger steps; "
+                             f"slowest by total time:")
+            for row in self.sql_timer.slowest(min(self.top_n, 10)):
+                self.logger.info(f"  {row['total_ms']:9.2f}ms total {row['max_ms']:8.2f}ms max "
+                                 f"{row['count']:>6}x  {row['sql'][:120]}", extra=row)
+
+        for kind, path in self.files.items():
+            self.logger.info(f"✅ Wrote {kind} profile to {path}")
+
+
+def top_functions(stats: "pstats.Stats", limit: int = DEFAULT_TOP_N) -> List[Dict[str, object]]:
+    """Functions of a cProfile run by self time"""
+    ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [{
+        "function": _function_label(func),
+        "calls": calls,
+        "self_seconds": round(own, 3),
+        "cumulative_seconds": round(cumulative, 3)
+    } for func, (_, calls, own, cumulative, _) in ranked[:limit]]
+
+
+def main():
+    """Print the hottest functions of a saved .pstats file"""
+    import pstats
+
+    print("Virginia Home Essentials - Task Profiler")
+    print("=" * 50)
+
+    if len(sys.argv) < 2:
+        print("Usage: python profiling.py reports/profile_<task>_<time>.pstats [top_n]")
+        return
+
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TOP_N
+    for row in top_functions(pstats.Stats(sys.argv[1]), limit):
+        print(f"{row['self_seconds']:8.3f}s self {row['cumulative_seconds']:8.3f}s cum "
+              f"{row['calls']:>8} calls  {row['function']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Related Posts Engine
+Precomputes a TF-IDF related-content graph for blog posts at publish time
+"""
+
+import json
+import re
+import sqlite3
+from collections import Counter
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Set
+
+import numpy as np
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+# Ids bound per IN (...) query, well under SQLite's host parameter limit
+SQL_IN_CHUNK = 500
+
+STOP_WORDS = frozenset("""
+    about after again also and any are because been before being between both but
+    can could did does doing down during each few for from further had has have
+    having her here hers him his how into its itself just more most need needs
+    not now off once only other our ours out over own same she should some such
+    than that the their theirs them then there these they this those through too
+    under until very was were what when where which while who whom why will with
+    would you your yours yourself virginia home homes homeowner homeowners new
+""".split())
+
+
+class RelatedPostsEngine:
+    def __init__(self, db_path: str = "blog_system.db", output_file: str = "../blog/related.json",
+                 top_k: int = 4, max_terms: int = 64):
+        """Initialize the related posts engine"""
+        self.db_path = db_path
+        self.output_file = output_file
+        self.top_k = top_k
+        self.max_terms = max_terms  # Terms kept per post vector
+        self.init_database()
+
+    def init_database(self):
+        """Create term vector and neighbor tables"""
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        # Per-post term frequencies (pruned to the strongest terms)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_terms (
+                post_id TEXT,
+                term TEXT,
+                tf INTEGER,
+                PRIMARY KEY (post_id, term)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_post_terms_term ON post_terms (term)')
+
+        # Document frequency across all indexed posts
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS term_stats (
+                term TEXT PRIMARY KEY,
+                df INTEGER
+            )
+        ''')
+
+        # Precomputed top-k neighbors
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS related_posts (
+                post_id TEXT,
+                related_id TEXT,
+                score REAL,
+                PRIMARY KEY (post_id, related_id)
+            )
+        ''')
+        # Reverse lookups: which lists reference a post, and removing it from them
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_related_posts_related ON related_posts (related_id)')
+
+        conn.commit()
+        conn.close()
+
+    def _tokenize(self, text: str) -> List[str]:
+        """Split text into lowercase terms, dropping stop words"""
+        return [t for t in re.findall(r"[a-z][a-z0-9]+", text.lower())
+                if len(t) > 2 and t not in STOP_WORDS]
+
+    def _term_frequencies(self, title: str, tags: str, content: str) -> Counter:
+        """Count terms for a post, weighting title and tags above body text"""
+        tag_list = json.loads(tags) if tags else []
+        counts = Counter(self._tokenize(content or ""))
+        for term in self._tokenize(title or ""):
+            counts[term] += 3
+        for term in self._tokenize(" ".join(tag_list)):
+            counts[term] += 2
+        return counts
+
+    def _idf(self, df: np.ndarray, doc_count: int) -> np.ndarray:
+        """Smoothed inverse document frequency"""
+        return np.log((1.0 + doc_count) / (1.0 + df)) + 1.0
+
+    def _prune(self, counts: Counter, df: Dict[str, int], doc_count: int) -> Dict[str, int]:
+        """Keep only the highest-weighted terms of a post"""
+        if len(counts) <= self.max_terms:
+            return dict(counts)
+        terms = list(counts)
+        tf = np.fromiter((counts[t] for t in terms), dtype=np.float64, count=len(terms))
+        dfs = np.fromiter((df.get(t, 0) for t in terms), dtype=np.float64, count=len(terms))
+        weights = tf * self._idf(dfs, doc_count)
+        keep = np.argpartition(-weights, self.max_terms - 1)[:self.max_terms]
+        return {terms[i]: counts[terms[i]] for i in keep}
+
+    def remove_post(self, conn: sqlite3.Connection, post_id: str):
+        """Drop a post from the index and from every neighbor list"""
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE term_stats SET df = df - 1
+            WHERE term IN (SELECT term FROM post_terms WHERE post_id = ?)
+        ''', (post_id,))
+        cursor.execute('DELETE FROM term_stats WHERE df <= 0')
+        cursor.execute('DELETE FROM post_terms WHERE post_id = ?', (post_id,))
+        cursor.execute('DELETE FROM related_posts WHERE post_id = ? OR related_id = ?', (post_id, post_id))
+
+    def add_post(self, conn: sqlite3.Connection, post_row) -> Set[str]:
+        """Index one published post and update neighbor lists incrementally.
+
+        Only the postings of the new post's terms are scored, so adding a post
+        costs one sparse similarity pass instead of recomputing all pairs.
+        Returns the ids of posts whose related list changed.
+        """
+        post_id, title, content, tags = post_row[0], post_row[1], post_row[3], post_row[6]
+        cursor = conn.cursor()
+
+        # Re-indexing a post first detaches it from the lists that referenced it
+        cursor.execute('SELECT post_id FROM related_posts WHERE related_id = ?', (post_id,))
+        affected = {post_id} | {row[0] for row in cursor.fetchall()}
+        self.remove_post(conn, post_id)
+
+        cursor.execute('SELECT COUNT(DISTINCT post_id) FROM post_terms')
+        doc_count = cursor.fetchone()[0] + 1
+
+        counts = self._term_frequencies(title, tags, content)
+        if not counts:
+            return affected
+
+        placeholders = ",".join("?" * len(counts))
+        cursor.execute(f'SELECT term, df FROM term_stats WHERE term IN ({placeholders})', list(counts))
+        df = dict(cursor.fetchall())
+        vector = self._prune(counts, df, doc_count)
+
+        cursor.executemany('INSERT INTO post_terms (post_id, term, tf) VALUES (?, ?, ?)',
+                           [(post_id, term, tf) for term, tf in vector.items()])
+        cursor.executemany('''
+            INSERT INTO term_stats (term, df) VALUES (?, 1)
+            ON CONFLICT(term) DO UPDATE SET df = df + 1
+        ''', [(term,) for term in vector])
+
+        scores = self._score_against_index(cursor, post_id, vector, doc_count)
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:self.top_k]
+        cursor.executemany('INSERT INTO related_posts (post_id, related_id, score) VALUES (?, ?, ?)',
+                           [(post_id, other_id, score) for other_id, score in ranked])
+
+        # Offer the new post to each neighbor's list; only lists it enters change.
+        # One grouped query per chunk gives each list's size and weakest score.
+        candidates = list(scores)
+        lists = {}
+        for start in range(0, len(candidates), SQL_IN_CHUNK):
+            chunk = candidates[start:start + SQL_IN_CHUNK]
+            cursor.execute(f'''
+                SELECT post_id, COUNT(*), MIN(score) FROM related_posts
+                WHERE post_id IN ({",".join("?" * len(chunk))})
+                GROUP BY post_id
+            ''', chunk)
+            lists.update((row[0], (row[1], row[2])) for row in cursor.fetchall())
+
+        evicting, entering = [], []
+        for other_id, score in scores.items():
+            count, lowest = lists.get(other_id, (0, None))
+            if count >= self.top_k:
+                if score <= lowest:
+                    continue
+                evicting.append((other_id, other_id))
+            entering.append((other_id, post_id, score))
+            affected.add(other_id)
+
+        cursor.executemany('''
+            DELETE FROM related_posts WHERE post_id = ? AND related_id = (
+                SELECT related_id FROM related_posts WHERE post_id = ? ORDER BY score LIMIT 1
+            )
+        ''', evicting)
+        cursor.executemany('INSERT INTO related_posts (post_id, related_id, score) VALUES (?, ?, ?)', entering)
+
+        return affected
+
+    def _score_against_index(self, cursor, post_id: str, vector: Dict[str, int],
+                             doc_count: int) -> Dict[str, float]:
+        """Cosine similarity of one vector against all indexed posts via the postings"""
+        terms = list(vector)
+        placeholders = ",".join("?" * len(terms))
+
+        cursor.execute(f'''
+            SELECT post_id, term, tf FROM post_terms
+            WHERE term IN ({placeholders}) AND post_id != ?
+        ''', terms + [post_id])
+        postings = cursor.fetchall()
+        if not postings:
+            return {}
+
+        cursor.execute(f'SELECT term, df FROM term_stats WHERE term IN ({placeholders})', terms)
+        df = dict(cursor.fetchall())
+        idf = {t: self._idf(np.float64(df[t]), doc_count) for t in terms}
+        query = np.array([vector[t] * idf[t] for t in terms])
+        # Query weight times idf: everything a posting's tf is multiplied by
+        posting_weight = dict(zip(terms, query / np.linalg.norm(query) * np.array([idf[t] for t in terms])))
+
+        doc_ids = sorted({row[0] for row in postings})
+        doc_index = {doc: i for i, doc in enumerate(doc_ids)}
+
+        # Document norms need every term of the candidate posts, not just shared ones
+        norm_rows = []
+        for start in range(0, len(doc_ids), SQL_IN_CHUNK):
+            chunk = doc_ids[start:start + SQL_IN_CHUNK]
+            cursor.execute(f'''
+                SELECT pt.post_id, pt.tf, ts.df
+                FROM post_terms pt JOIN term_stats ts ON ts.term = pt.term
+                WHERE pt.post_id IN ({",".join("?" * len(chunk))})
+            ''', chunk)
+            norm_rows.extend(cursor.fetchall())
+        norm_idx = np.array([doc_index[r[0]] for r in norm_rows])
+        norm_w = np.array([r[1] for r in norm_rows], dtype=np.float64) * \
+            self._idf(np.array([r[2] for r in norm_rows], dtype=np.float64), doc_count)
+        norms = np.sqrt(np.bincount(norm_idx, weights=norm_w ** 2, minlength=len(doc_ids)))
+
+        idx = np.array([doc_index[r[0]] for r in postings])
+        weights = np.array([r[2] * posting_weight[r[1]] for r in postings], dtype=np.float64)
+        dots = np.bincount(idx, weights=weights, minlength=len(doc_ids))
+        sims = dots / np.maximum(norms, 1e-12)
+
+        return {doc_ids[i]: round(float(sims[i]), 4) for i in np.nonzero(sims > 0)[0]}
+
+    def rebuild(self, conn: sqlite3.Connection):
+        """Recompute term vectors and neighbor lists for all published posts"""
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM post_terms')
+        cursor.execute('DELETE FROM term_stats')
+        cursor.execute('DELETE FROM related_posts')
+
+        cursor.execute('''
+            SELECT id, title, tags, content FROM blog_posts
+            WHERE status = "published"
+            ORDER BY publish_date
+        ''')
+        rows = cursor.fetchall()
+        if not rows:
+            return
+
+        post_ids = [row[0] for row in rows]
+        all_counts = [self._term_frequencies(row[1], row[2], row[3]) for row in rows]
+        df = Counter(term for counts in all_counts for term in counts)
+        vectors = [self._prune(counts, df, len(rows)) for counts in all_counts]
+
+        # Document frequency is recounted over the pruned vectors to match add_post
+        df = Counter(term for vector in vectors for term in vector)
+        vocab = {term: i for i, term in enumerate(df)}
+        idf = self._idf(np.array([df[t] for t in vocab], dtype=np.float64), len(rows))
+
+        # Sparse doc-term matrix as COO arrays, rows L2-normalized
+        row_idx = np.array([i for i, vector in enumerate(vectors) for _ in vector], dtype=np.int64)
+        col_idx = np.array([vocab[t] for vector in vectors for t in vector], dtype=np.int64)
+        values = np.array([tf for vector in vectors for tf in vector.values()], dtype=np.float64)
+        values *= idf[col_idx]
+        norms = np.sqrt(np.bincount(row_idx, weights=values ** 2, minlength=len(rows)))
+        values /= np.maximum(norms[row_idx], 1e-12)
+
+        # Term-major postings (CSC) so each post only touches posts sharing a term
+        order = np.lexsort((row_idx, col_idx))
+        post_rows, post_cols, post_vals = row_idx[order], col_idx[order], values[order]
+        term_ptr = np.searchsorted(post_cols, np.arange(len(vocab) + 1))
+        doc_ptr = np.searchsorted(row_idx, np.arange(len(rows) + 1))
+
+        cursor.executemany('INSERT INTO post_terms (post_id, term, tf) VALUES (?, ?, ?)',
+                           [(post_ids[i], term, tf) for i, vector in enumerate(vectors)
+                            for term, tf in vector.items()])
+        cursor.executemany('INSERT INTO term_stats (term, df) VALUES (?, ?)', df.items())
+
+        neighbors = []
+        for i in range(len(rows)):
+            start, end = doc_ptr[i], doc_ptr[i + 1]
+            if start == end:
+                continue
+            slices = [(term_ptr[c], term_ptr[c + 1], w) for c, w in zip(col_idx[start:end], values[start:end])]
+            cand = np.concatenate([post_rows[s:e] for s, e, _ in slices])
+            contrib = np.concatenate([post_vals[s:e] * w for s, e, w in slices])
+            scores = np.bincount(cand, weights=contrib, minlength=len(rows))
+            scores[i] = 0.0
+
+            k = min(self.top_k, len(rows) - 1)
+            if k <= 0:
+                continue
+            top = np.argpartition(-scores, k - 1)[:k]
+            for j in top[np.argsort(-scores[top])]:
+                if scores[j] > 0:
+                    neighbors.append((post_ids[i], post_ids[j], round(float(scores[j]), 4)))
+
+        cursor.executemany('INSERT INTO related_posts (post_id, related_id, score) VALUES (?, ?, ?)',
+                           neighbors)
+
+    def get_related(self, conn: sqlite3.Connection, post_id: str) -> List[Dict[str, str]]:
+        """Get precomputed related posts for a post"""
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT bp.slug, bp.title, rp.score
+            FROM related_posts rp JOIN blog_posts bp ON bp.id = rp.related_id
+            WHERE rp.post_id = ? AND bp.status = "published"
+            ORDER BY rp.score DESC
+            LIMIT ?
+        ''', (post_id, self.top_k))
+        return [{"slug": slug, "title": title, "score": score} for slug, title, score in cursor.fetchall()]
+
+    def render_related_html(self, conn: sqlite3.Connection, post_id: str) -> str:
+        """Render the related posts list baked into a post page"""
+        related = self.get_related(conn, post_id)
+        if not related:
+            return ""
+
+        items = "\n".join(
+            f'            <li><a href="{escape(post["slug"])}.html">{escape(post["title"])}</a></li>'
+            for post in related
+        )
+        return f'<ul class="related-list">\n{items}\n        </ul>'
+
+    def export_json(self, conn: sqlite3.Connection, output_file: str = None) -> Path:
+        """Write the compact slug -> related slugs map for the browser"""
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT src.slug, dst.slug
+            FROM related_posts rp
+            JOIN blog_posts src ON src.id = rp.post_id
+            JOIN blog_posts dst ON dst.id = rp.related_id
+            WHERE src.status = "published" AND dst.status = "published"
+            ORDER BY src.slug, rp.score DESC
+        ''')
+
+        graph: Dict[str, List[str]] = {}
+        for slug, related_slug in cursor.fetchall():
+            graph.setdefault(slug, []).append(related_slug)
+
+        output_path = Path(output_file or self.output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(graph, f, separators=(',', ':'), ensure_ascii=False)
+
+        return output_path
+
+
+def main():
+    """Rebuild the related posts graph from scratch"""
+
+    print("Virginia Home Essentials - Related Posts Engine")
+    print("=" * 50)
+
+    engine = RelatedPostsEngine()
+    conn = sqlite3.connect(engine.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+    engine.rebuild(conn)
+    conn.commit()
+    output_path = engine.export_json(conn)
+    conn.close()
+
+    print(f"✅ Related posts graph saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
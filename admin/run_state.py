@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Run State
+Checkpoints completed units of work so an interrupted run can resume where it stopped
+"""
+
+import datetime
+import sqlite3
+from typing import Any, Dict, Optional, Set, Tuple
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+
+class Checkpoint:
+    """Progress of one run; units are (stage, unit) pairs that are safe to skip once done"""
+
+    def __init__(self, state: "RunState", run_id: int, task: str, done: Set[Tuple[str, str]]):
+        self.state = state
+        self.run_id = run_id
+        self.task = task
+        self._done = done
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self._done)
+
+    def is_done(self, stage: str, unit: Any) -> bool:
+        return (stage, str(unit)) in self._done
+
+    def mark_done(self, stage: str, unit: Any):
+        """Durably record a finished unit"""
+        key = (stage, str(unit))
+        if key in self._done:
+            return
+        conn = self.state.connect()
+        conn.execute('''
+            INSERT OR IGNORE INTO run_units (run_id, stage, unit, completed_at)
+            VALUES (?, ?, ?, ?)
+        ''', (self.run_id, stage, key[1], datetime.datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+        self._done.add(key)
+
+    def completed(self, stage: str) -> int:
+        """Number of finished units in a stage"""
+        return sum(1 for done_stage, _ in self._done if done_stage == stage)
+
+    def finish(self):
+        self.state._close_run(self.run_id, "completed")
+
+    def fail(self, error: Exception):
+        self.state._close_run(self.run_id, "failed", str(error)[:1000])
+
+
+class RunState:
+    def __init__(self, db_path: str = "run_state.db"):
+        """Initialize the run state store"""
+        self.db_path = db_path
+        # Schema is created on first connect, so constructing is cheap
+        self._schema_ready = False
+
+    def init_database(self):
+        """Create run and unit tables"""
+        conn = sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                error TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_runs_task ON runs (task, id)')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS run_units (
+                run_id INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                completed_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, stage, unit),
+                FOREIGN KEY (run_id) REFERENCES runs (id)
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema on first use"""
+        if not self._schema_ready:
+            self.init_database()
+            self._schema_ready = True
+        return sqlite3.connect(self.db_path, timeout=DEFAULT_SQLITE_TIMEOUT)
+
+    def start(self, task: str, resume: bool = False) -> Checkpoint:
+        """Begin a run; with resume, continue the latest unfinished run of the task"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        now = datetime.datetime.now().isoformat()
+
+        row = None
+        if resume:
+            cursor.execute('SELECT id, status FROM runs WHERE task = ? ORDER BY id DESC LIMIT 1', (task,))
+            row = cursor.fetchone()
+            if row and row[1] == "completed":
+                row = None
+
+        if row:
+            run_id = row[0]
+            cursor.execute("UPDATE runs SET status = 'running', finished_at = NULL, error = NULL WHERE id = ?",
+                           (run_id,))
+            cursor.execute('SELECT stage, unit FROM run_units WHERE run_id = ?', (run_id,))
+            done = set(cursor.fetchall())
+        else:
+            # Anything still marked running was interrupted and will not be resumed
+            cursor.execute('''
+                UPDATE runs SET status = 'abandoned', finished_at = ?
+                WHERE task = ? AND status IN ('running', 'failed')
+            ''', (now, task))
+            cursor.execute("INSERT INTO runs (task, status, started_at) VALUES (?, 'running', ?)", (task, now))
+            run_id = cursor.lastrowid
+            done = set()
+
+        conn.commit()
+        conn.close()
+        return Checkpoint(self, run_id, task, done)
+
+    def _close_run(self, run_id: int, status: str, error: str = None):
+        conn = self.connect()
+        conn.execute('UPDATE runs SET status = ?, finished_at = ?, error = ? WHERE id = ?',
+                     (status, datetime.datetime.now().isoformat(), error, run_id))
+        conn.commit()
+        conn.close()
+
+    def latest(self, task: str) -> Optional[Dict[str, Any]]:
+        """Summary of the most recent run of a task"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT r.id, r.status, r.started_at, r.finished_at, r.error, COUNT(u.unit)
+            FROM runs r LEFT JOIN run_units u ON u.run_id = r.id
+            WHERE r.task = ?
+            GROUP BY r.id
+            ORDER BY r.id DESC LIMIT 1
+        ''', (task,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return None
+        return {
+            "run_id": row[0],
+            "status": row[1],
+            "started_at": row[2],
+            "finished_at": row[3],
+            "error": row[4],
+            "units_done": row[5]
+        }
+
+    def purge(self, keep_days: int = 30) -> int:
+        """Delete finished runs older than the given age"""
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=keep_days)).isoformat()
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            DELETE FROM run_units WHERE run_id IN (
+                SELECT id FROM runs WHERE status != 'running' AND started_at < ?
+            )
+        ''', (cutoff,))
+        cursor.execute("DELETE FROM runs WHERE status != 'running' AND started_at < ?", (cutoff,))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Scheduler
+Event-driven job scheduler that sleeps until the next job is due
+"""
+
+import datetime
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Re-check the clock at least this often so wall clock changes are noticed
+MAX_SLEEP_SECONDS = 3600
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], object]
+    at: datetime.time
+    weekday: Optional[int] = None  # None runs daily
+    next_run: Optional[datetime.datetime] = None
+    last_run: Optional[datetime.datetime] = None
+
+    def due_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """First scheduled time strictly after moment"""
+        candidate = datetime.datetime.combine(moment.date(), self.at)
+        if self.weekday is not None:
+            candidate += datetime.timedelta(days=(self.weekday - candidate.weekday()) % 7)
+        step = datetime.timedelta(days=1 if self.weekday is None else 7)
+        while candidate <= moment:
+            candidate += step
+        return candidate
+
+    def due_before(self, moment: datetime.datetime) -> datetime.datetime:
+        """Most recent scheduled time at or before moment"""
+        step = datetime.timedelta(days=1 if self.weekday is None else 7)
+        return self.due_after(moment) - step
+
+
+def _parse_time(value: str) -> datetime.time:
+    hour, minute = value.split(":")
+    return datetime.time(int(hour), int(minute))
+
+
+def next_run_time(at: str, weekday: Optional[str] = None, last_run: Optional[str] = None,
+                  now: Optional[datetime.datetime] = None) -> datetime.datetime:
+    """When a job would next run if a scheduler started now, without setting one up.
+
+    Like Scheduler.restore, a run missed since last_run is due right away.
+    """
+    now = now or datetime.datetime.now()
+    job = Job("", None, _parse_time(at), WEEKDAYS.index(weekday.lower()) if weekday else None)
+    if last_run and datetime.datetime.fromisoformat(last_run) < job.due_before(now):
+        return now
+    return job.due_after(now)
+
+
+class Scheduler:
+    def __init__(self, logger: logging.Logger = None, on_change: Callable[[], None] = None,
+                 clock: Callable[[], datetime.datetime] = datetime.datetime.now):
+        """Initialize the scheduler; on_change is called whenever job state changes"""
+        self.logger = logger or logging.getLogger("Scheduler")
+        self.on_change = on_change
+        self.clock = clock
+        self.jobs: Dict[str, Job] = {}
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def every_day(self, name: str, at: str, func: Callable[[], object]) -> Job:
+        """Run func daily at HH:MM"""
+        return self._add(Job(name, func, _parse_time(at)))
+
+    def every_week(self, name: str, weekday: str, at: str, func: Callable[[], object]) -> Job:
+        """Run func weekly on the given weekday at HH:MM"""
+        return self._add(Job(name, func, _parse_time(at), WEEKDAYS.index(weekday.lower())))
+
+    def _add(self, job: Job) -> Job:
+        job.next_run = job.due_after(self.clock())
+        self.jobs[job.name] = job
+        self._wakeup.set()
+        return job
+
+    def restore(self, last_runs: Dict[str, Optional[str]]):
+        """Load last run times and queue one catch-up run for any job missed while down"""
+        now = self.clock()
+        for job in self.jobs.values():
+            value = last_runs.get(job.name)
+            if not value:
+                continue
+            job.last_run = datetime.datetime.fromisoformat(value)
+            missed = job.due_before(now)
+            if job.last_run < missed:
+                self.logger.info(f"Catching up missed run of {job.name} (due {missed:%Y-%m-%d %H:%M})")
+                job.next_run = now
+
+    def next_runs(self) -> Dict[str, str]:
+        """Next run time of every job"""
+        return {name: job.next_run.isoformat(timespec="minutes") for name, job in self.jobs.items()}
+
+    def run_pending(self) -> List[str]:
+        """Run every job that is due; returns the names of jobs that ran"""
+        ran = []
+        for job in sorted(self.jobs.values(), key=lambda j: j.next_run):
+            now = self.clock()
+            if job.next_run > now:
+                continue
+            self.logger.info(f"Running scheduled job {job.name}")
+            try:
+                job.func()
+            except Exception as e:
+                self.logger.error(f"Scheduled job {job.name} failed: {e}")
+            job.last_run = now
+            job.next_run = job.due_after(self.clock())
+            ran.append(job.name)
+        return ran
+
+    def seconds_until_next(self) -> float:
+        if not self.jobs:
+            return MAX_SLEEP_SECONDS
+        soonest = min(job.next_run for job in self.jobs.values())
+        return max(0.0, (soonest - self.clock()).total_seconds())
+
+    def run_forever(self):
+        """Sleep until the next job is due, run it, repeat until stop() is called"""
+        self._stopped = False
+        while not self._stopped:
+            ran = self.run_pending()
+            if ran and self.on_change:
+                self.on_change()
+
+            delay = min(self.seconds_until_next(), MAX_SLEEP_SECONDS)
+            if delay > 0:
+                self.logger.debug(f"Sleeping {delay:.0f}s until next job")
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+
+    def stop(self):
+        """Stop run_forever from another thread"""
+        self._stopped = True
+        self._wakeup.set()
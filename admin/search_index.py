@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Search Index Utility - Virginia Home Essentials
+Maintains an FTS5 index over blog posts and exports a prefix-sharded
+inverted index for client-side search
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# SQLite timeout configuration for concurrent access
+DEFAULT_SQLITE_TIMEOUT = 30  # seconds
+
+# Column order of blog_posts_fts and the relative weight of a match in each
+SEARCH_COLUMNS = ["title", "excerpt", "content", "tags"]
+COLUMN_WEIGHTS = [10.0, 3.0, 1.0, 5.0]
+
+# BM25 parameters used for exported weights
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+EXPORTABLE_TERM = re.compile(r"^[a-z0-9]+$")
+
+
+def ensure_search_index(conn: sqlite3.Connection):
+    """Create the FTS5 index on blog_posts and the triggers that keep it in sync"""
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE name = 'blog_posts_fts'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS blog_posts_fts USING fts5(
+            {", ".join(SEARCH_COLUMNS)},
+            content='blog_posts',
+            content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+
+    # Row-level vocabulary view used by the exporter
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS blog_posts_fts_vocab
+        USING fts5vocab(blog_posts_fts, instance)
+    ''')
+
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_insert AFTER INSERT ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_delete AFTER DELETE ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts (blog_posts_fts, rowid, {columns})
+            VALUES ('delete', old.rowid, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_update AFTER UPDATE ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts (blog_posts_fts, rowid, {columns})
+            VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO blog_posts_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    ''')
+
+    if not exists:
+        # Backfill posts written before the index existed
+        cursor.execute("INSERT INTO blog_posts_fts (blog_posts_fts) VALUES ('rebuild')")
+
+
+def _match_expression(query: str) -> str:
+    """Build an FTS5 MATCH expression; the last word is treated as a prefix"""
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+    return " ".join(terms)
+
+
+def search_posts(conn: sqlite3.Connection, query: str, limit: int = 10) -> List[Dict[str, str]]:
+    """Search published posts with BM25 ranking"""
+    expression = _match_expression(query)
+    if not expression:
+        return []
+
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT bp.id, bp.title, bp.slug, bp.excerpt, bp.category,
+               bm25(blog_posts_fts, {", ".join(str(w) for w in COLUMN_WEIGHTS)}) AS rank
+        FROM blog_posts_fts
+        JOIN blog_posts bp ON bp.rowid = blog_posts_fts.rowid
+        WHERE blog_posts_fts MATCH ? AND bp.status = 'published'
+        ORDER BY rank
+        LIMIT ?
+    ''', (expression, limit))
+
+    return [
+        {"id": post_id, "title": title, "slug": slug, "excerpt": excerpt, "category": category}
+        for post_id, title, slug, excerpt, category, _ in cursor.fetchall()
+    ]
+
+
+def _write_json(path: Path, data):
+    """Write compact JSON atomically"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def export_search_index(output_dir="../blog/search", prefix_length=2, db_path=None):
+    """Export published posts as a prefix-sharded inverted index.
+
+    Each shard maps terms to a flat [doc, weight, doc, weight, ...] postings
+    list, so the browser only downloads the shards for the typed prefixes.
+    """
+
+    db_path = Path(db_path) if db_path else Path(__file__).parent / "blog_system.db"
+
+    if not db_path.exists():
+        print("⚠️  Blog database not found. Run blog automation first.")
+        return
+
+    output_path = Path(__file__).parent / output_dir
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(db_path), timeout=DEFAULT_SQLITE_TIMEOUT)
+    cursor = conn.cursor()
+    ensure_search_index(conn)
+    conn.commit()
+
+    # Published documents get compact sequential ids
+    cursor.execute('''
+        SELECT rowid, slug, title, category
+        FROM blog_posts
+        WHERE status = 'published'
+        ORDER BY publish_date DESC
+    ''')
+    docs = []
+    doc_ids = {}
+    for rowid, slug, title, category in cursor.fetchall():
+        doc_ids[rowid] = len(docs)
+        docs.append([slug, title, category])
+
+    # Term frequencies are weighted by the column they occur in
+    weighted_tf = "SUM(CASE col " + " ".join(
+        f"WHEN '{c}' THEN {w}" for c, w in zip(SEARCH_COLUMNS, COLUMN_WEIGHTS)) + " END)"
+
+    # Weighted document lengths for BM25 normalisation
+    cursor.execute(f'''
+        SELECT doc, {weighted_tf}
+        FROM blog_posts_fts_vocab
+        GROUP BY doc
+    ''')
+    doc_lengths = {rowid: length for rowid, length in cursor.fetchall() if rowid in doc_ids}
+    avg_length = (sum(doc_lengths.values()) / len(doc_lengths)) if doc_lengths else 1.0
+
+    # Stream postings term by term; a shard is flushed when the prefix changes
+    cursor.execute(f'''
+        SELECT term, doc, {weighted_tf}
+        FROM blog_posts_fts_vocab
+        GROUP BY term, doc
+        ORDER BY term
+    ''')
+
+    shards = []
+    current_prefix = None
+    shard: Dict[str, List] = {}
+    term = None
+    postings: List = []
+    term_count = 0
+
+    def flush_term():
+        nonlocal term_count
+        if term is None or not postings:
+            return
+        df = len(postings) // 2
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for i in range(1, len(postings), 2):
+            postings[i] = round(idf * postings[i], 3)
+        shard[term] = postings
+        term_count += 1
+
+    def flush_shard():
+        if current_prefix is not None and shard:
+            _write_json(output_path / f"{current_prefix}.json", shard)
+            shards.append(current_prefix)
+
+    for row_term, rowid, tf in cursor:
+        if (rowid not in doc_ids or len(row_term) < prefix_length
+                or not EXPORTABLE_TERM.match(row_term)):
+            continue
+
+        if row_term != term:
+            flush_term()
+            term, postings = row_term, []
+
+            prefix = row_term[:prefix_length]
+            if prefix != current_prefix:
+                flush_shard()
+                current_prefix, shard = prefix, {}
+
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[rowid] / avg_length)
+        postings.extend([doc_ids[rowid], tf * (BM25_K1 + 1) / (tf + norm)])
+
+    flush_term()
+    flush_shard()
+    conn.close()
+
+    # Remove shards whose prefix no longer occurs
+    for stale in output_path.glob("*.json"):
+        if stale.stem not in shards and stale.name not in ("manifest.json", "docs.json"):
+            stale.unlink()
+
+    _write_json(output_path / "docs.json", docs)
+    _write_json(output_path / "manifest.json", {
+        "generated_at": datetime.now().isoformat(),
+        "prefix_length": prefix_length,
+        "doc_count": len(docs),
+        "term_count": term_count,
+        "shards": shards
+    })
+
+    print(f"✅ Exported search index: {term_count} terms in {len(shards)} shards for {len(docs)} posts")
+    return output_path
+
+
+if __name__ == "__main__":
+    print("Virginia Home Essentials - Search Index Export")
+    print("=" * 50)
+    export_search_index()
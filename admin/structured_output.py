@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Virginia Home Essentials - Structured Output Parser
+Fault-tolerant parsing of JSON arrays in model output, including truncated and streamed responses
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import jiter
+
+# Expected fields of a product recommendation and their JSON types
+PRODUCT_SCHEMA: Dict[str, type] = {
+    "title": str,
+    "description": str,
+    "category": str,
+    "price_range": str,
+    "amazon_search_terms": list,
+    "target_audience": str,
+    "seasonal_relevance": str,
+}
+
+
+# Strings (skipped whole, so brackets inside them don't count), a string still
+# being received, and the structural characters
+JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|["\[\]{},]')
+
+
+class ArrayScanner:
+    """Finds the complete elements of the product array in JSON text that may be truncated or malformed.
+
+    The product array is the first top-level array, or the first array value of
+    a top-level object. Scanning resumes where the previous feed() stopped, so a
+    growing stream is scanned once overall.
+    """
+
+    def __init__(self, pos: int = 0):
+        self.pos = pos
+        self.stack: List[str] = []
+        self.level: Optional[int] = None  # stack depth inside the product array
+        self.element_start = 0
+        self.elements: List[Tuple[int, int]] = []  # (start, end) of each complete element
+        self.closed = False
+
+    def feed(self, text: str):
+        """Scan text (the whole buffer so far) from where the last call stopped"""
+        if self.closed:
+            return
+        for match in JSON_TOKEN.finditer(text, self.pos):
+            token = match.group()
+            if token == '"':
+                # Unterminated string; wait for the rest of it
+                self.pos = match.start()
+                return
+            if len(token) > 1:
+                continue
+            at_level = self.level is not None and len(self.stack) == self.level
+            if token == "," and at_level:
+                self._end_element(text, match.start())
+                self.element_start = match.end()
+            elif token in "]}" and at_level:
+                self._end_element(text, match.start())
+                self.closed = True
+                self.pos = match.end()
+                return
+            elif token in "[{":
+                self.stack.append(token)
+                if self.level is None and token == "[" and self.stack[:-1] in ([], ["{"]):
+                    self.level = len(self.stack)
+                    self.element_start = match.end()
+            elif token in "]}" and self.stack:
+                self.stack.pop()
+        self.pos = len(text)
+
+    def _end_element(self, text: str, end: int):
+        # An empty span is a trailing or doubled comma
+        if text[self.element_start:end].strip():
+            self.elements.append((self.element_start, end))
+
+    def tail(self, text: str) -> Optional[Tuple[int, int]]:
+        """The last element of an unclosed array if its closing bracket has arrived"""
+        if self.closed or self.level is None or len(self.stack) != self.level:
+            return None
+        # A scalar at the very end may still be cut off, an object or array may not
+        if text[self.element_start:self.pos].strip()[:1] in ("{", "["):
+            return self.element_start, self.pos
+        return None
+
+
+@dataclass
+class ParseResult:
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    rejected: int = 0
+    truncated: bool = False
+    repaired: bool = False
+    errors: List[str] = field(default_factory=list)
+
+
+class StructuredOutputParser:
+    def __init__(self, schema: Dict[str, type]):
+        """Initialize the parser for array elements matching schema"""
+        self.schema = schema
+        self.stats = {"responses": 0, "clean": 0, "repaired": 0, "failed": 0,
+                      "items_salvaged": 0, "items_rejected": 0}
+
+    def _locate(self, text: str) -> Optional[int]:
+        """Skip prose and code fences before the first JSON container"""
+        starts = [i for i in (text.find("["), text.find("{")) if i >= 0]
+        return min(starts) if starts else None
+
+    def _element(self, text: str, span: Tuple[int, int]) -> Tuple[Any, Optional[str]]:
+        """Parse one element on its own, so a malformed one only loses itself"""
+        try:
+            return jiter.from_json(text[span[0]:span[1]].encode("utf-8")), None
+        except ValueError as e:
+            return None, str(e)
+
+    def _elements(self, data: Any) -> Optional[List[Any]]:
+        """The product array, unwrapping a {"products": [...]} style object"""
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            for value in data.values():
+                if isinstance(value, list):
+                    return value
+        return None
+
+    def validate(self, item: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Check one element against the schema; returns (item or None, was_repaired)"""
+        if not isinstance(item, dict):
+            return None, False
+
+        repaired = False
+        clean = {}
+        for name, expected in self.schema.items():
+            value = item.get(name)
+            if expected is list and isinstance(value, str):
+                # Search terms sometimes come back as one comma separated string
+                value = [term.strip() for term in value.split(",") if term.strip()]
+                repaired = True
+            if not isinstance(value, expected) or not value:
+                return None, repaired
+            clean[name] = value
+
+        return clean, repaired or len(clean) != len(item)
+
+    def parse(self, text: str, final: bool = True) -> ParseResult:
+        """Salvage every complete, valid element from model output.
+
+        With ``final=False`` the text is treated as an unfinished stream and
+        parse statistics are not recorded.
+        """
+        result = ParseResult()
+        text = text or ""
+
+        start = self._locate(text)
+        if start is None:
+            result.errors.append("No JSON array found")
+            return self._record(result, final)
+
+        # Prose or a code fence before the JSON counts as a repair
+        result.repaired = bool(text[:start].strip())
+
+        try:
+            data = jiter.from_json(text[start:].encode("utf-8"))
+        except ValueError as e:
+            return self._record(self._salvage(text, start, str(e), result), final)
+
+        elements = self._elements(data)
+        if elements is None:
+            result.errors.append(f"Expected an array, got {type(data).__name__}")
+            return self._record(result, final)
+
+        result.repaired = result.repaired or not isinstance(data, list)
+        for element in elements:
+            self._add(result, element)
+        return self._record(result, final)
+
+    def _salvage(self, text: str, start: int, error: str, result: ParseResult) -> ParseResult:
+        """Parse the complete elements of output that is not valid JSON as a whole"""
+        scanner = ArrayScanner(start)
+        scanner.feed(text)
+        if scanner.level is None:
+            result.errors.append(error)
+            return result
+
+        spans = list(scanner.elements)
+        tail = scanner.tail(text)
+        if tail:
+            spans.append(tail)
+
+        # Closed but invalid means bad elements or trailing text; unclosed means cut off
+        result.truncated = not scanner.closed
+        result.repaired = result.repaired or scanner.closed or text[start] != "["
+        for index, span in enumerate(spans):
+            element, element_error = self._element(text, span)
+            if element_error:
+                result.rejected += 1
+                result.errors.append(f"Element {index}: {element_error}")
+                continue
+            self._add(result, element)
+        return result
+
+    def _add(self, result: ParseResult, element: Any):
+        item, repaired = self.validate(element)
+        if item is None:
+            result.rejected += 1
+            return
+        result.items.append(item)
+        result.repaired = result.repaired or repaired
+
+    def _record(self, result: ParseResult, final: bool) -> ParseResult:
+        if not final:
+            return result
+
+        self.stats["responses"] += 1
+        self.stats["items_salvaged"] += len(result.items)
+        self.stats["items_rejected"] += result.rejected
+        if not result.items:
+            self.stats["failed"] += 1
+        elif result.repaired or result.truncated or result.rejected:
+            self.stats["repaired"] += 1
+        else:
+            self.stats["clean"] += 1
+        return result
+
+    def iter_stream(self, chunks):
+        """Yield valid elements from a stream of text chunks as soon as each one is complete"""
+        buffer = ""
+        scanner = None
+        scanned = 0
+        emitted = 0
+        for chunk in chunks:
+            buffer += chunk
+            if scanner is None:
+                start = self._locate(buffer)
+                if start is None:
+                    continue
+                scanner = ArrayScanner(start)
+            scanner.feed(buffer)
+            for span in scanner.elements[scanned:]:
+                item, _ = self.validate(self._element(buffer, span)[0])
+                if item is not None:
+                    emitted += 1
+                    yield item
+            scanned = len(scanner.elements)
+
+        # Records the stats and yields a complete last element of an unclosed array
+        items = self.parse(buffer).items
+        yield from items[emitted:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Parse counts plus the share of responses that needed repair"""
+        responses = self.stats["responses"]
+        return {
+            **self.stats,
+            "repair_rate": round(self.stats["repaired"] / responses, 3) if responses else 0.0
+        }
@@ -0,0 +1,9 @@
+"""
+Virginia Home Essentials - Test Configuration
+The admin modules import each other as top-level modules, so the tests do the same
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,194 @@
+"""
+Virginia Home Essentials - Test Fakes
+Local stand-ins for the external services the automation talks to
+"""
+
+import json
+import socketserver
+import threading
+import time
+from email import message_from_bytes, policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeHTTPServer:
+    """Threaded local HTTP server that records requests and answers through a handler function.
+
+    handler(server, path, body) returns (status, headers, payload). A payload
+    that is a list of strings is sent as a server-sent event stream.
+    """
+
+    def __init__(self, handler: Callable):
+        self.handler = handler
+        self.requests: List[Dict] = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(_QuietHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake.lock:
+                    fake.requests.append({"path": self.path, "body": body, "time": time.monotonic(),
+                                          "headers": dict(self.headers)})
+                    fake.active += 1
+                    fake.max_active = max(fake.max_active, fake.active)
+                try:
+                    status, headers, payload = fake.handler(fake, self.path, body)
+                finally:
+                    with fake.lock:
+                        fake.active -= 1
+                try:
+                    self._respond(status, headers, payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up on this request
+
+            def _respond(self, status, headers, payload):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if isinstance(payload, list):
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for event in payload:
+                        self.wfile.write(f"data: {event}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    return
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeSMTPServer:
+    """Threaded local SMTP server that records delivered messages.
+
+    The first reject_data messages are refused with a 451 reply after DATA,
+    like a server with a temporary failure. Delivered messages are parsed
+    into email.message.EmailMessage objects.
+    """
+
+    def __init__(self, reject_data: int = 0):
+        self.messages: List[Dict] = []
+        self.rejected: List[float] = []
+        self.reject_data = reject_data
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+            def handle(self):
+                self.reply("220 fake.smtp ESMTP")
+                sender, recipients = None, []
+                for raw in self.rfile:
+                    command = raw.decode("ascii", "replace").strip()
+                    verb = command.split(" ", 1)[0].upper()
+                    if verb == "EHLO":
+                        self.reply("250-fake.smtp")
+                        self.reply("250 8BITMIME")
+                    elif verb == "HELO":
+                        self.reply("250 fake.smtp")
+                    elif verb == "MAIL":
+                        sender, recipients = command.split(":", 1)[1].strip(), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipients.append(command.split(":", 1)[1].strip())
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        self.receive(sender, recipients)
+                    elif verb in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+            def receive(self, sender, recipients):
+                lines = []
+                for raw in self.rfile:
+                    if raw in (b".\r\n", b".\n"):
+                        break
+                    # Undo dot-stuffing and the wire format's CRLF line endings
+                    line = raw[1:] if raw.startswith(b"..") else raw
+                    lines.append(line.rstrip(b"\r\n") + b"\n")
+                with fake.lock:
+                    if len(fake.rejected) < fake.reject_data:
+                        fake.rejected.append(time.monotonic())
+                        self.reply("451 Temporary failure, try again later")
+                        return
+                    fake.messages.append({
+                        "sender": sender, "recipients": recipients, "time": time.monotonic(),
+                        "message": message_from_bytes(b"".join(lines), policy=policy.default)
+                    })
+                self.reply("250 OK: queued")
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def chat_completion(content: str, prompt_tokens: int = 10, completion_tokens: int = 5) -> Dict:
+    """An OpenAI chat completion response body"""
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "test-model",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+def chat_stream(pieces: List[str], usage: Optional[Dict[str, int]] = None) -> List[str]:
+    """Server-sent events of a streamed chat completion"""
+    def chunk(delta, finish=None, extra=None):
+        body = {"id": "chatcmpl-test", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": "test-model", "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+        body.update(extra or {})
+        return json.dumps(body)
+
+    events = [chunk({"role": "assistant", "content": ""})]
+    events += [chunk({"content": piece}) for piece in pieces]
+    events.append(chunk({}, "stop"))
+    if usage:
+        events.append(json.dumps({"id": "chatcmpl-test", "object": "chat.completion.chunk",
+                                  "created": int(time.time()), "model": "test-model", "choices": [],
+                                  "usage": dict(usage, total_tokens=sum(usage.values()))}))
+    events.append("[DONE]")
+    return events
@@ -0,0 +1,171 @@
+"""
+Virginia Home Essentials - LLM Client Tests
+Runs LLMClient against a local fake of the OpenAI chat completions API
+"""
+
+import asyncio
+import json
+import time
+
+import openai
+import pytest
+
+from fakes import FakeHTTPServer, chat_completion, chat_stream
+from llm_client import LLMClient
+
+
+def make_client(server: FakeHTTPServer, **options) -> LLMClient:
+    options.setdefault("backoff_base", 0.01)
+    return LLMClient(api_key="test-key", base_url=f"{server.url}/v1", **options)
+
+
+def prompt(text: str) -> dict:
+    return {"model": "test-model", "messages": [{"role": "user", "content": text}]}
+
+
+def echo(delay: float = 0.0):
+    """Handler answering every prompt with its own text after a delay"""
+    def handler(server, path, body):
+        time.sleep(delay)
+        request = json.loads(body)
+        return 200, {}, chat_completion(f"echo: {request['messages'][0]['content']}")
+    return handler
+
+
+def scripted(*responses):
+    """Handler returning the given (status, headers, payload) responses in order, then echoing"""
+    queue = list(responses)
+
+    def handler(server, path, body):
+        if queue:
+            status, headers, payload, delay = queue.pop(0)
+            time.sleep(delay)
+            return status, headers, payload
+        return echo()(server, path, body)
+    return handler
+
+
+def test_complete_returns_content_and_usage():
+    with FakeHTTPServer(echo()) as server:
+        client = make_client(server)
+        content, usage = client.run(client.complete_with_usage(**prompt("hi")))
+
+    assert content == "echo: hi"
+    assert usage == {"prompt_tokens": 10, "completion_tokens": 5}
+    assert server.requests[0]["path"] == "/v1/chat/completions"
+    assert client.stats == {"requests": 1, "retries": 0, "coalesced": 0, "failures": 0}
+
+
+def test_concurrency_is_capped():
+    with FakeHTTPServer(echo(delay=0.2)) as server:
+        client = make_client(server, max_concurrency=2)
+        results = client.run(client.complete_many([prompt(f"p{i}") for i in range(6)]))
+
+    assert results == [f"echo: p{i}" for i in range(6)]
+    assert server.max_active == 2
+    assert len(server.requests) == 6
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_is_honoured(status):
+    with FakeHTTPServer(scripted((status, {"Retry-After": "0.5"}, {"error": {"message": "slow down"}}, 0))) \
+            as server:
+        client = make_client(server)
+        started = time.monotonic()
+        assert client.complete_sync(**prompt("hi")) == "echo: hi"
+
+    gap = server.requests[1]["time"] - server.requests[0]["time"]
+    assert 0.5 <= gap < 2.0
+    assert time.monotonic() - started >= 0.5
+    assert client.stats["retries"] == 1
+    assert client.stats["requests"] == 2
+
+
+def test_backoff_without_retry_after_grows_and_gives_up():
+    error = (500, {}, {"error": {"message": "boom"}}, 0)
+    with FakeHTTPServer(scripted(error, error, error, error)) as server:
+        client = make_client(server, max_retries=2, backoff_base=0.05)
+        with pytest.raises(openai.InternalServerError):
+            client.complete_sync(**prompt("hi"))
+
+    assert len(server.requests) == 3
+    assert client.stats == {"requests": 3, "retries": 2, "coalesced": 0, "failures": 1}
+
+
+def test_client_errors_are_not_retried():
+    with FakeHTTPServer(scripted((400, {}, {"error": {"message": "bad request"}}, 0))) as server:
+        client = make_client(server)
+        with pytest.raises(openai.BadRequestError):
+            client.complete_sync(**prompt("hi"))
+
+    assert len(server.requests) == 1
+    assert client.stats["failures"] == 1
+
+
+def test_request_timeout():
+    with FakeHTTPServer(echo(delay=1.0)) as server:
+        client = make_client(server, request_timeout=0.2, max_retries=0)
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            client.complete_sync(**prompt("hi"))
+
+    assert time.monotonic() - started < 0.9
+    assert client.stats["failures"] == 1
+
+
+def test_timed_out_request_is_retried():
+    slow = (200, {}, chat_completion("too late"), 1.0)
+    with FakeHTTPServer(scripted(slow)) as server:
+        client = make_client(server, request_timeout=0.2)
+        assert client.complete_sync(**prompt("hi")) == "echo: hi"
+
+    assert client.stats["retries"] == 1
+
+
+def test_identical_prompts_are_coalesced():
+    async def ask_five(client):
+        return await asyncio.gather(*(client.complete_with_usage(**prompt("same")) for _ in range(5)))
+
+    with FakeHTTPServer(echo(delay=0.2)) as server:
+        client = make_client(server)
+        results = client.run(ask_five(client))
+
+    assert len(server.requests) == 1
+    assert client.stats["coalesced"] == 4
+    assert [content for content, _ in results] == ["echo: same"] * 5
+    # Token usage is reported to the caller that made the request only
+    assert sum(1 for _, usage in results if usage) == 1
+
+
+def test_streaming_yields_chunks_and_usage():
+    events = chat_stream(["Hel", "lo ", "world"], usage={"prompt_tokens": 7, "completion_tokens": 3})
+
+    async def collect(client, usage):
+        return [piece async for piece in client.stream(usage_out=usage, **prompt("hi"))]
+
+    with FakeHTTPServer(lambda server, path, body: (200, {}, events)) as server:
+        client = make_client(server)
+        usage = {}
+        pieces = client.run(collect(client, usage))
+
+    assert pieces == ["Hel", "lo ", "world"]
+    assert usage == {"prompt_tokens": 7, "completion_tokens": 3}
+    assert json.loads(server.requests[0]["body"])["stream"] is True
+
+
+def test_sync_calls_close_their_clients(monkeypatch):
+    created = []
+
+    class RecordingClient(openai.AsyncOpenAI):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(openai, "AsyncOpenAI", RecordingClient)
+    with FakeHTTPServer(echo()) as server:
+        client = make_client(server)
+        for i in range(3):
+            assert client.complete_sync(**prompt(f"p{i}")) == f"echo: p{i}"
+
+    assert len(created) == 3
+    assert all(c.is_closed() for c in created)
@@ -0,0 +1,168 @@
+"""
+Virginia Home Essentials - Notification Dispatcher Tests
+Runs NotificationDispatcher against a local SMTP server and webhook endpoint
+"""
+
+import json
+import sqlite3
+import time
+
+import pytest
+
+import notifications
+from fakes import FakeHTTPServer, FakeSMTPServer
+from notifications import NotificationDispatcher
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    # Retries wait 0.4s, 0.8s, ... instead of 5s, 10s, ...
+    monkeypatch.setattr(notifications, "BACKOFF_BASE", 0.4)
+
+
+def make_dispatcher(tmp_path, **settings) -> NotificationDispatcher:
+    settings.setdefault("digest_window_seconds", 0.3)
+    settings.setdefault("rate_limit_per_minute", 6000)
+    return NotificationDispatcher(settings, db_path=str(tmp_path / "notifications.db"), poll_interval=0.1)
+
+
+def email_settings(smtp: FakeSMTPServer) -> dict:
+    return {"email_alerts": True, "email_to": ["owner@example.com"], "email_from": "alerts@example.com",
+            "smtp_host": smtp.host, "smtp_port": smtp.port, "smtp_use_tls": False}
+
+
+def wait_until(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the dispatcher"
+        time.sleep(0.02)
+
+
+def outbox_statuses(dispatcher: NotificationDispatcher) -> list:
+    conn = sqlite3.connect(dispatcher.db_path)
+    rows = [row[0] for row in conn.execute("SELECT status FROM outbox ORDER BY id")]
+    conn.close()
+    return rows
+
+
+def always(status: int):
+    return lambda server, path, body: (status, {}, {"ok": status < 400})
+
+
+def fail_first(count: int):
+    """Webhook handler answering HTTP 500 to the first requests, then 200"""
+    def handler(server, path, body):
+        status = 500 if len(server.requests) <= count else 200
+        return status, {}, {"ok": status < 400}
+    return handler
+
+
+def test_alerts_within_the_window_go_out_as_one_email_digest(tmp_path):
+    with FakeSMTPServer() as smtp:
+        dispatcher = make_dispatcher(tmp_path, **email_settings(smtp))
+        dispatcher.start()
+        try:
+            for i in range(3):
+                assert dispatcher.notify(f"Alert {i}", f"Price changed for item {i}") == 1
+            wait_until(lambda: outbox_statuses(dispatcher) == ["sent"] * 3)
+        finally:
+            dispatcher.stop(flush=False)
+
+    assert len(smtp.messages) == 1
+    delivery = smtp.messages[0]
+    message = delivery["message"]
+    assert delivery["recipients"] == ["<owner@example.com>"]
+    assert message["Subject"] == "3 alerts: Alert 0"
+    assert message["From"] == "alerts@example.com"
+    assert message["To"] == "owner@example.com"
+    assert message.get_content() == ("Alert 0\nPrice changed for item 0\n\n"
+                                      "Alert 1\nPrice changed for item 1\n\n"
+                                      "Alert 2\nPrice changed for item 2\n")
+
+
+def test_single_alert_is_sent_as_is_to_each_channel(tmp_path):
+    with FakeSMTPServer() as smtp, FakeHTTPServer(always(200)) as slack, FakeHTTPServer(always(204)) as discord:
+        dispatcher = make_dispatcher(tmp_path, slack_webhook=f"{slack.url}/hook", discord_webhook=discord.url,
+                                     **email_settings(smtp))
+        assert dispatcher.notify("📉 Lamp: -20.0% change", "Lighting | $50.00 → $40.00") == 3
+        dispatcher.start()
+        dispatcher.stop()
+
+    assert smtp.messages[0]["message"]["Subject"] == "📉 Lamp: -20.0% change"
+    assert slack.requests[0]["path"] == "/hook"
+    assert json.loads(slack.requests[0]["body"]) == {"text": "*📉 Lamp: -20.0% change*\nLighting | $50.00 → $40.00"}
+    assert json.loads(discord.requests[0]["body"]) == {
+        "content": "**📉 Lamp: -20.0% change**\nLighting | $50.00 → $40.00"
+    }
+    assert outbox_statuses(dispatcher) == ["sent"] * 3
+
+
+def test_webhook_is_retried_with_backoff_after_a_server_error(tmp_path):
+    with FakeHTTPServer(fail_first(1)) as slack:
+        dispatcher = make_dispatcher(tmp_path, slack_webhook=slack.url)
+        dispatcher.notify("Alert", "body")
+        dispatcher.start()
+        try:
+            wait_until(lambda: outbox_statuses(dispatcher) == ["sent"])
+        finally:
+            dispatcher.stop(flush=False)
+
+    assert len(slack.requests) == 2
+    # The first retry waits between half and all of BACKOFF_BASE
+    gap = slack.requests[1]["time"] - slack.requests[0]["time"]
+    assert 0.2 <= gap < 1.0
+
+    stats = dispatcher.get_stats()["slack"]
+    assert (stats["sent"], stats["failed"], stats["pending"], stats["failed_attempts"]) == (1, 0, 0, 1)
+    # Latency covers the digest window and the failed attempt
+    assert stats["p50_latency_ms"] >= 300 + gap * 1000 - 50
+
+
+def test_notification_fails_after_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(notifications, "BACKOFF_BASE", 0.05)
+    with FakeHTTPServer(always(500)) as discord:
+        dispatcher = make_dispatcher(tmp_path, discord_webhook=discord.url, max_attempts=3)
+        dispatcher.notify("Alert", "body")
+        dispatcher.start()
+        try:
+            wait_until(lambda: outbox_statuses(dispatcher) == ["failed"])
+            # A failed notification is not attempted again
+            time.sleep(0.3)
+        finally:
+            dispatcher.stop(flush=False)
+
+    assert len(discord.requests) == 3
+    conn = sqlite3.connect(dispatcher.db_path)
+    attempts, last_error = conn.execute("SELECT attempts, last_error FROM outbox").fetchone()
+    conn.close()
+    assert attempts == 3
+    assert last_error == "discord webhook returned HTTP 500"
+    # The webhook URL is a credential and stays out of the error
+    assert discord.url not in last_error
+
+    stats = dispatcher.get_stats()["discord"]
+    assert (stats["sent"], stats["failed"], stats["pending"], stats["failed_attempts"]) == (0, 1, 0, 3)
+    assert "p50_latency_ms" not in stats
+
+
+def test_stats_count_failed_attempts_and_delivery_latency(tmp_path):
+    # The first email is refused, so it is retried, then both later digests go through
+    with FakeSMTPServer(reject_data=1) as smtp:
+        dispatcher = make_dispatcher(tmp_path, **email_settings(smtp))
+        dispatcher.start()
+        try:
+            dispatcher.notify("First", "body")
+            wait_until(lambda: outbox_statuses(dispatcher) == ["sent"])
+            dispatcher.notify("Second", "body")
+            wait_until(lambda: outbox_statuses(dispatcher) == ["sent", "sent"])
+        finally:
+            dispatcher.stop(flush=False)
+
+    assert len(smtp.rejected) == 1
+    assert [m["message"]["Subject"] for m in smtp.messages] == ["First", "Second"]
+
+    stats = dispatcher.get_stats()["email"]
+    assert (stats["sent"], stats["failed"], stats["pending"], stats["failed_attempts"]) == (2, 0, 0, 1)
+    # Each alert waited out the 0.3s digest window; the first also its retry
+    assert 300 <= stats["p50_latency_ms"] <= stats["p95_latency_ms"]
+    assert stats["p95_latency_ms"] >= 300 + (smtp.messages[0]["time"] - smtp.rejected[0]) * 1000 - 50
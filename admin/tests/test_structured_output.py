@@ -0,0 +1,133 @@
+"""
+Virginia Home Essentials - Structured Output Parser Tests
+Salvaging product arrays from malformed, truncated and streamed model output
+"""
+
+import json
+
+from structured_output import PRODUCT_SCHEMA, ArrayScanner, StructuredOutputParser
+
+
+def product(n: int) -> dict:
+    return {
+        "title": f"Lamp {n}",
+        "description": "A warm reading lamp",
+        "category": "Lighting",
+        "price_range": "$20-$40",
+        "amazon_search_terms": ["reading lamp"],
+        "target_audience": "Readers",
+        "seasonal_relevance": "Winter",
+    }
+
+
+def products(*numbers) -> list:
+    return [json.dumps(product(n)) for n in numbers]
+
+
+def titles(result) -> list:
+    return [item["title"] for item in result.items]
+
+
+def test_clean_array():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    result = parser.parse(f"[{', '.join(products(1, 2))}]")
+
+    assert titles(result) == ["Lamp 1", "Lamp 2"]
+    assert not (result.repaired or result.truncated or result.rejected)
+    assert parser.get_stats()["clean"] == 1
+
+
+def test_trailing_comma_keeps_every_element():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    a, b = products(1, 2)
+    result = parser.parse(f"[{a},{b},]")
+
+    assert titles(result) == ["Lamp 1", "Lamp 2"]
+    assert result.repaired and not result.truncated
+
+
+def test_malformed_element_only_loses_itself():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    a, b, c = products(1, 2, 3)
+    result = parser.parse(f"[{a},{b}, {{bad}}, {c}]")
+
+    assert titles(result) == ["Lamp 1", "Lamp 2", "Lamp 3"]
+    assert result.rejected == 1
+    assert result.errors[0].startswith("Element 2: key must be a string")
+    assert parser.get_stats()["items_rejected"] == 1
+
+
+def test_truncation_after_a_complete_element_keeps_it():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    a, b = products(1, 2)
+
+    assert titles(parser.parse(f"[{a},{b},")) == ["Lamp 1", "Lamp 2"]
+    assert titles(parser.parse(f"[{a},{b}")) == ["Lamp 1", "Lamp 2"]
+    result = parser.parse(f"[{a},{b[:-12]}")
+    assert titles(result) == ["Lamp 1"]
+    assert result.truncated and result.rejected == 0
+
+
+def test_prose_fences_and_wrapper_objects_are_repaired():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    a, b = products(1, 2)
+
+    fenced = parser.parse(f"Here you go:\n```json\n[{a},{b}]\n```")
+    assert titles(fenced) == ["Lamp 1", "Lamp 2"] and fenced.repaired
+    wrapped = parser.parse(f'{{"products": [{a}, {b}')
+    assert titles(wrapped) == ["Lamp 1", "Lamp 2"] and wrapped.repaired and wrapped.truncated
+
+
+def test_brackets_inside_strings_are_not_structure():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    tricky = dict(product(1), description='Fits "[1, 2]" shelves, {sort of}\\')
+    result = parser.parse(f"[{json.dumps(tricky)}, {products(2)[0]}, ")
+
+    assert titles(result) == ["Lamp 1", "Lamp 2"]
+    assert result.items[0]["description"] == tricky["description"]
+
+
+def test_schema_violations_are_rejected_and_search_terms_repaired():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    repaired = dict(product(1), amazon_search_terms="lamp, desk lamp")
+    missing = {key: value for key, value in product(2).items() if key != "title"}
+    result = parser.parse(json.dumps([repaired, missing]))
+
+    assert result.items[0]["amazon_search_terms"] == ["lamp", "desk lamp"]
+    assert result.rejected == 1 and result.repaired
+
+
+def test_stream_yields_each_element_once_it_is_complete():
+    parser = StructuredOutputParser(PRODUCT_SCHEMA)
+    a, b, c = products(1, 2, 3)
+    text = f"Sure! [{a}, {{bad}}, {b}, {c}]"
+    received = []
+
+    def chunks():
+        for i in range(0, len(text), 7):
+            received.append(i + 7)
+            yield text[i:i + 7]
+
+    seen = []
+    for item in parser.iter_stream(chunks()):
+        # Each element is yielded before the rest of the stream is read
+        seen.append((item["title"], received[-1]))
+
+    assert [title for title, _ in seen] == ["Lamp 1", "Lamp 2", "Lamp 3"]
+    assert seen[0][1] < text.index("{bad}") + 7
+    assert seen[1][1] < text.index(c) + 7
+    assert parser.get_stats()["responses"] == 1
+
+
+def test_scanner_resumes_where_it_stopped():
+    a, b = products(1, 2)
+    text = f"[{a}, {b}]"
+    scanner = ArrayScanner()
+    cut = text.index('"', len(a) - 10)
+
+    scanner.feed(text[:cut + 3])
+    # Waits at the start of the unterminated string
+    assert scanner.pos == cut and scanner.elements == []
+    scanner.feed(text)
+    assert scanner.closed
+    assert [json.loads(text[start:end])["title"] for start, end in scanner.elements] == ["Lamp 1", "Lamp 2"]
@@ -2,26 +2,87 @@
 
 // Load blog posts from JSON file (generated by automation)
 let blogPosts = [];
+const loadedSlugs = new Set();
+
+// Paginated export manifest (pages/manifest.json); null when only posts.json exists
+let pageManifest = null;
+const loadedPages = {};
+
+function mapPost(post) {
+    return {
+        id: post.id,
+        title: post.title,
+        slug: post.slug,
+        excerpt: post.excerpt,
+        category: post.category,
+        categoryDisplay: formatCategory(post.category),
+        image: post.featured_image || getDefaultImage(post.category),
+        author: post.author,
+        date: post.publish_date,
+        readTime: post.read_time || "5 min read",
+        featured: false  // Can be determined by logic
+    };
+}
+
+function rememberPosts(posts) {
+    posts.forEach(post => {
+        if (!loadedSlugs.has(post.slug)) {
+            loadedSlugs.add(post.slug);
+            blogPosts.push(post);
+        }
+    });
+}
+
+// Page location and totals for a filter ('all' or a category)
+function getFilterPaging(filter) {
+    if (filter === 'all') {
+        return { dir: 'pages', total: pageManifest.total, pages: pageManifest.pages };
+    }
+    const entry = pageManifest.categories[filter];
+    return entry
+        ? { dir: `pages/${entry.path}`, total: entry.total, pages: entry.pages }
+        : { dir: null, total: 0, pages: 0 };
+}
+
+// Fetch the next unloaded page for a filter
+async function fetchNextPage(filter) {
+    const state = loadedPages[filter] || (loadedPages[filter] = { posts: [], page: 0 });
+    const paging = getFilterPaging(filter);
+    if (state.page >= paging.pages) return state.posts;
+    
+    const response = await fetch(`${paging.dir}/posts-page-${state.page + 1}.json`);
+    if (!response.ok) {
+        throw new Error(`Page ${state.page + 1} for ${filter} not found`);
+    }
+    const data = await response.json();
+    const posts = data.posts.map(mapPost);
+    state.page += 1;
+    state.posts.push(...posts);
+    rememberPosts(posts);
+    return state.posts;
+}
 
 // Fetch blog posts from JSON
 async function loadBlogPosts() {
+    try {
+        const manifestResponse = await fetch('pages/manifest.json');
+        if (manifestResponse.ok) {
+            pageManifest = await manifestResponse.json();
+            postsPerPage = pageManifest.page_size;
+            await fetchNextPage('all');
+            console.log(`Loaded page 1 of ${pageManifest.pages} (${pageManifest.total} blog posts)`);
+            return blogPosts;
+        }
+    } catch (error) {
+        console.warn('Paginated blog export not available:', error);
+        pageManifest = null;
+    }
+    
     try {
         const response = await fetch('posts.json');
         if (response.ok) {
             const posts = await response.json();
-            blogPosts = posts.map(post => ({
-                id: post.id,
-                title: post.title,
-                slug: post.slug,
-                excerpt: post.excerpt,
-                category: post.category,
-                categoryDisplay: formatCategory(post.category),
-                image: post.featured_image || getDefaultImage(post.category),
-                author: post.author,
-                date: post.publish_date,
-                readTime: post.read_time || "5 min read",
-                featured: false  // Can be determined by logic
-            }));
+            rememberPosts(posts.map(mapPost));
             console.log(`Loaded ${blogPosts.length} blog posts from database`);
             return blogPosts;
         } else {
@@ -235,11 +296,22 @@ document.addEventListener('DOMContentLoaded', async function() {
 });
 
 // Load and display posts
-function loadPosts(append = false) {
+async function loadPosts(append = false) {
     if (!postsContainer) return;
     
     // Filter posts based on current filter
-    if (currentFilter === 'all') {
+    if (pageManifest) {
+        // Fetch only the page the current view needs
+        const state = loadedPages[currentFilter];
+        if (!state || state.page < currentPage) {
+            try {
+                await fetchNextPage(currentFilter);
+            } catch (error) {
+                console.warn('Error loading blog page:', error);
+            }
+        }
+        filteredPosts = loadedPages[currentFilter] ? [...loadedPages[currentFilter].posts] : [];
+    } else if (currentFilter === 'all') {
         filteredPosts = [...blogPosts];
     } else {
         filteredPosts = blogPosts.filter(post => post.category === currentFilter);
@@ -429,11 +501,12 @@ function updateLoadMoreButton() {
     if (!loadMoreBtn) return;
     
     const totalShown = currentPage * postsPerPage;
-    const hasMore = totalShown < filteredPosts.length;
+    const totalPosts = pageManifest ? getFilterPaging(currentFilter).total : filteredPosts.length;
+    const hasMore = totalShown < totalPosts;
     
     if (hasMore) {
         loadMoreBtn.style.display = 'inline-block';
-        loadMoreBtn.textContent = `Load More Articles (${filteredPosts.length - totalShown} remaining)`;
+        loadMoreBtn.textContent = `Load More Articles (${totalPosts - totalShown} remaining)`;
     } else {
         loadMoreBtn.style.display = 'none';
     }
@@ -443,10 +516,16 @@ function updateLoadMoreButton() {
 function updateCategoryCounts() {
     const categoryCounts = {};
     
-    // Count posts by category
-    blogPosts.forEach(post => {
-        categoryCounts[post.category] = (categoryCounts[post.category] || 0) + 1;
-    });
+    // Count posts by category (the manifest knows totals for unloaded pages)
+    if (pageManifest) {
+        Object.entries(pageManifest.categories).forEach(([category, entry]) => {
+            categoryCounts[category] = entry.total;
+        });
+    } else {
+        blogPosts.forEach(post => {
+            categoryCounts[post.category] = (categoryCounts[post.category] || 0) + 1;
+        });
+    }
     
     // Update category cards
     categoryCards.forEach(card => {
@@ -530,27 +609,127 @@ function trackEvent(eventName, eventData) {
     console.log('Blog event tracked:', eventName, eventData);
 }
 
-// Search functionality (for future implementation)
-function searchPosts(query) {
-    const searchResults = blogPosts.filter(post => 
-        post.title.toLowerCase().includes(query.toLowerCase()) ||
-        post.excerpt.toLowerCase().includes(query.toLowerCase()) ||
-        post.categoryDisplay.toLowerCase().includes(query.toLowerCase())
-    );
+// Search functionality
+// Uses the prefix-sharded inverted index exported to search/ at publish time;
+// only the shards for the typed prefixes are downloaded
+const searchIndex = {
+    manifest: null,
+    docs: null,
+    shards: new Map()
+};
+
+async function fetchSearchJson(path) {
+    const response = await fetch(`search/${path}`);
+    if (!response.ok) throw new Error(`Search index file ${path} not found`);
+    return response.json();
+}
+
+async function loadSearchShard(prefix) {
+    if (!searchIndex.manifest.shards.includes(prefix)) return {};
+    if (!searchIndex.shards.has(prefix)) {
+        searchIndex.shards.set(prefix, fetchSearchJson(`${prefix}.json`));
+    }
+    return searchIndex.shards.get(prefix);
+}
+
+function tokenizeQuery(query) {
+    return query
+        .normalize('NFD')
+        .replace(/[\u0300-\u036f]/g, '')
+        .toLowerCase()
+        .split(/[^a-z0-9]+/)
+        .filter(Boolean);
+}
+
+async function searchPosts(query, limit = 10) {
+    try {
+        if (!searchIndex.manifest) {
+            searchIndex.manifest = await fetchSearchJson('manifest.json');
+        }
+    } catch (error) {
+        console.warn('Search index not available:', error);
+        return [];
+    }
     
-    return searchResults;
+    const prefixLength = searchIndex.manifest.prefix_length;
+    const tokens = tokenizeQuery(query).filter(token => token.length >= prefixLength);
+    if (tokens.length === 0) return [];
+    
+    const [shards, docs] = await Promise.all([
+        Promise.all(tokens.map(token => loadSearchShard(token.slice(0, prefixLength)))),
+        searchIndex.docs || fetchSearchJson('docs.json')
+    ]);
+    searchIndex.docs = docs;
+    
+    // Every token must match; the last token also matches as a prefix
+    let scores = null;
+    tokens.forEach((token, i) => {
+        const isLast = i === tokens.length - 1;
+        const tokenScores = new Map();
+        Object.entries(shards[i]).forEach(([term, postings]) => {
+            const exact = term === token;
+            if (!exact && !(isLast && term.startsWith(token))) return;
+            const boost = exact ? 1 : 0.8;
+            for (let p = 0; p < postings.length; p += 2) {
+                const doc = postings[p];
+                tokenScores.set(doc, Math.max(tokenScores.get(doc) || 0, postings[p + 1] * boost));
+            }
+        });
+        
+        if (scores === null) {
+            scores = tokenScores;
+        } else {
+            const merged = new Map();
+            scores.forEach((score, doc) => {
+                if (tokenScores.has(doc)) merged.set(doc, score + tokenScores.get(doc));
+            });
+            scores = merged;
+        }
+    });
+    
+    const bySlug = new Map(blogPosts.map(post => [post.slug, post]));
+    return [...scores.entries()]
+        .sort((a, b) => b[1] - a[1])
+        .slice(0, limit)
+        .map(([doc]) => {
+            const [slug, title, category] = docs[doc];
+            return bySlug.get(slug) || {
+                slug,
+                title,
+                category,
+                categoryDisplay: formatCategory(category || 'general')
+            };
+        });
 }
 
 // Related posts functionality
-function getRelatedPosts(currentPost, limit = 3) {
-    const related = blogPosts
-        .filter(post => post.id !== currentPost.id && post.category === currentPost.category)
+// Neighbor lists are precomputed at publish time into related.json
+let relatedGraph = null;
+
+async function loadRelatedGraph() {
+    if (relatedGraph) return relatedGraph;
+    try {
+        const response = await fetch('related.json');
+        relatedGraph = response.ok ? await response.json() : {};
+    } catch (error) {
+        console.warn('Related posts graph not available:', error);
+        relatedGraph = {};
+    }
+    return relatedGraph;
+}
+
+async function getRelatedPosts(currentPost, limit = 3) {
+    const graph = await loadRelatedGraph();
+    const bySlug = new Map(blogPosts.map(post => [post.slug, post]));
+    const related = (graph[currentPost.slug] || [])
+        .map(slug => bySlug.get(slug))
+        .filter(Boolean)
         .slice(0, limit);
     
-    // If not enough related posts in same category, fill with other posts
+    // Fall back to same-category posts for posts not yet in the graph
     if (related.length < limit) {
         const additional = blogPosts
-            .filter(post => post.id !== currentPost.id && !related.includes(post))
+            .filter(post => post.id !== currentPost.id && post.category === currentPost.category && !related.includes(post))
             .slice(0, limit - related.length);
         
         related.push(...additional);
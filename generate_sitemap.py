@@ -4,93 +4,331 @@ Sitemap Generator for Virginia Home Essentials
 Automatically generates and updates sitemap.xml with blog posts
 """
 
+import gzip
+import hashlib
+import json
 import os
+import re
 import sqlite3
 from datetime import datetime
 from pathlib import Path
+from xml.sax.saxutils import escape
 
-def generate_sitemap(domain="https://yourdomain.com"):
-    """Generate sitemap.xml with all pages and blog posts"""
-    
-    # Static pages
-    static_urls = [
-        {"loc": "/", "priority": "1.0", "changefreq": "daily"},
-        {"loc": "/blog/", "priority": "0.9", "changefreq": "daily"},
-        {"loc": "/#products", "priority": "0.8", "changefreq": "daily"},
-        {"loc": "/#market-insights", "priority": "0.7", "changefreq": "weekly"},
-        {"loc": "/#about", "priority": "0.6", "changefreq": "monthly"},
-    ]
-    
-    # Get blog posts from database
-    blog_posts = []
-    db_path = Path(__file__).parent / "admin" / "blog_system.db"
-    
+# Sitemap protocol limits per file
+SITEMAP_MAX_URLS = 50000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # uncompressed
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+XML_ENTITIES = {'"': "&quot;", "'": "&apos;"}
+
+# Static pages; lastmod follows the content hash of their source files
+STATIC_URLS = [
+    {"loc": "/", "priority": "1.0", "changefreq": "daily", "sources": ["index.html"]},
+    {"loc": "/blog/", "priority": "0.9", "changefreq": "daily", "sources": ["blog/index.html"]},
+    {"loc": "/#products", "priority": "0.8", "changefreq": "daily",
+     "sources": ["index.html", "assets/products.json"]},
+    {"loc": "/#market-insights", "priority": "0.7", "changefreq": "weekly",
+     "sources": ["index.html", "assets/market-insights.json"]},
+    {"loc": "/#about", "priority": "0.6", "changefreq": "monthly", "sources": ["index.html"]},
+]
+
+# Regeneration state kept out of the web root (robots.txt disallows /admin/)
+STATE_FILE = Path(__file__).parent / "admin" / "sitemap_state.json"
+
+PUBLISHED_POSTS_SQL = """
+    FROM blog_posts
+    WHERE status = 'published'
+"""
+
+
+def _url_entry(domain: str, loc: str, lastmod: str, changefreq: str, priority: str) -> bytes:
+    """Render one <url> element"""
+    return (
+        '  <url>\n'
+        f'    <loc>{escape(domain + loc, XML_ENTITIES)}</loc>\n'
+        f'    <lastmod>{lastmod}</lastmod>\n'
+        f'    <changefreq>{changefreq}</changefreq>\n'
+        f'    <priority>{priority}</priority>\n'
+        '  </url>\n'
+    ).encode("utf-8")
+
+
+def _load_state() -> dict:
+    if STATE_FILE.exists():
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def _save_state(state: dict):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def _static_lastmods(site_root: Path, previous: dict, today: str) -> dict:
+    """Real lastmod per static page: unchanged source hash keeps the old date"""
+    lastmods = {}
+    for url in STATIC_URLS:
+        digest = hashlib.sha256()
+        newest_mtime = 0.0
+        for source in url["sources"]:
+            path = site_root / source
+            if path.exists():
+                digest.update(path.read_bytes())
+                newest_mtime = max(newest_mtime, path.stat().st_mtime)
+        content_hash = digest.hexdigest()
+
+        known = previous.get(url["loc"])
+        if known and known["hash"] == content_hash:
+            lastmod = known["lastmod"]
+        elif known or not newest_mtime:
+            lastmod = today
+        else:
+            # First run: the file modification time is the best date we have
+            lastmod = datetime.fromtimestamp(newest_mtime).strftime("%Y-%m-%d")
+
+        lastmods[url["loc"]] = {"hash": content_hash, "lastmod": lastmod}
+    return lastmods
+
+
+def _shard_summaries(conn: sqlite3.Connection, max_urls: int) -> dict:
+    """Count, newest updated_at and an ordering checksum for each post shard.
+
+    Shard k holds posts at ordinals [k * max_urls - static, (k + 1) * max_urls - static),
+    because static pages fill the start of the first file. The checksum changes
+    whenever posts are inserted, removed or reordered within a shard.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT shard, COUNT(*), MAX(updated_at), SUM(row_id * (pos + 1))
+        FROM (
+            SELECT rowid AS row_id, updated_at,
+                   (ROW_NUMBER() OVER (ORDER BY publish_date, id) - 1 + ?) / ? AS shard,
+                   (ROW_NUMBER() OVER (ORDER BY publish_date, id) - 1 + ?) % ? AS pos
+            {PUBLISHED_POSTS_SQL}
+        )
+        GROUP BY shard
+    """, (len(STATIC_URLS), max_urls, len(STATIC_URLS), max_urls))
+    return {
+        str(shard): {"count": count, "max_updated_at": max_updated, "checksum": checksum}
+        for shard, count, max_updated, checksum in cursor.fetchall()
+    }
+
+
+class SitemapWriter:
+    """Streams <url> entries into gzip-compressed sitemap-N.xml.gz files"""
+
+    HEADER = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'.encode("utf-8")
+    FOOTER = b'</urlset>\n'
+
+    def __init__(self, output_dir: Path, domain: str, max_urls: int = SITEMAP_MAX_URLS,
+                 max_bytes: int = SITEMAP_MAX_BYTES, first_number: int = 1):
+        self.output_dir = output_dir
+        self.domain = domain
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.first_number = first_number
+        self.sitemaps = []  # (filename, newest lastmod)
+        self.total_urls = 0
+        self._file = None
+
+    def add(self, loc: str, lastmod: str, changefreq: str, priority: str):
+        """Append one URL, rolling over to a new file at the protocol limits"""
+        entry = _url_entry(self.domain, loc, lastmod, changefreq, priority)
+
+        if self._file is not None and (
+                self._count >= self.max_urls or
+                self._bytes + len(entry) + len(self.FOOTER) > self.max_bytes):
+            self._close_file()
+        if self._file is None:
+            self._open_file()
+
+        self._file.write(entry)
+        self._count += 1
+        self._bytes += len(entry)
+        self._lastmod = max(self._lastmod, lastmod)
+        self.total_urls += 1
+
+    def _open_file(self):
+        self._name = f"sitemap-{self.first_number + len(self.sitemaps)}.xml.gz"
+        self._tmp_path = self.output_dir / f"{self._name}.tmp"
+        # mtime=0 keeps output byte-identical when the URLs have not changed
+        self._file = gzip.GzipFile(self._tmp_path, "wb", mtime=0)
+        self._file.write(self.HEADER)
+        self._count = 0
+        self._bytes = len(self.HEADER)
+        self._lastmod = ""
+
+    def _close_file(self):
+        self._file.write(self.FOOTER)
+        self._file.close()
+        os.replace(self._tmp_path, self.output_dir / self._name)
+        self.sitemaps.append((self._name, self._lastmod))
+        self._file = None
+
+    def close(self):
+        """Finish the last file and return (filename, lastmod) per file written"""
+        if self._file is not None:
+            self._close_file()
+        return self.sitemaps
+
+
+def write_sitemap_index(index_path: Path, domain: str, sitemaps):
+    """Write the sitemap index pointing at every sitemap file"""
+    tmp_path = index_path.with_suffix(".xml.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<sitemapindex xmlns="{SITEMAP_NS}">\n')
+        for name, lastmod in sitemaps:
+            f.write('  <sitemap>\n')
+            f.write(f'    <loc>{escape(f"{domain}/{name}", XML_ENTITIES)}</loc>\n')
+            if lastmod:
+                f.write(f'    <lastmod>{lastmod}</lastmod>\n')
+            f.write('  </sitemap>\n')
+        f.write('</sitemapindex>\n')
+    os.replace(tmp_path, index_path)
+
+
+def _post_lastmod(updated_at: str, today: str) -> str:
+    return updated_at.split('T')[0] if updated_at else today
+
+
+def generate_sitemap(domain="https://yourdomain.com", output_dir=None, db_path=None,
+                     incremental=False, max_urls=SITEMAP_MAX_URLS):
+    """Generate sitemap.xml (a sitemap index) and sitemap-N.xml.gz files.
+
+    URLs are streamed from the database cursor into gzip files, so memory use
+    does not grow with the number of blog posts. With incremental=True only
+    shards whose posts or static pages changed since the last run are
+    rewritten, and nothing is written when nothing changed.
+    """
+
+    site_root = Path(__file__).parent
+    output_dir = Path(output_dir) if output_dir else site_root
+    db_path = Path(db_path) if db_path else site_root / "admin" / "blog_system.db"
+    domain = domain.rstrip("/")
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    previous = _load_state()
+    if previous.get("domain") != domain or previous.get("max_urls") != max_urls:
+        previous = {}
+
+    static = _static_lastmods(site_root, previous.get("static", {}), today)
+
+    conn = None
     if db_path.exists():
         try:
             conn = sqlite3.connect(str(db_path), timeout=30)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT slug, updated_at, status 
-                FROM blog_posts 
-                WHERE status = 'published'
-                ORDER BY publish_date DESC
-            """)
-            
-            for row in cursor.fetchall():
-                slug, updated_at, status = row
-                blog_posts.append({
-                    "loc": f"/blog/{slug}.html",
-                    "lastmod": updated_at.split('T')[0] if updated_at else datetime.now().strftime("%Y-%m-%d"),
-                    "priority": "0.7",
-                    "changefreq": "monthly"
-                })
-            
-            conn.close()
+            summaries = _shard_summaries(conn, max_urls)
         except Exception as e:
             print(f"Warning: Could not read blog posts from database: {e}")
-    
-    # Generate XML
-    today = datetime.now().strftime("%Y-%m-%d")
-    
-    xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
-    # Add static pages
-    for url in static_urls:
-        xml_content += '  <url>\n'
-        xml_content += f'    <loc>{domain}{url["loc"]}</loc>\n'
-        xml_content += f'    <lastmod>{today}</lastmod>\n'
-        xml_content += f'    <changefreq>{url["changefreq"]}</changefreq>\n'
-        xml_content += f'    <priority>{url["priority"]}</priority>\n'
-        xml_content += '  </url>\n'
-    
-    # Add blog posts
-    for post in blog_posts:
-        xml_content += '  <url>\n'
-        xml_content += f'    <loc>{domain}{post["loc"]}</loc>\n'
-        xml_content += f'    <lastmod>{post["lastmod"]}</lastmod>\n'
-        xml_content += f'    <changefreq>{post["changefreq"]}</changefreq>\n'
-        xml_content += f'    <priority>{post["priority"]}</priority>\n'
-        xml_content += '  </url>\n'
-    
-    xml_content += '</urlset>\n'
-    
+            conn = None
+    if conn is None:
+        summaries = {}
+
+    shard_count = max(1, len(STATIC_URLS) // max_urls + 1, *(int(k) + 1 for k in summaries))
+    state = {"domain": domain, "max_urls": max_urls, "static": static, "shards": {}}
+
+    if incremental and previous:
+        static_changed = any(previous["static"].get(loc, {}).get("lastmod") != entry["lastmod"]
+                             for loc, entry in static.items())
+        dirty = []
+        for shard in range(shard_count):
+            key = str(shard)
+            known = previous["shards"].get(key)
+            summary = summaries.get(key, {"count": 0, "max_updated_at": None, "checksum": None})
+            changed = (known is None or
+                       any(known.get(field) != value for field, value in summary.items()) or
+                       (shard == 0 and static_changed) or
+                       not (output_dir / f"sitemap-{shard + 1}.xml.gz").exists())
+            if changed:
+                dirty.append(shard)
+            else:
+                state["shards"][key] = known
+    else:
+        dirty = list(range(shard_count))
+
+    if not dirty and len(previous.get("shards", {})) == shard_count:
+        if conn:
+            conn.close()
+        print("✅ Sitemap up to date, no shards rewritten")
+        return output_dir / "sitemap.xml"
+
+    if dirty == list(range(shard_count)):
+        # Full rebuild: a single pass over the cursor, rolling over per shard
+        writer = SitemapWriter(output_dir, domain, max_urls=max_urls)
+        for url in STATIC_URLS:
+            writer.add(url["loc"], static[url["loc"]]["lastmod"], url["changefreq"], url["priority"])
+        if conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT slug, updated_at
+                {PUBLISHED_POSTS_SQL}
+                ORDER BY publish_date, id
+            """)
+            for slug, updated_at in cursor:
+                writer.add(f"/blog/{slug}.html", _post_lastmod(updated_at, today), "monthly", "0.7")
+        written = dict(enumerate(lastmod for _, lastmod in writer.close()))
+    else:
+        # Incremental: rewrite each changed shard from its slice of the ordering
+        written = {}
+        for shard in dirty:
+            writer = SitemapWriter(output_dir, domain, max_urls=max_urls, first_number=shard + 1)
+            if shard == 0:
+                for url in STATIC_URLS:
+                    writer.add(url["loc"], static[url["loc"]]["lastmod"], url["changefreq"], url["priority"])
+            if conn:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT slug, updated_at
+                    {PUBLISHED_POSTS_SQL}
+                    ORDER BY publish_date, id
+                    LIMIT ? OFFSET ?
+                """, (max_urls - writer.total_urls, max(0, shard * max_urls - len(STATIC_URLS))))
+                for slug, updated_at in cursor:
+                    writer.add(f"/blog/{slug}.html", _post_lastmod(updated_at, today), "monthly", "0.7")
+            files = writer.close()
+            written[shard] = files[0][1] if files else today
+
+    for shard, lastmod in written.items():
+        summary = summaries.get(str(shard), {"count": 0, "max_updated_at": None, "checksum": None})
+        state["shards"][str(shard)] = dict(summary, lastmod=lastmod)
+
+    if conn:
+        conn.close()
+
+    # Remove sitemap files beyond the current shard count
+    for path in output_dir.glob("sitemap-*.xml.gz"):
+        match = re.fullmatch(r"sitemap-(\d+)\.xml\.gz", path.name)
+        if match and int(match.group(1)) > shard_count:
+            path.unlink()
+
     # Write to file
-    sitemap_path = Path(__file__).parent / "sitemap.xml"
-    with open(sitemap_path, 'w', encoding='utf-8') as f:
-        f.write(xml_content)
-    
-    print(f"✅ Sitemap generated with {len(static_urls)} static pages and {len(blog_posts)} blog posts")
+    sitemap_path = output_dir / "sitemap.xml"
+    write_sitemap_index(sitemap_path, domain, [
+        (f"sitemap-{shard + 1}.xml.gz", state["shards"][str(shard)]["lastmod"])
+        for shard in range(shard_count)
+    ])
+    _save_state(state)
+
+    blog_post_count = sum(s["count"] for s in summaries.values())
+    print(f"✅ Sitemap generated with {len(STATIC_URLS)} static pages and {blog_post_count} blog posts "
+          f"in {shard_count} file(s), {len(dirty)} rewritten")
     print(f"   Saved to: {sitemap_path}")
-    
+
     return sitemap_path
 
 if __name__ == "__main__":
-    import sys
-    
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Virginia Home Essentials - Sitemap Generator")
     # Allow custom domain as argument
-    domain = sys.argv[1] if len(sys.argv) > 1 else "https://yourdomain.com"
-    
+    parser.add_argument("domain", nargs="?", default="https://yourdomain.com")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rewrite sitemap files containing changed URLs")
+    args = parser.parse_args()
+
     print("Virginia Home Essentials - Sitemap Generator")
     print("=" * 50)
-    generate_sitemap(domain)
+    generate_sitemap(args.domain, incremental=args.incremental)